@@ -22,15 +22,25 @@ class MaltaBot(commands.Bot):
         guild = discord.Object(id=GUILD_ID)
         await self.load_extension("cogs.admin_config")
         await self.load_extension("cogs.admin_group")
+        #await self.load_extension("cogs.exp_cache")
+        #await self.load_extension("cogs.exp_cooldown")
+        #await self.load_extension("cogs.exp_leaderboard")
+        #await self.load_extension("cogs.message_scheduler")
+        #await self.load_extension("cogs.exp_announcer")
         #await self.load_extension("cogs.exp_utils")
+        #await self.load_extension("cogs.x_utilities.member_resolver")
         #await self.load_extension("cogs.exp_engine")
         #await self.load_extension("cogs.exp_commands")
+        #await self.load_extension("cogs.message_pipeline")
         #await self.load_extension("cogs.exp_background")
         #await self.load_extension("cogs.ActivityAnalyzer")
         #await self.load_extension("cogs.exp_multi_autoupdate")
         #await self.load_extension("cogs.exp_reminder")
 
         #print("Loading 🍯Store cogs...")
+        #await self.load_extension("cogs.store.item_catalog")
+        #await self.load_extension("cogs.store.store_stock")
+        #await self.load_extension("cogs.store.title_ownership")
         #await self.load_extension("cogs.store.store_utils")
         #await self.load_extension("cogs.store.store_upkeep")
         #await self.load_extension("cogs.store.store_search")
@@ -51,6 +61,7 @@ class MaltaBot(commands.Bot):
         #await self.load_extension("cogs.gambling.gambling_reminder")
 
         #print("Loading 💼 Wallet cogs...")
+        #await self.load_extension("cogs.wallet.log_transactions")
         #await self.load_extension("cogs.wallet.wallet")
 
         #print("Loading ⚙️ Chat Modulation cogs...")
@@ -77,6 +88,10 @@ bot = MaltaBot()
 
 @bot.event
 async def on_message(message):
+    # 🧵 The MessagePipeline cog owns DMs, EXP, triggers and commands when it is loaded
+    if bot.get_cog("MessagePipeline"):
+        return
+
     if message.guild is None and not message.author.bot:  # Check if the message is a DM and not from a bot
         debug_info = (f"Received DM from {message.author} (ID: {message.author.id}): "
                       f"{message.content}")
@@ -86,7 +101,8 @@ async def on_message(message):
         await message.channel.send(f"Debug: {debug_info}")
 
     # Process commands if any
-    await bot.process_commands(message)
+    if message.content.startswith(bot.command_prefix):
+        await bot.process_commands(message)
 
 @bot.event
 async def on_ready():
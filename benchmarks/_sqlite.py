@@ -0,0 +1,25 @@
+"""
+Point the bot at a throwaway SQLite database (aiosqlite for the async engine) before
+any cog is imported. Every benchmark imports this first; it overrides DATABASE_URL,
+so a benchmark never touches the configured Postgres database.
+"""
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="malta-bench-"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.pop("ASYNC_DATABASE_URL", None)  # Derived from DATABASE_URL: sqlite+aiosqlite://
+for name in ("EXP_CHANNEL_ID", "GUILD_ID", "OWNER_ID", "WELCOME_CHANNEL_ID", "APPROVED_ROLE_NAME"):
+    os.environ.setdefault(name, "1")
+
+# Importing the config builds every table on the stand-in database
+from cogs.exp_config import engine, async_engine, players  # noqa: E402
+
+
+def seed_players(count, gold=1000):
+    """Insert `count` players ("1".."count") with `gold` each; returns their ids."""
+    user_ids = [str(i) for i in range(1, count + 1)]
+    with engine.begin() as conn:
+        conn.execute(players.delete())
+        conn.execute(players.insert(), [{"user_id": user_id, "gold": gold} for user_id in user_ids])
+    return user_ids
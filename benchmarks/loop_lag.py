@@ -0,0 +1,78 @@
+"""
+Event-loop lag under a simulated message burst, sync helpers vs the async layer.
+
+Each simulated message reads the player and credits one EXP tick (exp + gold,
+plus its ledger row): once through the blocking shims (get_user_data /
+adjust_player_sync on `engine`) and once through the awaitable versions
+(get_user_data_async / adjust_player on `async_engine`). A probe task sleeps in
+short intervals during the burst and records how late it wakes up.
+
+    python -m benchmarks.loop_lag [--users 200] [--messages 1000]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+
+from benchmarks._sqlite import DB_PATH, seed_players
+from cogs.exp_config import async_engine, EXP_PER_TICK, GOLD_PER_TICK
+from cogs.exp_utils import get_user_data, adjust_player_sync, get_user_data_async, adjust_player
+
+PROBE_INTERVAL = 0.005  # Seconds between probe wake-ups
+
+
+async def sync_message(user_id):
+    get_user_data(user_id)
+    adjust_player_sync(user_id, exp=EXP_PER_TICK, gold=GOLD_PER_TICK, type_="bench")
+
+
+async def async_message(user_id):
+    await get_user_data_async(user_id)
+    await adjust_player(user_id, exp=EXP_PER_TICK, gold=GOLD_PER_TICK, type_="bench")
+
+
+async def probe(stop, lags):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def burst(handler, user_ids, messages):
+    stop, lags = asyncio.Event(), []
+    probe_task = asyncio.create_task(probe(stop, lags))
+    await asyncio.sleep(PROBE_INTERVAL)  # Let the probe take its first sample
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # The helpers' DEBUG prints would swamp the report
+        await asyncio.gather(*(handler(user_ids[i % len(user_ids)]) for i in range(messages)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    return elapsed, lags
+
+
+def report(name, messages, elapsed, lags):
+    lags = sorted(lags) or [0.0]
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(f"{name:<6} {messages / elapsed:>9.0f} msg/s  lag median {statistics.median(lags):>7.1f}ms  "
+          f"p99 {p99:>7.1f}ms  max {lags[-1]:>7.1f}ms  ({len(lags)} probe samples)")
+
+
+async def main(users, messages):
+    print(f"SQLite stand-in: {DB_PATH} — {users} players, {messages} messages per burst")
+    for name, handler in (("sync", sync_message), ("async", async_message)):
+        user_ids = seed_players(users)
+        elapsed, lags = await burst(handler, user_ids, messages)
+        report(name, messages, elapsed, lags)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.messages))
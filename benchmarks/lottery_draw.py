@@ -0,0 +1,38 @@
+"""
+Lottery draw time for a large round: draw_tiers over 100k entrants holding
+1..MAX_TICKETS tickets each, for a growing number of prize tiers. Needs no database.
+
+    python -m benchmarks.lottery_draw [--entrants 100000] [--repeat 5]
+"""
+import argparse
+import random
+import time
+from collections import namedtuple
+
+from cogs.gambling.lottery.lottery_draw import new_seed, draw_tiers
+
+MAX_TICKETS = 10000  # Per-user cap in the lottery cog
+Entry = namedtuple("Entry", "user_id user_name tickets")
+
+
+def main(entrants, repeat):
+    rng = random.Random(0)
+    entries = [Entry(user_id, str(user_id), rng.randint(1, MAX_TICKETS)) for user_id in range(entrants)]
+    pot = sum(entry.tickets for entry in entries) * 100
+    print(f"{entrants} entrants, {sum(entry.tickets for entry in entries)} tickets — best of {repeat}")
+    for winners in (1, 3, 10, 100):
+        tiers = [1 / winners] * winners
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            draw_tiers(entries, pot, tiers, new_seed())
+            best = min(best, time.perf_counter() - started)
+        print(f"{winners:>4} tier(s): {best * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entrants", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.entrants, args.repeat)
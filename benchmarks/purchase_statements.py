@@ -0,0 +1,162 @@
+"""
+Work per shop purchase, before and after the single-transaction rewrite.
+
+  legacy  the pre-rewrite process_purchase, replayed here: three catalog scans that
+          open and parse the item JSON files, two player reads, update_user_gold
+          (another read, a write and a ledger insert plus overflow query),
+          update_user_data, the inventory insert and the stock rewrite in the item
+          file (counted, not written, so the repo's JSON stays untouched)
+  sync    today's process_purchase shim: cached catalog, guarded debit, one step per connection
+  async   process_purchase_async: everything in one transaction
+
+Statements are counted with a before_cursor_execute listener on both engines,
+transactions with a begin listener. The ledger writer cog isn't running here, so
+each ledger row is trimmed inline (one extra DELETE per purchase on every path).
+
+    python -m benchmarks.purchase_statements [--purchases 50]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+from collections import Counter
+
+from sqlalchemy import event, select, desc
+
+from benchmarks._sqlite import DB_PATH, seed_players
+from cogs.exp_config import engine, async_engine, players, transactions
+from cogs.exp_utils import _select_user_stmt
+from cogs.store.item_catalog import catalog, CATEGORY_TO_FILES, DATA_DIR
+from cogs.store.store_stock import stock_view
+from cogs.store.store_utils import (
+    process_purchase, process_purchase_async, tracks_stock,
+    _ownership_stmt, _inventory_insert_stmt,
+)
+from cogs.database.transactions_table import now_cst
+
+counts = Counter()
+
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    counts["statements"] += 1
+
+
+def count_begin(conn):
+    counts["transactions"] += 1
+
+
+# === The pre-rewrite purchase path ===
+def legacy_item_lookup(item_id):
+    """get_item_by_id before the catalog cache: open and parse item files until the id turns up."""
+    for files in CATEGORY_TO_FILES.values():
+        for filename in files:
+            path = os.path.join(DATA_DIR, filename)
+            if not os.path.exists(path):
+                continue
+            counts["file_reads"] += 1
+            with open(path, "r", encoding="utf-8") as f:
+                try:
+                    items = json.load(f)
+                except json.JSONDecodeError:
+                    continue
+            for item in items:
+                if isinstance(item, dict) and item.get("id") == item_id:
+                    return item
+    return None
+
+
+def legacy_purchase(user_id, item_id, item_type):
+    item = legacy_item_lookup(item_id)
+    legacy_item_lookup(item_id)  # check_item_availability looked the item up again
+    with engine.connect() as conn:
+        user_data = dict(conn.execute(_select_user_stmt(user_id)).one()._mapping)
+    price = item.get("price", 0)
+    if user_data["gold"] < price:
+        return False, "Not enough gold"
+    with engine.connect() as conn:
+        if conn.execute(_ownership_stmt(user_id, item_id, item_type)).fetchone():
+            return False, "You already own this item"
+
+    # update_user_gold: re-read, absolute write, then log_transaction with its overflow trim
+    with engine.connect() as conn:
+        conn.execute(_select_user_stmt(user_id)).one()
+    with engine.begin() as conn:
+        conn.execute(players.update().where(players.c.user_id == user_id).values(gold=user_data["gold"] - price))
+    with engine.begin() as conn:
+        conn.execute(transactions.insert().values(
+            user_id=int(user_id), amount=-price, type="shop_purchase", description=item["name"], timestamp=now_cst()
+        ))
+        overflow = conn.execute(
+            select(transactions.c.id).where(transactions.c.user_id == int(user_id))
+            .order_by(desc(transactions.c.timestamp)).offset(100)
+        ).fetchall()
+        if overflow:
+            conn.execute(transactions.delete().where(transactions.c.id.in_([row.id for row in overflow])))
+
+    # update_user_data wrote back the multiplier columns it had just read
+    with engine.begin() as conn:
+        conn.execute(players.update().where(players.c.user_id == user_id).values(
+            multiplier=user_data["multiplier"],
+            daily_multiplier=user_data["daily_multiplier"],
+            last_message_ts=user_data["last_message_ts"],
+            last_multiplier_update=user_data["last_multiplier_update"],
+        ))
+    with engine.begin() as conn:
+        conn.execute(_inventory_insert_stmt(user_id, item_id, item_type, False))
+
+    # update_item_stock: a third scan, then the whole item file rewritten
+    legacy_item_lookup(item_id)
+    counts["file_writes"] += 1
+    return True, "Purchased"
+
+
+# === Benchmark ===
+def pick_item():
+    """A stocked item, so the stock decrement is part of the purchase."""
+    for item in catalog.all_items():
+        if tracks_stock(item) and isinstance(item.get("stock"), int) and item.get("category"):
+            return item
+    raise SystemExit("No stocked item in the catalog")
+
+
+async def run(name, purchase, user_ids, item):
+    # Enough stock for every buyer, so no purchase is rejected
+    await stock_view.set(item["id"], stock=len(user_ids))
+    counts.clear()
+    with contextlib.redirect_stdout(io.StringIO()):  # The helpers' DEBUG prints would swamp the report
+        for user_id in user_ids:
+            result = purchase(user_id, item["id"], item["category"].lower())
+            ok, message = await result if asyncio.iscoroutine(result) else result
+            if not ok:
+                raise SystemExit(f"{name} purchase failed: {message}")
+    per = {key: counts[key] / len(user_ids) for key in ("statements", "transactions", "file_reads", "file_writes")}
+    print(f"{name:<7} {per['statements']:>5.1f} statements  {per['transactions']:>4.1f} transactions  "
+          f"{per['file_reads']:>5.1f} item file reads  {per['file_writes']:>3.1f} item file writes  (per purchase)")
+
+
+async def main(purchases):
+    for sync_engine in (engine, async_engine.sync_engine):
+        event.listen(sync_engine, "before_cursor_execute", count_statement)
+        event.listen(sync_engine, "begin", count_begin)
+
+    item = pick_item()
+    user_ids = seed_players(3 * purchases, gold=10 * max(stock_view.price(item), 1))
+    with contextlib.redirect_stdout(io.StringIO()):
+        await stock_view.load()
+    print(f"SQLite stand-in: {DB_PATH} — {purchases} purchases of '{item['id']}' per path")
+    for index, (name, purchase) in enumerate((
+        ("legacy", legacy_purchase),
+        ("sync", process_purchase),
+        ("async", process_purchase_async),
+    )):
+        await run(name, purchase, user_ids[index * purchases:(index + 1) * purchases], item)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--purchases", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.purchases))
@@ -4,8 +4,8 @@ import discord
 from discord.ext import tasks, commands
 from sqlalchemy import select
 
-from cogs.exp_background import process_user_activity
-from cogs.exp_config import engine
+from cogs.exp_engine import award_exp_batch, announce_level_ups
+from cogs.exp_config import async_engine, EXP_CHANNEL_ID
 from cogs.database.recent_activity_table import recent_activity
 
 class ActivityToExpProcessor(commands.Cog):
@@ -27,24 +27,26 @@ class ActivityToExpProcessor(commands.Cog):
             print("[DEBUG]💬❌ Malta guild not found. Skipping.")
             return
 
-        with engine.begin() as conn:
-            results = conn.execute(select(recent_activity)).fetchall()
-            print(f"[DEBUG]💬☑️ Retrieved {len(results)} activity entries from database.")
-
-            for row in results:
-                user_id = str(row.user_id)
-                member = malta_guild.get_member(int(user_id))
-                if member:
-                    try:
-                        await process_user_activity(self.bot, user_id)
-                        print(f"[DEBUG]💬🗒️🖊️☑️ Entry for user ID {user_id} successfully processed.")
-                    except Exception as e:
-                        print(f"[ERROR]💬 Failed to process activity for user {user_id}: {e}")
-                else:
-                    print(f"[DEBUG]💬❌ User ID {user_id} not found in guild. Deleting entry.")
-
-                delete_stmt = recent_activity.delete().where(recent_activity.c.user_id == row.user_id)
-                conn.execute(delete_stmt)
+        async with async_engine.connect() as conn:
+            results = (await conn.execute(select(recent_activity))).fetchall()
+        print(f"[DEBUG]💬☑️ Retrieved {len(results)} activity entries from database.")
+
+        if not results:
+            return
+
+        active_ids = []
+        for row in results:
+            if malta_guild.get_member(int(row.user_id)):
+                active_ids.append(str(row.user_id))
+            else:
+                print(f"[DEBUG]💬❌ User ID {row.user_id} not found in guild. Deleting entry.")
+
+        # ⚡ One batch: single row load, single transaction for the EXP writes and the recent_activity cleanup
+        level_ups = await award_exp_batch(
+            malta_guild, active_ids, clear_recent_activity_ids=[row.user_id for row in results]
+        )
+        await announce_level_ups(malta_guild, level_ups, EXP_CHANNEL_ID)
+        print(f"[DEBUG]💬🗒️🖊️☑️ Processed {len(active_ids)} active user(s) in one batch.")
 
 async def setup(bot):
     await bot.add_cog(ActivityToExpProcessor(bot))
@@ -356,37 +356,23 @@ class AdminGroup(app_commands.Group):
         # Proceed with command execution
         await interaction.response.defer(thinking=True, ephemeral=True)
 
-        # Fetch all user IDs
-        user_ids = get_all_user_ids()
-        print(f"[DEBUG] Total users fetched: {len(user_ids)}")  # Debug: Log total number of users
+        from cogs.exp_engine import sweep_daily_multipliers
 
-        results = []
+        # Same single-statement sweep as the hourly loop
+        changed = await sweep_daily_multipliers(self.bot)
+        print(f"[DEBUG] Multiplier sweep changed {len(changed)} users")
 
-        for user_id in user_ids:
-            # Debug: Log user ID being processed
-            print(f"[DEBUG] Processing user ID: {user_id}")
-            await on_user_comment(user_id, self.bot)
-
-            # Fetch updated multiplier from database
-            user_data = get_user_data(user_id)
-            if not user_data:
-                print(f"[ERROR] No user data found for user ID: {user_id}")  # Debug: Error if no data found
-                continue
-
-            display = f"<@{user_id}> — 🏔️ Daily: {user_data['daily_multiplier']}x"
-            results.append(display)
-
-            # Debug: Log successful processing of user data
-            print(f"[DEBUG] Updated multiplier for user ID {user_id}: {user_data['daily_multiplier']}x")
-
-            await asyncio.sleep(0.1)  # prevent rate limits
-
-        result_text = "\n".join(results)
+        results = [f"<@{row.user_id}> — 🏔️ Daily: {row.daily_multiplier}x" for row in changed]
+        result_text = "\n".join(results) or "No multipliers needed changing."
         # Debug: Log final result text
         print(f"[DEBUG]🌀 Final result text for multiplier check: {result_text}")
 
+        # Stay under Discord's 2000 character limit
+        if len(result_text) > 1900:
+            result_text = result_text[:1900].rsplit("\n", 1)[0] + "\n…"
+
         await interaction.followup.send(
-            content=f"✖️ Multiplier check run for **{len(user_ids)} users**:\n\n{result_text}",
+            content=f"✖️ Multiplier check updated **{len(changed)} users**:\n\n{result_text}",
             ephemeral=True
         )
 
@@ -424,9 +410,11 @@ class AdminGroup(app_commands.Group):
 
         await interaction.response.defer(ephemeral=True)
 
+        from cogs.exp_utils import get_all_user_ids_async, get_user_data_async, update_user_data_async
+
         user_ids = []
         if all:
-            user_ids = get_all_user_ids()
+            user_ids = await get_all_user_ids_async()
             print(f"[DEBUG]🔧 Applying to all users, total: {len(user_ids)}")  # Debug: Total users affected
         elif users:
             user_ids = [str(users.id)]
@@ -434,7 +422,7 @@ class AdminGroup(app_commands.Group):
 
         updates = []
         for user_id in user_ids:
-            user_data = get_user_data(user_id)
+            user_data = await get_user_data_async(user_id)
             if not user_data:
                 updates.append(f"⚠️ <@{user_id}> — not found in DB.")
                 continue
@@ -446,7 +434,7 @@ class AdminGroup(app_commands.Group):
             print(f"🔧 [DEBUG] Updating {user_id} from {current}x to {new}x")
 
             # Do NOT update last_multiplier_update
-            update_user_data(
+            await update_user_data_async(
                 user_id,
                 user_data['multiplier'],
                 new,
@@ -474,11 +462,11 @@ class AdminGroup(app_commands.Group):
             if cog:
                 # Get guild and pending activity before triggering
                 guild = self.bot.get_guild(GUILD_ID)
-                engine = cog.engine
-                table = cog.recent_activity
-                with engine.begin() as conn:
-                    from sqlalchemy import select
-                    results = conn.execute(select(table)).fetchall()
+                from sqlalchemy import select
+                from cogs.exp_config import async_engine
+                from cogs.database.recent_activity_table import recent_activity
+                async with async_engine.connect() as conn:
+                    results = (await conn.execute(select(recent_activity))).fetchall()
                     if not results:
                         await interaction.response.send_message("🧼 No users in recent activity queue. Nothing to process.", ephemeral=True)
                         return
@@ -499,34 +487,29 @@ class AdminGroup(app_commands.Group):
             print(f"[ERROR] Failed to run manual activity check: {e}")
             await interaction.response.send_message(f"💢 Failed to run manual activity check:\n```{e}```", ephemeral=True)
 
-    @app_commands.command(name="crpg_trigger_voice_check", description="🔒 - 🧪📢 Manually trigger VoiceExpCog check.")
+    @app_commands.command(name="crpg_trigger_voice_check", description="🔒 - 🧪📢 Credit all open voice sessions now.")
     async def trigger_voice_check(self, interaction: discord.Interaction):
         if interaction.user.id != OWNER_ID:
             await interaction.response.send_message("⛔ You do not have permission to use this command.", ephemeral=True)
             return
 
         try:
-            from cogs.exp_voice import VoiceExpCog
             cog = self.bot.get_cog("VoiceExpCog")
             if not cog:
                 await interaction.response.send_message("💀 VoiceExpCog not found.", ephemeral=True)
                 return
 
-            processed = []
-            for guild in self.bot.guilds:
-                for vc in guild.voice_channels:
-                    for member in vc.members:
-                        if not member.bot:
-                            await cog.process_user_activity(self.bot, member.id)
-                            processed.append(f"🔊 <@{member.id}> in `#{vc.name}`")
-
-            if not processed:
-                await interaction.response.send_message("🔕 No eligible users found in voice channels.", ephemeral=True)
+            open_sessions = sum(1 for session in cog.sessions.values() if session["open"])
+            credited = await cog.credit_sessions(min_seconds=0)
+            if not credited:
+                await interaction.response.send_message("🔕 No open voice sessions to credit.", ephemeral=True)
                 return
 
-            result = "\n".join(processed)
+            result = "\n".join(f"🔊 <@{uid}> — `{seconds:.0f}s`" for uid, seconds in credited.items())
+            if len(result) > 1800:
+                result = result[:1800] + "\n…"
             await interaction.response.send_message(
-                f"📢 Voice check complete — processed `{len(processed)}` users:\n{result}",
+                f"📢 Voice credit complete — `{len(credited)}`/`{open_sessions}` open sessions credited:\n{result}",
                 ephemeral=True
             )
 
@@ -534,6 +517,163 @@ class AdminGroup(app_commands.Group):
             print(f"[ERROR] Failed to run manual voice check: {e}")
             await interaction.response.send_message(f"💢 Failed to run voice check:\n```{e}```", ephemeral=True)
 
+    @app_commands.command(name="crpg_cache_stats", description="🔒 - 🧪🧊 Show player cache hit/miss/flush counters.")
+    @app_commands.describe(flush="Write back dirty cached rows now (optional)")
+    async def cache_stats(self, interaction: discord.Interaction, flush: bool = False):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("⛔ You do not have permission to use this command.", ephemeral=True)
+            return
+
+        from cogs.exp_cache import player_cache
+
+        from cogs.x_utilities.member_resolver import member_resolver
+        from cogs.character.loadout_cache import loadout_cache
+
+        flushed = await player_cache.flush() if flush else 0
+        stats = player_cache.stats()
+        names = member_resolver.stats()
+        loadouts = loadout_cache.stats()
+        await interaction.response.send_message(
+            f"🧊 **Player cache**\n"
+            f"Cached rows: `{stats['cached']}` | Dirty: `{stats['dirty']}`\n"
+            f"Hits: `{stats['hits']}` | Misses: `{stats['misses']}` | Hit rate: `{stats['hit_rate']:.1%}`\n"
+            f"Flushes: `{stats['flushes']}` | Rows flushed: `{stats['rows_flushed']}` | Evictions: `{stats['evictions']}`"
+            + (f"\n🚿 Flushed `{flushed}` row(s) now." if flush else "")
+            + f"\n🪪 Name resolver — member cache `{names['member_hits']}` | TTL `{names['ttl_hits']}` | "
+              f"stored `{names['db_hits']}` | REST `{names['rest_calls']}`"
+            + f"\n🎽 Loadouts — cached `{loadouts['cached']}` | hits `{loadouts['hits']}` | "
+              f"misses `{loadouts['misses']}` | invalidations `{loadouts['invalidations']}`",
+            ephemeral=True
+        )
+
+    @app_commands.command(name="crpg_pipeline_stats", description="🔒 - 🧪🧵 Show per-stage message pipeline timings.")
+    async def pipeline_stats(self, interaction: discord.Interaction):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("⛔ You do not have permission to use this command.", ephemeral=True)
+            return
+
+        cog = self.bot.get_cog("MessagePipeline")
+        if not cog:
+            await interaction.response.send_message("💀 MessagePipeline cog not found.", ephemeral=True)
+            return
+
+        lines = [f"🧵 **Message pipeline** — `{cog.messages_processed}` messages processed"]
+        for name, timing in cog.stats().items():
+            lines.append(f"`{name}` — avg `{timing['avg_ms']:.1f}ms` | max `{timing['max_ms']:.1f}ms` | total `{timing['total_ms'] / 1000:.1f}s`")
+
+        from cogs.exp_cooldown import cooldown_index
+        cooldown = cooldown_index.stats()
+        lines.append(
+            f"⏳ Cooldown filter — filtered `{cooldown['filtered']}` | passed `{cooldown['passed']}` "
+            f"({cooldown['filtered_rate']:.1%} short-circuited, `{cooldown['tracked']}` players tracked)"
+        )
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+    @app_commands.command(name="crpg_announcer_stats", description="🔒 - 🧪📣 Show EXP channel digest counters.")
+    @app_commands.describe(flush="Post all buffered announcements now (optional)")
+    async def announcer_stats(self, interaction: discord.Interaction, flush: bool = False):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("⛔ You do not have permission to use this command.", ephemeral=True)
+            return
+
+        from cogs.exp_announcer import announcer
+
+        if flush:
+            await announcer.flush()
+        stats = announcer.stats()
+        await interaction.response.send_message(
+            f"📣 **Announcer** ({'buffering' if announcer.running else 'direct sends'})\n"
+            f"Events: `{stats['events']}` | Messages sent: `{stats['messages_sent']}` | Messages saved: `{stats['messages_saved']}`\n"
+            f"Currently buffered: `{stats['buffered']}`",
+            ephemeral=True
+        )
+
+    @app_commands.command(name="crpg_outbox_stats", description="🔒 - 🧪📮 Show outbound message queue depth and wait times.")
+    async def outbox_stats(self, interaction: discord.Interaction):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("⛔ You do not have permission to use this command.", ephemeral=True)
+            return
+
+        from cogs.message_scheduler import scheduler, histogram_labels
+
+        stats = scheduler.stats()
+        labels = histogram_labels()
+        lines = [f"📮 **Outbound scheduler** ({'queued' if scheduler.running else 'direct sends'}) — 429s hit: `{stats['rate_limited']}`"]
+        for name, lane in stats["lanes"].items():
+            histogram = " ".join(f"{label}:{count}" for label, count in zip(labels, lane["wait_histogram"]) if count)
+            lines.append(
+                f"`{name}` — depth `{lane['depth']}` | sent `{lane['sent']}` | dropped `{lane['dropped']}`"
+                + (f"\n    ⏱️ {histogram}" if histogram else "")
+            )
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+    @app_commands.command(name="crpg_relevel", description="🔒 - 🧪🌌 Recompute every player's level from EXP against the current curve.")
+    async def relevel(self, interaction: discord.Interaction):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("⛔ You do not have permission to use this command.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            from cogs.exp_progression import relevel_all_players
+            report = await relevel_all_players()
+        except Exception as e:
+            print(f"[ERROR] Failed to re-level players: {e}")
+            await interaction.followup.send(f"💢 Re-level failed:\n```{e}```", ephemeral=True)
+            return
+
+        await interaction.followup.send(
+            f"🌌 Re-level complete — scanned `{report['scanned']}`, moved `{report['changed']}` "
+            f"(⬆️ `{report['up']}` | ⬇️ `{report['down']}`)\n"
+            f"🪙 Heirloom eligibility: `+{report['newly_eligible']}` / `-{report['no_longer_eligible']}`",
+            ephemeral=True
+        )
+
+    @app_commands.command(name="crpg_reload_items", description="🔒 - 🧪🍯 Reload the store item catalog from the JSON files.")
+    async def reload_items(self, interaction: discord.Interaction):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("⛔ You do not have permission to use this command.", ephemeral=True)
+            return
+
+        try:
+            from cogs.store.item_catalog import catalog
+            catalog.load()
+            stats = catalog.stats()
+        except Exception as e:
+            print(f"[ERROR] Failed to reload item catalog: {e}")
+            await interaction.response.send_message(f"💢 Item reload failed:\n```{e}```", ephemeral=True)
+            return
+
+        await interaction.response.send_message(
+            f"🍯 Item catalog reloaded — `{stats['items']}` items from `{stats['files']}` file(s) "
+            f"across `{stats['categories']}` categories (load #{stats['loads']}).",
+            ephemeral=True
+        )
+
+    @app_commands.command(name="crpg_upkeep", description="🔒 - 🧪🔧 Run an upkeep billing cycle (dry run by default).")
+    @app_commands.describe(dry_run="Only report what would be charged and unequipped (default: True)")
+    async def upkeep(self, interaction: discord.Interaction, dry_run: bool = True):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("⛔ You do not have permission to use this command.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            from cogs.store.store_upkeep import run_upkeep_cycle
+            report = await run_upkeep_cycle(dry_run=dry_run)
+        except Exception as e:
+            print(f"[ERROR] Upkeep cycle failed: {e}")
+            await interaction.followup.send(f"💢 Upkeep cycle failed:\n```{e}```", ephemeral=True)
+            return
+
+        await interaction.followup.send(
+            f"🔧 Upkeep {'dry run' if report['dry_run'] else 'cycle'} — `{report['equipped_items']}` equipped items "
+            f"across `{report['players']}` players\n"
+            f"💰 Charged `{report['charged_players']}` players `{report['gold']:,}` gold | "
+            f"🧺 Unequipped `{report['unequipped']}` | ⏭️ Skipped `{report['skipped']}`",
+            ephemeral=True
+        )
+
     @app_commands.command(name="help", description="🔒 - 📕 Show a list of admin commands.")
     async def help(self, interaction: discord.Interaction):
         if not interaction.user.guild_permissions.administrator:
@@ -553,7 +693,14 @@ class AdminGroup(app_commands.Group):
             "🔒🧪🌀 /admin crpg_multi_check — Force a multiplier check for all users.\n\n"
             "🔒🧪🏔️ /admin crpg_adjust_daily_multiplier <users> <action> [value] [all] - Manually increase, decrease, or set the daily multiplier for one or more users, or apply to all users in the system.\n\n"
             "🔒🧪💬 /admin crpg_trigger_activity_check — Manually process recent user activity from the database.\n\n"
-            "🔒🧪📢 /admin crpg_trigger_voice_check — Manually process all active users in voice channels.\n\n"   
+            "🔒🧪📢 /admin crpg_trigger_voice_check — Credit all open voice sessions now.\n\n"   
+            "🔒🧪🧊 /admin crpg_cache_stats [flush] — Show player cache and name resolver counters, optionally writing back dirty rows.\n\n"
+            "🔒🧪📣 /admin crpg_announcer_stats [flush] — Show EXP channel digest counters, optionally posting buffered announcements.\n\n"
+            "🔒🧪📮 /admin crpg_outbox_stats — Show outbound message queue depth, drops and wait-time histograms.\n\n"
+            "🔒🧪🌌 /admin crpg_relevel — Recompute all stored levels from EXP after the level curve or cap changes.\n\n"
+            "🔒🧪🍯 /admin crpg_reload_items — Rebuild the store item catalog after editing the item JSON files.\n\n"
+            "🔒🧪🔧 /admin crpg_upkeep [dry_run] — Report (or run with dry_run False) the daily upkeep billing on equipped gear.\n\n"
+            "🔒🧪🧵 /admin crpg_pipeline_stats — Show per-stage message pipeline timings and EXP cooldown filter counters.\n\n"
         )
         await interaction.response.send_message(help_text, ephemeral=True)
 
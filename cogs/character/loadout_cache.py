@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from sqlalchemy import select
+
+from cogs.exp_config import async_engine
+from cogs.database.user_inventory_table import user_inventory
+from cogs.store.item_catalog import catalog
+
+DEBUG = True
+MAX_CACHED_LOADOUTS = 5000      # LRU bound on users whose equipped items are kept in memory
+TRAIL_COOLDOWN_DEFAULT = 3600   # 1 Hour
+
+
+class LoadoutCache:
+    """
+    Per-user equipped items (item_type -> entry with the resolved catalog item and
+    cooldown), loaded lazily with one query and kept until an inventory change
+    invalidates it. Users with nothing equipped are cached too, so the per-message
+    title/trail triggers don't touch the database once a user is loaded.
+    """
+
+    def __init__(self, max_size=MAX_CACHED_LOADOUTS):
+        self.max_size = max_size
+        self._loadouts = OrderedDict()   # user_id -> {item_type: entry} (LRU order, oldest first)
+        self._snapshot = None            # catalog snapshot the entries were resolved against
+        self._loading = {}               # user_id -> {"loads", "generation"} while a load is in flight; invalidate bumps
+                                         # the generation so that load can't store stale data
+        self._min_trail_cooldown = None
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_catalog(self):
+        if catalog.snapshot is not self._snapshot:
+            # Catalog reloaded: resolved items may have changed
+            self._loadouts.clear()
+            self._min_trail_cooldown = None
+            self._snapshot = catalog.snapshot
+
+    @property
+    def min_trail_cooldown(self):
+        """Shortest cooldown of any trail; before it has passed no trail can fire for anyone."""
+        self._check_catalog()
+        if self._min_trail_cooldown is None:
+            cooldowns = [trail.get("cooldown", TRAIL_COOLDOWN_DEFAULT) for trail in catalog.category("trails")]
+            self._min_trail_cooldown = min(cooldowns, default=TRAIL_COOLDOWN_DEFAULT)
+        return self._min_trail_cooldown
+
+    async def get(self, user_id):
+        user_id = int(user_id)
+        self._check_catalog()
+
+        loadout = self._loadouts.get(user_id)
+        if loadout is not None:
+            self.hits += 1
+            self._loadouts.move_to_end(user_id)
+            return loadout
+
+        self.misses += 1
+        loading = self._loading.setdefault(user_id, {"loads": 0, "generation": 0})
+        loading["loads"] += 1
+        generation = loading["generation"]
+        try:
+            async with async_engine.connect() as conn:
+                rows = (await conn.execute(
+                    select(user_inventory.c.item_id, user_inventory.c.item_type).where(
+                        (user_inventory.c.user_id == user_id) &
+                        (user_inventory.c.equipped == True)
+                    )
+                )).fetchall()
+        finally:
+            loading["loads"] -= 1
+            if not loading["loads"]:
+                del self._loading[user_id]
+
+        loadout = {}
+        for row in rows:
+            item = catalog.get(row.item_id)
+            if not item:
+                if DEBUG:
+                    print(f"[DEBUG]🎽 Equipped item '{row.item_id}' for {user_id} isn't in the catalog")
+                continue
+            # Several weapons/ammo can be equipped at once; triggers only need one per cosmetic type
+            loadout.setdefault(row.item_type, {
+                "item_id": row.item_id,
+                "item": item,
+                "cooldown": item.get("cooldown", TRAIL_COOLDOWN_DEFAULT),
+            })
+
+        if loading["generation"] == generation:
+            self._loadouts[user_id] = loadout
+            while len(self._loadouts) > self.max_size:
+                self._loadouts.popitem(last=False)
+        return loadout
+
+    async def equipped(self, user_id, item_type):
+        return (await self.get(user_id)).get(item_type)
+
+    def invalidate(self, *user_ids):
+        """Drop cached loadouts; call after any equip, unequip, add, remove or gift."""
+        for user_id in user_ids:
+            user_id = int(user_id)
+            loading = self._loading.get(user_id)
+            if loading is not None:
+                loading["generation"] += 1
+            if self._loadouts.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def stats(self):
+        return {
+            "cached": len(self._loadouts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+loadout_cache = LoadoutCache()
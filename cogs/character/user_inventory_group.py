@@ -5,9 +5,10 @@ from sqlalchemy.sql import select, update
 from sqlalchemy import or_
 
 from cogs.exp_config import EXP_CHANNEL_ID
-from cogs.store.store_utils import get_item_by_id
-from cogs.exp_config import engine
+from cogs.store.item_catalog import catalog
+from cogs.exp_config import async_engine
 from cogs.database.user_inventory_table import user_inventory
+from cogs.character.loadout_cache import loadout_cache
 
 
 
@@ -24,9 +25,9 @@ async def view_inventory(interaction: Interaction):
     if DEBUG:
         print(f"[DEBUG]👤🎒 Checking inventory for user {user_id}")
 
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         stmt = select(user_inventory).where(user_inventory.c.user_id == user_id)
-        results = conn.execute(stmt).fetchall()
+        results = (await conn.execute(stmt)).fetchall()
 
     equipped = [row for row in results if row.equipped]
     unequipped = [row for row in results if not row.equipped]
@@ -82,12 +83,12 @@ async def unequip_item(interaction: Interaction, item_id: str):
     if DEBUG:
         print(f"[DEBUG]👤📦❌ Attempting to unequip '{item_id}' for user {user_id}")
 
-    with engine.begin() as conn:
+    async with async_engine.begin() as conn:
         stmt = select(user_inventory).where(
             (user_inventory.c.user_id == user_id) &
             (user_inventory.c.item_id == item_id)
         )
-        result = conn.execute(stmt).fetchone()
+        result = (await conn.execute(stmt)).fetchone()
 
         if not result:
             if DEBUG:
@@ -105,7 +106,8 @@ async def unequip_item(interaction: Interaction, item_id: str):
             (user_inventory.c.user_id == user_id) &
             (user_inventory.c.item_id == item_id)
         ).values(equipped=False)
-        conn.execute(update_stmt)
+        await conn.execute(update_stmt)
+    loadout_cache.invalidate(user_id)
 
     if DEBUG:
         print(f"[DEBUG]👤📦✅ Unequipped item '{item_id}' for user {user_id}")
@@ -118,13 +120,13 @@ async def equip_item(interaction: Interaction, item_id: str):
     if DEBUG:
         print(f"[DEBUG]👤📦✅ Attempting to equip '{item_id}' for user {user_id}")
 
-    with engine.begin() as conn:
+    async with async_engine.begin() as conn:
         # Confirm ownership
         stmt = select(user_inventory).where(
             (user_inventory.c.user_id == user_id) &
             (user_inventory.c.item_id == item_id)
         )
-        result = conn.execute(stmt).fetchone()
+        result = (await conn.execute(stmt)).fetchone()
 
         if not result:
             if DEBUG:
@@ -149,7 +151,7 @@ async def equip_item(interaction: Interaction, item_id: str):
                 weapon_ammo_filters &
                 (user_inventory.c.equipped == True)
             )
-            equipped_count = len(conn.execute(count_stmt).fetchall())
+            equipped_count = len((await conn.execute(count_stmt)).fetchall())
             if equipped_count >= 4:
                 if DEBUG:
                     print(f"[DEBUG]👤📦❌ User {user_id} already has 4 equipped weapon/ammo items.")
@@ -162,13 +164,14 @@ async def equip_item(interaction: Interaction, item_id: str):
                 (user_inventory.c.user_id == user_id) &
                 (user_inventory.c.item_type == result.item_type)
             ).values(equipped=False)
-            conn.execute(unequip_stmt)
+            await conn.execute(unequip_stmt)
 
         equip_stmt = update(user_inventory).where(
             (user_inventory.c.user_id == user_id) &
             (user_inventory.c.item_id == item_id)
         ).values(equipped=True)
-        conn.execute(equip_stmt)
+        await conn.execute(equip_stmt)
+    loadout_cache.invalidate(user_id)
 
     if DEBUG:
         print(f"[DEBUG]👤📦✅ Equipped item '{item_id}' for user {user_id}")
@@ -186,12 +189,12 @@ async def gift_item(interaction: Interaction, item_id: str, member: discord.Memb
     if user_id == recipient_id:
         return await interaction.response.send_message("❌ You can't gift items to yourself.", ephemeral=True)
 
-    with engine.connect() as conn:
+    async with async_engine.connect() as conn:
         stmt = select(user_inventory).where(
             (user_inventory.c.user_id == user_id) &
             (user_inventory.c.item_id == item_id)
         )
-        result = conn.execute(stmt).fetchone()
+        result = (await conn.execute(stmt)).fetchone()
 
     if not result:
         return await interaction.response.send_message("❌ Item not found in your inventory.", ephemeral=True)
@@ -199,7 +202,7 @@ async def gift_item(interaction: Interaction, item_id: str, member: discord.Memb
     if result.item_type == "titles":
         return await interaction.response.send_message("❌ Titles cannot be gifted.", ephemeral=True)
 
-    item = get_item_by_id(item_id)
+    item = catalog.get(item_id)
     item_name = item.get("display", item_id)
 
     embed = discord.Embed(
@@ -217,16 +220,16 @@ async def gift_item(interaction: Interaction, item_id: str, member: discord.Memb
             if i.user.id != user_id:
                 return await i.response.send_message("❌ Not your confirmation.", ephemeral=True)
 
-            with engine.begin() as conn:
+            async with async_engine.begin() as conn:
                 # Remove from sender
-                conn.execute(
+                await conn.execute(
                     user_inventory.delete().where(
                         (user_inventory.c.user_id == user_id) &
                         (user_inventory.c.item_id == item_id)
                     )
                 )
                 # Add to recipient unequipped
-                conn.execute(
+                await conn.execute(
                     user_inventory.insert().values(
                         user_id=recipient_id,
                         item_id=item_id,
@@ -234,6 +237,7 @@ async def gift_item(interaction: Interaction, item_id: str, member: discord.Memb
                         equipped=False
                     )
                 )
+            loadout_cache.invalidate(user_id, recipient_id)
 
             # Public EXP post
             channel = interaction.client.get_channel(EXP_CHANNEL_ID)
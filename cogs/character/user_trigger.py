@@ -2,14 +2,12 @@ import time
 import discord
 import asyncio
 from discord.ext import commands
-from sqlalchemy.sql import select, update
 
-from cogs.exp_config import EXP_CHANNEL_ID, engine
-from cogs.exp_utils import players
-from cogs.database.user_inventory_table import user_inventory
-from cogs.store.store_utils import get_item_by_id
+from cogs.exp_config import EXP_CHANNEL_ID
+from cogs.exp_cache import player_cache
+from cogs.message_scheduler import scheduler, PRIORITY_BROADCAST
+from cogs.character.loadout_cache import loadout_cache, TRAIL_COOLDOWN_DEFAULT
 
-TRAIL_COOLDOWN_DEFAULT = 3600  # 1 Hour
 TITLE_COOLDOWN = 86400         # 24 hours
 DEBUG = True
 
@@ -17,63 +15,25 @@ class UserTriggers(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
-
-        user_id = str(message.author.id)
-
-        with engine.begin() as conn:
-            stmt = select(players).where(players.c.user_id == user_id)
-            row = conn.execute(stmt).fetchone()
-
-        if not row:
-            if DEBUG:
-                print(f"[DEBUG]👤 No player record found for {user_id}")
-            return
-
-        now = time.time()
-
+    # 🧵 Driven by the MessagePipeline cog, which fetches the player row once per message
+    async def maybe_trigger_title_announcement(self, message, user_id, row, now):
         # 🎗️ Title announcement
-        if now - row.last_title_announce_ts >= TITLE_COOLDOWN:
+        if now - row["last_title_announce_ts"] >= TITLE_COOLDOWN:
             if DEBUG:
                 print(f"[DEBUG]👑 Cooldown met — triggering title announcement for {user_id}")
             await self.trigger_title_announcement(message, user_id, now)
-        else:
-            if DEBUG:
-                remaining = TITLE_COOLDOWN - (now - row.last_title_announce_ts)
-                print(f"[DEBUG]⏳ Title cooldown active for {user_id}: {remaining:.0f}s remaining")
-
-        # ✨ Trail reaction
-        await self.trigger_trail_reaction(message, user_id, now, row.last_trail_trigger_ts)
-
 
     async def trigger_title_announcement(self, message, user_id, now):
-        with engine.begin() as conn:
-            conn.execute(
-                update(players).where(players.c.user_id == user_id).values(last_title_announce_ts=now)
-            )
-
-            # Fetch equipped title
-            stmt = select(user_inventory).where(
-                (user_inventory.c.user_id == user_id) &
-                (user_inventory.c.item_type == "titles") &
-                (user_inventory.c.equipped == True)
-            )
-            row = conn.execute(stmt).fetchone()
+        await player_cache.update(user_id, last_title_announce_ts=now)
 
-
-        if not row:
+        # Equipped title from the loadout cache (catalog data already resolved)
+        equipped = await loadout_cache.equipped(user_id, "titles")
+        if not equipped:
             if DEBUG:
                 print(f"[DEBUG]👑 No equipped title for {user_id}")
             return
 
-        title = get_item_by_id(row.item_id)
-        if not title:
-            if DEBUG:
-                print(f"[DEBUG]👑 Could not find title JSON for '{row.item_id}'")
-            return
+        title = equipped["item"]
 
         embed = discord.Embed(
             title=f"☩ {message.author.display_name} now bears the title:",
@@ -85,40 +45,30 @@ class UserTriggers(commands.Cog):
 
         channel = message.client.get_channel(EXP_CHANNEL_ID)
         if channel:
-            await channel.send(embed=embed)
+            await scheduler.send(channel, embed=embed, priority=PRIORITY_BROADCAST)
             if DEBUG:
                 print(f"[DEBUG]👑 Title embed sent for {user_id}")
 
     async def trigger_trail_reaction(self, message, user_id, now, last_ts):
-        with engine.begin() as conn:
-            stmt = select(user_inventory).where(
-                (user_inventory.c.user_id == user_id) &
-                (user_inventory.c.item_type == "trails") &
-                (user_inventory.c.equipped == True)
-            )
-            row = conn.execute(stmt).fetchone()
-
-            if not row:
-                if DEBUG:
-                    print(f"[DEBUG]✨ No equipped trail found for {user_id}")
-                return
+        # Still inside even the shortest trail cooldown: no trail can fire, so skip the lookup entirely
+        if now - last_ts < loadout_cache.min_trail_cooldown:
+            return
 
-            trail = get_item_by_id(row.item_id)
-            if not trail:
-                if DEBUG:
-                    print(f"[DEBUG]✨ Trail JSON not found for {row.item_id}")
-                return
+        equipped = await loadout_cache.equipped(user_id, "trails")
+        if not equipped:
+            if DEBUG:
+                print(f"[DEBUG]✨ No equipped trail found for {user_id}")
+            return
 
-            cooldown = trail.get("cooldown", TRAIL_COOLDOWN_DEFAULT)
-            if now - last_ts < cooldown:
-                if DEBUG:
-                    remaining = cooldown - (now - last_ts)
-                    print(f"[DEBUG]⏳ Trail '{row.item_id}' still on cooldown ({remaining:.0f}s) for {user_id}")
-                return
+        trail = equipped["item"]
+        cooldown = equipped["cooldown"]
+        if now - last_ts < cooldown:
+            if DEBUG:
+                remaining = cooldown - (now - last_ts)
+                print(f"[DEBUG]⏳ Trail '{equipped['item_id']}' still on cooldown ({remaining:.0f}s) for {user_id}")
+            return
 
-            conn.execute(
-                update(players).where(players.c.user_id == user_id).values(last_trail_trigger_ts=now)
-            )
+        await player_cache.update(user_id, last_trail_trigger_ts=now)
 
         emoji_data = trail.get("display", ["✨"])
         if isinstance(emoji_data, str):
@@ -129,7 +79,7 @@ class UserTriggers(commands.Cog):
             try:
                 await message.add_reaction(emoji)
                 if DEBUG:
-                    print(f"[DEBUG]✨ Trail '{row.item_id}' reaction '{emoji}' added for {user_id}")
+                    print(f"[DEBUG]✨ Trail '{equipped['item_id']}' reaction '{emoji}' added for {user_id}")
                 await asyncio.sleep(0.3)  # ⬅ Add this line to space each reaction
             except discord.HTTPException as e:
                 if DEBUG:
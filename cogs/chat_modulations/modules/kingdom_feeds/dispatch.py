@@ -3,6 +3,7 @@ import time
 import json
 from discord import Embed
 from cogs.exp_config import EXP_CHANNEL_ID
+from cogs.message_scheduler import scheduler, PRIORITY_REMINDER
 from cogs.database.achievement_table import log_maltachievement
 
 # Cooldown tracker per event type
@@ -58,6 +59,6 @@ def post_dynamic_embed(bot, interaction, event_key: str, context: dict, cooldown
     # Post to channel and log to achievements
     channel = bot.get_channel(EXP_CHANNEL_ID)
     if channel:
-        bot.loop.create_task(channel.send(embed=embed))
+        bot.loop.create_task(scheduler.send(channel, embed=embed, priority=PRIORITY_REMINDER))
         log_maltachievement(user_id=interaction.user.id, event_key=event_key, context=context)
         event_cooldowns[event_key] = now
@@ -6,6 +6,7 @@ from discord.ext import tasks
 
 from sqlalchemy.orm import Session
 from cogs.exp_config import EXP_CHANNEL_ID
+from cogs.message_scheduler import scheduler, PRIORITY_REMINDER
 from cogs.database.session import get_session
 from cogs.database.kingdomweather.weather_ts import weather_ts_table
 from sqlalchemy.dialects.postgresql import insert as pg_insert
@@ -166,7 +167,7 @@ async def post_weather(bot, triggered_by: str = "auto"):
     # Send to EXP channel
     channel = bot.get_channel(EXP_CHANNEL_ID)
     if channel:
-        await channel.send(embed=embed)
+        await scheduler.send(channel, embed=embed, priority=PRIORITY_REMINDER)
         print(f"[✅] Weather update posted to #{channel.name}")
         log_weather_to_db(weather, region, narrative, triggered_by)
 
@@ -7,7 +7,7 @@ import sqlalchemy as db
 
 from cogs.chat_modulations.modules.malta_time.malta_time import get_malta_datetime
 from cogs.database.malta_time.malta_time_table import malta_time_table
-from cogs.exp_config import engine
+from cogs.exp_config import async_engine
 
 
 class TimeAdminGroup(commands.GroupCog, name="time"):
@@ -38,13 +38,13 @@ class TimeAdminGroup(commands.GroupCog, name="time"):
     @app_commands.command(name="stats", description="📊 View Malta time tracking stats (admin only)")
     @app_commands.checks.has_permissions(administrator=True)
     async def time_stats(self, interaction: Interaction):
-        with engine.connect() as conn:
-            total_rows = conn.execute(db.select(db.func.count()).select_from(malta_time_table)).scalar()
-            last_entry = conn.execute(
+        async with async_engine.connect() as conn:
+            total_rows = (await conn.execute(db.select(db.func.count()).select_from(malta_time_table))).scalar()
+            last_entry = (await conn.execute(
                 db.select(malta_time_table)
                 .order_by(malta_time_table.c.id.desc())
                 .limit(1)
-            ).fetchone()
+            )).fetchone()
 
         if last_entry:
             embed = discord.Embed(
@@ -5,7 +5,7 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 import sqlalchemy as db
 
-from cogs.exp_config import engine
+from cogs.exp_config import async_engine
 from cogs.database.malta_time.malta_time_table import malta_time_table
 from cogs.chat_modulations.modules.malta_time.malta_time import get_malta_datetime, get_malta_datetime_string
 
@@ -21,10 +21,10 @@ async def log_malta_time_if_new(force: bool = False):
     malta_now = get_malta_datetime()
     malta_day_str = malta_now.strftime("%Y-%m-%d")
 
-    with engine.connect() as conn:
+    async with async_engine.begin() as conn:
         # 🛑 Check if today's Malta time already logged
         query = db.select(malta_time_table).order_by(malta_time_table.c.id.desc()).limit(1)
-        result = conn.execute(query).fetchone()
+        result = (await conn.execute(query)).fetchone()
 
         if result and result["malta_time"].strftime("%Y-%m-%d") == malta_day_str and not force:
             print(f"🛑 Malta time already logged for {malta_day_str}")
@@ -42,8 +42,7 @@ async def log_malta_time_if_new(force: bool = False):
             generated_by="auto"
         )
 
-        conn.execute(insert_stmt)
-        conn.commit()
+        await conn.execute(insert_stmt)
         print(f"✅ Logged new Malta time: {malta_day_str}")
 
 def determine_season(month: int) -> str:
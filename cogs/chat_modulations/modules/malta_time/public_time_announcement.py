@@ -6,7 +6,8 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 import sqlalchemy as db
 
-from cogs.exp_config import engine, EXP_CHANNEL_ID
+from cogs.exp_config import async_engine, EXP_CHANNEL_ID
+from cogs.message_scheduler import scheduler, PRIORITY_REMINDER
 from cogs.database.malta_time.malta_time_table import malta_time_table
 from cogs.chat_modulations.modules.malta_time.malta_time import get_malta_datetime, get_malta_datetime_string
 
@@ -16,12 +17,12 @@ async def post_daily_malta_time(bot):
     malta_day_str = now.strftime("%Y-%m-%d")
     hour = now.hour
 
-    with engine.connect() as conn:
-        result = conn.execute(
+    async with async_engine.connect() as conn:
+        result = (await conn.execute(
             db.select(malta_time_table)
             .order_by(malta_time_table.c.id.desc())
             .limit(1)
-        ).fetchone()
+        )).fetchone()
 
         # Only skip if it's midnight post and already posted today
         if result and result["malta_time"].strftime("%Y-%m-%d") == malta_day_str and hour < 5:
@@ -59,7 +60,7 @@ async def post_daily_malta_time(bot):
 
     channel = bot.get_channel(EXP_CHANNEL_ID)
     if channel:
-        await channel.send(embed=embed)
+        await scheduler.send(channel, embed=embed, priority=PRIORITY_REMINDER)
         print(f"✅ Malta time post sent at Malta hour {hour}: {malta_day_str}")
     else:
         print("❌ EXP_CHANNEL_ID not found.")
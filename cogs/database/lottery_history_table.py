@@ -8,5 +8,7 @@ lottery_history = db.Table(
     db.Column("winner_id", db.BigInteger, nullable=False),
     db.Column("winner_name", db.String, nullable=False),
     db.Column("jackpot", db.Integer, nullable=False),
-    db.Column("tickets_sold", db.Integer, nullable=False)
+    db.Column("tickets_sold", db.Integer, nullable=False),
+    db.Column("tier", db.Integer, nullable=False, server_default="1"),  # 1 = jackpot winner
+    db.Column("seed", db.String, nullable=True)                           # RNG seed, replays the draw
 )
\ No newline at end of file
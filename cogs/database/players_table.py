@@ -15,4 +15,5 @@ players = db.Table(
     db.Column("last_multiplier_update", db.Float, nullable=False, default=0.0),
     db.Column("last_title_announce_ts", db.Float, nullable=False, default=0.0),
     db.Column("last_trail_trigger_ts", db.Float, nullable=False, default=0.0),
+    db.Column("display_name", db.String, nullable=True),
 )
\ No newline at end of file
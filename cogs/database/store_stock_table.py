@@ -0,0 +1,12 @@
+import sqlalchemy as db
+from cogs.database.meta import metadata
+
+# Mutable shop state; the item JSON files are read-only catalog data.
+# stock NULL = not stock-tracked (unlimited), price NULL = use the catalog price.
+store_stock = db.Table(
+    "store_stock", metadata,
+    db.Column("item_id", db.String, primary_key=True),
+    db.Column("stock", db.Integer, nullable=True),
+    db.Column("price", db.Integer, nullable=True),
+    db.Column("updated_at", db.DateTime, nullable=False, server_default=db.func.now(), onupdate=db.func.now()),
+)
@@ -19,3 +19,6 @@ transactions = db.Table(
     db.Column("timestamp", db.DateTime(timezone=True), default=now_cst),
 )
 
+# Serves wallet history keyset pagination: WHERE user_id = ? AND (timestamp, id) < (?, ?) ORDER BY timestamp DESC, id DESC
+transactions_history_index = db.Index("ix_transactions_user_ts_id", transactions.c.user_id, transactions.c.timestamp, transactions.c.id)
+
@@ -0,0 +1,134 @@
+import time
+from collections import defaultdict
+from discord.ext import commands, tasks
+
+from cogs.message_scheduler import scheduler, PRIORITY_BROADCAST
+
+DEBUG = True
+ANNOUNCE_WINDOW_SECONDS = 60   # How long events are buffered before a digest is posted
+ANNOUNCE_MAX_BATCH = 15        # Post early once a channel/category buffer reaches this many events
+MAX_MESSAGE_LENGTH = 2000      # Discord message limit
+
+# Digest headers per category; {count} is the number of merged events
+DIGEST_HEADERS = {
+    "exp": "⚡ **{count} members gained EXP**",
+    "gamble": "♠️ ♥️ ♦️ ♣️ **{count} gambling results**",
+    "lottery": "🎟️ **{count} lottery ticket purchases**",
+    "shop": "🍯🛒 **{count} shop purchases**",
+    "multiplier": "🏔️ **{count} daily multiplier updates**",
+}
+
+
+class Announcer:
+    """
+    Buffers routine EXP-channel announcements (EXP ticks, gambling results,
+    lottery and shop purchases) and posts them as merged digest messages.
+    Level-ups and other one-off embeds never go through the buffer.
+    """
+
+    def __init__(self, window=ANNOUNCE_WINDOW_SECONDS, max_batch=ANNOUNCE_MAX_BATCH):
+        self.window = window
+        self.max_batch = max_batch
+        self.running = False              # Set while the Announcer cog's flush loop is active
+        self._buffers = defaultdict(list) # (channel_id, category) -> [lines]
+        self._channels = {}               # channel_id -> channel
+        self._first_ts = {}               # (channel_id, category) -> time of oldest buffered line
+
+        self.events = 0
+        self.messages_sent = 0
+
+    async def announce(self, channel, category, line):
+        """Queue a one-line announcement. Falls back to an immediate send if the announcer isn't running."""
+        self.events += 1
+        if not self.running:
+            await self._send(channel, line)
+            return
+
+        key = (channel.id, category)
+        self._channels[channel.id] = channel
+        self._buffers[key].append(line)
+        self._first_ts.setdefault(key, time.monotonic())
+
+        if len(self._buffers[key]) >= self.max_batch:
+            await self.flush(key)
+
+    async def flush(self, key=None, due_only=False):
+        keys = [key] if key else list(self._buffers)
+        now = time.monotonic()
+        for k in keys:
+            if due_only and now - self._first_ts.get(k, now) < self.window:
+                continue
+            lines = self._buffers.pop(k, [])
+            self._first_ts.pop(k, None)
+            if not lines:
+                continue
+
+            channel_id, category = k
+            channel = self._channels.get(channel_id)
+            if not channel:
+                continue
+
+            for content in build_digest(category, lines):
+                await self._send(channel, content)
+
+            if DEBUG:
+                print(f"[DEBUG]📣 Posted {category} digest of {len(lines)} event(s) to #{getattr(channel, 'name', channel_id)}")
+
+    async def _send(self, channel, content):
+        self.messages_sent += 1
+        await scheduler.send(channel, content, priority=PRIORITY_BROADCAST)
+
+    def stats(self):
+        return {
+            "events": self.events,
+            "messages_sent": self.messages_sent,
+            "messages_saved": max(self.events - self.messages_sent, 0),
+            "buffered": sum(len(lines) for lines in self._buffers.values()),
+        }
+
+
+def build_digest(category, lines):
+    """Merge buffered lines into as few messages as fit under Discord's length limit."""
+    if len(lines) == 1:
+        return [lines[0]]
+
+    header = DIGEST_HEADERS.get(category, "📣 **{count} updates**").format(count=len(lines))
+    messages = []
+    current = header
+    for line in lines:
+        if len(current) + len(line) + 1 > MAX_MESSAGE_LENGTH:
+            messages.append(current)
+            current = line
+        else:
+            current += "\n" + line
+    messages.append(current)
+    return messages
+
+
+announcer = Announcer()
+
+
+class AnnouncerCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        announcer.running = True
+        self.flush_loop.start()
+        print("[DEBUG]📣 Announcer loaded. Buffering EXP channel announcements.")
+
+    async def cog_unload(self):
+        self.flush_loop.cancel()
+        announcer.running = False
+        await announcer.flush()
+
+    @tasks.loop(seconds=5)
+    async def flush_loop(self):
+        try:
+            await announcer.flush(due_only=True)
+        except Exception as e:
+            print(f"[ERROR]📣 Announcer flush failed: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(AnnouncerCog(bot))
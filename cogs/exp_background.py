@@ -8,16 +8,21 @@ from discord.ext import commands
 from cogs.exp_config import (
     EXP_CHANNEL_ID, TIME_DELTA,
     EXP_COOLDOWN,
-    engine, players, db,
+    async_engine, players, db,
 )
 
 from cogs.exp_utils import (
-    get_multiplier, get_heirloom_points, get_user_data,
+    get_multiplier, get_heirloom_points, get_user_data_async,
 )
 
 from cogs.exp_engine import (
     handle_exp_gain, on_user_comment, check_and_reset_multiplier,
 )
+from cogs.exp_cache import player_cache
+from cogs.x_utilities.member_resolver import member_resolver
+from cogs.exp_leaderboard import leaderboard_index
+from cogs.exp_progression import exp_to_next_level, level_progress
+from cogs.message_scheduler import scheduler, PRIORITY_FOLLOWUP
 
 class ExpBackground(commands.Cog):
     def __init__(self, bot):
@@ -25,7 +30,21 @@ class ExpBackground(commands.Cog):
 
 
 exp_channel = None
-last_leaderboard_timestamp = 0
+
+
+def rank_line(user_id):
+    """'🏆 Rank: #n of m' from the leaderboard index, or '' if the index isn't loaded."""
+    if not leaderboard_index.ready:
+        return ""
+    rank = leaderboard_index.rank(user_id)
+    return f"\n🏆 Rank: #{rank} of {len(leaderboard_index)}" if rank else ""
+
+
+def progress_line(exp):
+    remaining = exp_to_next_level(exp)
+    if remaining is None:
+        return "\n📈 Level cap reached"
+    return f"\n📈 Next level: {remaining} EXP to go ({level_progress(exp):.0f}%)"
 
 class CRPGGroup(app_commands.Group):
     def __init__(self, bot):
@@ -38,88 +57,99 @@ class CRPGGroup(app_commands.Group):
         user_id = str(interaction.user.id)
         exp_channel = self.bot.get_channel(EXP_CHANNEL_ID)  # Ensure EXP_CHANNEL_ID is defined
 
-        with engine.connect() as conn:
-            result = conn.execute(db.select(players).where(players.c.user_id == user_id)).fetchone()
-
-            if not result:
-                await interaction.response.send_message(
-                    "⚠️ You have no EXP record yet. Start participating to gain experience.",
-                    ephemeral=True
-                )
-                return
-
-            if result.level < 31 or result.level > 38:
-                await interaction.response.send_message(
-                    "⚠️ You can only retire between levels 31 - 38.", ephemeral=True
-                )
-                return
+        result = await get_user_data_async(user_id)
 
+        if not result:
             await interaction.response.send_message(
-                f"🛡️ Are you sure you want to retire? You will reset your level, EXP, and gold.\n"
-                f"Type your username (`{interaction.user.name}`) to confirm.",
+                "⚠️ You have no EXP record yet. Start participating to gain experience.",
                 ephemeral=True
             )
+            return
 
-            def check(m):
-                return m.author == interaction.user and m.content == interaction.user.name
-
-            try:
-                msg = await self.bot.wait_for("message", timeout=60.0, check=check)
-            except asyncio.TimeoutError:
-                await interaction.followup.send("🏰 Retirement cancelled (timeout).", ephemeral=True)
-                return
-
-
-            heirloom_gain = get_heirloom_points(result.level)
-            new_retire_count = result.retirements + 1
-            new_total_heirlooms = result.heirloom_points + heirloom_gain
-            multiplier = get_multiplier(new_retire_count)
-
-            bonus_note = ""
-            if new_retire_count > 16:
-                bonus_note = "⚖️ Multiplier is capped at 1.48x, but you still can earn heirloom point(s)."
-
-            conn.execute(players.update().where(players.c.user_id == user_id).values(
-                exp=0,
-                level=0,
-                retirements=new_retire_count,
-                heirloom_points=new_total_heirlooms
-            ))
-            conn.commit()
-
-            if exp_channel:
-                await exp_channel.send(
-                    f"🪦 {interaction.user.mention} has retired and earned 🪙 **{heirloom_gain} heirloom point(s)**!\n"
-                    f"Total retirements: `{new_retire_count}` → Multiplier: `{multiplier:.2f}x`\n"
-                    f"All progress reset. Start your journey anew!\n"
-                    f"{bonus_note}"
-                )
+        if result["level"] < 31 or result["level"] > 38:
+            await interaction.response.send_message(
+                "⚠️ You can only retire between levels 31 - 38.", ephemeral=True
+            )
+            return
+
+        await interaction.response.send_message(
+            f"🛡️ Are you sure you want to retire? You will reset your level, EXP, and gold.\n"
+            f"Type your username (`{interaction.user.name}`) to confirm.",
+            ephemeral=True
+        )
+
+        def check(m):
+            return m.author == interaction.user and m.content == interaction.user.name
+
+        # ⏳ No connection is held while waiting on the user
+        try:
+            msg = await self.bot.wait_for("message", timeout=60.0, check=check)
+        except asyncio.TimeoutError:
+            await interaction.followup.send("🏰 Retirement cancelled (timeout).", ephemeral=True)
+            return
+
+
+        heirloom_gain = get_heirloom_points(result["level"])
+        new_retire_count = result["retirements"] + 1
+        new_total_heirlooms = result["heirloom_points"] + heirloom_gain
+        multiplier = get_multiplier(new_retire_count)
+
+        bonus_note = ""
+        if new_retire_count > 16:
+            bonus_note = "⚖️ Multiplier is capped at 1.48x, but you still can earn heirloom point(s)."
+
+        await player_cache.update(
+            user_id,
+            exp=0,
+            level=0,
+            retirements=new_retire_count,
+            heirloom_points=new_total_heirlooms
+        )
+
+        if exp_channel:
+            await scheduler.send(
+                exp_channel,
+                f"🪦 {interaction.user.mention} has retired and earned 🪙 **{heirloom_gain} heirloom point(s)**!\n"
+                f"Total retirements: `{new_retire_count}` → Multiplier: `{multiplier:.2f}x`\n"
+                f"All progress reset. Start your journey anew!\n"
+                f"{bonus_note}",
+                priority=PRIORITY_FOLLOWUP
+            )
 
 
     @app_commands.command(name="stats", description="⚗️ - 📊 View your own stats (level, gold, EXP, etc.)")
     async def stats(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
 
-        with engine.connect() as conn:
-            query = players.select().where(players.c.user_id == user_id)
-            result = conn.execute(query).fetchone()
+        result = await get_user_data_async(user_id)
 
-            if not result:
-                await interaction.response.send_message("You have no stats yet.", ephemeral=True)
-                return
+        if not result:
+            await interaction.response.send_message("You have no stats yet.", ephemeral=True)
+            return
 
-            level = result.level
-            exp = result.exp
-            gold = result.gold
-            retirements = result.retirements
-            heirloom_points = result.heirloom_points
+        level = result["level"]
+        exp = result["exp"]
+        gold = result["gold"]
+        retirements = result["retirements"]
+        heirloom_points = result["heirloom_points"]
+
+        nearby = ""
+        if leaderboard_index.ready:
+            neighbours = leaderboard_index.around(user_id, radius=2)
+            if len(neighbours) > 1:
+                nearby = "\n\n**Around you**\n" + "\n".join(
+                    f"{'➡️' if entry['user_id'] == user_id else '▫️'} #{rank} <@{entry['user_id']}> — "
+                    f"🌱 {entry['retirements']} | 🌌 {entry['level']} | 💰 {entry['gold']}"
+                    for rank, entry in neighbours
+                )
 
-            await interaction.response.send_message(
-                f"📜 Stats for **{interaction.user.display_name}'s Profile**\n"
-                f"🌌 Level: {level}\n⚡ EXP: {exp}\n💰 Gold: {gold}\n"
-                f"🌱 Generation: {retirements}\n🪙 Heirloom Points: {heirloom_points}",
-                ephemeral=True
-            )
+        await interaction.response.send_message(
+            f"📜 Stats for **{interaction.user.display_name}'s Profile**\n"
+            f"🌌 Level: {level}\n⚡ EXP: {exp}\n💰 Gold: {gold}\n"
+            f"🌱 Generation: {retirements}\n🪙 Heirloom Points: {heirloom_points}"
+            f"{progress_line(exp)}{rank_line(user_id)}{nearby}",
+            ephemeral=True
+        )
 
 
 
@@ -128,44 +158,29 @@ class CRPGGroup(app_commands.Group):
     async def profile(self, interaction: discord.Interaction, user: discord.User):
         user_id = str(user.id)
 
-        with engine.connect() as conn:
-            result = conn.execute(players.select().where(players.c.user_id == user_id)).fetchone()
+        result = await get_user_data_async(user_id)
 
-            if not result:
-                await interaction.response.send_message(f"{user.display_name} has no stats yet.", ephemeral=True)
-                return
+        if not result:
+            await interaction.response.send_message(f"{user.display_name} has no stats yet.", ephemeral=True)
+            return
 
-            level = result.level
-            exp = result.exp
-            gold = result.gold
-            retirements = result.retirements
-            heirloom_points = result.heirloom_points
+        level = result["level"]
+        exp = result["exp"]
+        gold = result["gold"]
+        retirements = result["retirements"]
+        heirloom_points = result["heirloom_points"]
 
-            await interaction.response.send_message(
-                f"📜 **{user.display_name}'s Profile**\n"
-                f"🌌 Level: {level}\n⚡ EXP: {exp}\n💰 Gold: {gold}\n"
-                f"🌱 Generation: {retirements}\n🪙 Heirloom Points: {heirloom_points}",
-                ephemeral=True
-            )
+        await interaction.response.send_message(
+            f"📜 **{user.display_name}'s Profile**\n"
+            f"🌌 Level: {level}\n⚡ EXP: {exp}\n💰 Gold: {gold}\n"
+            f"🌱 Generation: {retirements}\n🪙 Heirloom Points: {heirloom_points}"
+            f"{rank_line(user_id)}",
+            ephemeral=True
+        )
 
 
     @app_commands.command(name="leaderboard", description="⚗️ - 🏆 Show top 10 players by generation, level, gold, and EXP.")
     async def leaderboard(self, interaction: discord.Interaction):
-        global last_leaderboard_timestamp
-
-        now = time.time()
-        cooldown_seconds = 600  # 10 minutes
-
-        if now - last_leaderboard_timestamp < cooldown_seconds:
-            remaining = int(cooldown_seconds - (now - last_leaderboard_timestamp))
-            await interaction.response.send_message(
-                f"⏳ Leaderboard is on cooldown. Try again in {remaining} seconds.",
-                ephemeral=True
-            )
-            return
-
-        last_leaderboard_timestamp = now
-
         exp_channel = self.bot.get_channel(EXP_CHANNEL_ID)
 
         # Ensure exp_channel is correctly assigned
@@ -173,35 +188,44 @@ class CRPGGroup(app_commands.Group):
             await interaction.response.send_message("Error: Leaderboard channel not found.", ephemeral=True)
             return
 
-        with engine.connect() as conn:
-            query = players.select().order_by(
-                players.c.retirements.desc(),
-                players.c.level.desc(),
-                players.c.gold.desc(),
-                players.c.exp.desc()
-            ).limit(10)
-            results = conn.execute(query).fetchall()
-
-            if not results:
-                await exp_channel.send("No players on the leaderboard yet.")
-            else:
-                leaderboard_text = "**🏆 Leaderboard**\n\n"
-                for i, result in enumerate(results, start=1):
-                    user_id = result.user_id
-                    user = await self.bot.fetch_user(user_id)
-                    name = user.display_name
-                    exp = result.exp
-                    level = result.level
-                    gold = result.gold
-                    retirements = result.retirements
+        if leaderboard_index.ready:
+            # 🏆 Served from the in-memory ranked index; no query and no cooldown needed
+            results = leaderboard_index.top(10)
+        else:
+            # Write back pending cached changes so the ranking reflects them
+            await player_cache.flush()
+
+            async with async_engine.connect() as conn:
+                query = players.select().order_by(
+                    players.c.retirements.desc(),
+                    players.c.level.desc(),
+                    players.c.gold.desc(),
+                    players.c.exp.desc()
+                ).limit(10)
+                results = [dict(row._mapping) for row in (await conn.execute(query)).fetchall()]
+
+        if not results:
+            await scheduler.send(exp_channel, "No players on the leaderboard yet.", priority=PRIORITY_FOLLOWUP)
+        else:
+            # 🪪 Member cache / TTL cache / stored names first; REST only for unknown users, batched
+            names = await member_resolver.display_names(self.bot, [result["user_id"] for result in results])
+            leaderboard_text = "**🏆 Leaderboard**\n\n"
+            for i, result in enumerate(results, start=1):
+                name = names[str(result["user_id"])]
+                exp = result["exp"]
+                level = result["level"]
+                gold = result["gold"]
+                retirements = result["retirements"]
+
+                leaderboard_text += (
+                    f"## **{i}. {name}**\n"
+                    f"🌱 Gen: {retirements} | 🌌 Lvl: {level} | 💰 Gold: {gold} | ⚡ EXP: {exp}\n"
+                )
 
-                    leaderboard_text += (
-                        f"## **{i}. {name}**\n"
-                        f"🌱 Gen: {retirements} | 🌌 Lvl: {level} | 💰 Gold: {gold} | ⚡ EXP: {exp}\n"
-                    )
+            # Send the formatted leaderboard message
+            await scheduler.send(exp_channel, leaderboard_text, priority=PRIORITY_FOLLOWUP)
 
-                # Send the formatted leaderboard message
-                await exp_channel.send(leaderboard_text)
+        await interaction.response.send_message(f"🏆 Leaderboard posted in {exp_channel.mention}.", ephemeral=True)
 
 
 
@@ -211,35 +235,34 @@ class CRPGGroup(app_commands.Group):
         user_id = str(interaction.user.id)
         current_ts = time.time()
 
-        with engine.connect() as conn:
-            result = conn.execute(db.select(players).where(players.c.user_id == user_id)).fetchone()
-
-            if result:
-                elapsed_time = current_ts - result.last_message_ts
-                remaining_cooldown = EXP_COOLDOWN - elapsed_time
-
-                if remaining_cooldown > 0:
-                    minutes, seconds = divmod(int(remaining_cooldown), 60)
-                    await interaction.response.send_message(
-                        f"⏳ You have **{minutes} minutes & {seconds} seconds** left until your next available ⚡ experience & 💰 gold tick.",
-                        ephemeral=True
-                    )
-                else:
-                    await interaction.response.send_message(
-                        "You're ready for your next ⚡ experience & 💰 gold tick.",
-                        ephemeral=True
-                    )
+        result = await get_user_data_async(user_id)
+
+        if result:
+            elapsed_time = current_ts - result["last_message_ts"]
+            remaining_cooldown = EXP_COOLDOWN - elapsed_time
+
+            if remaining_cooldown > 0:
+                minutes, seconds = divmod(int(remaining_cooldown), 60)
+                await interaction.response.send_message(
+                    f"⏳ You have **{minutes} minutes & {seconds} seconds** left until your next available ⚡ experience & 💰 gold tick.",
+                    ephemeral=True
+                )
             else:
                 await interaction.response.send_message(
-                    "You have no EXP record yet. Start participating to earn ⚡ experience & 💰 gold.",
+                    "You're ready for your next ⚡ experience & 💰 gold tick.",
                     ephemeral=True
                 )
+        else:
+            await interaction.response.send_message(
+                "You have no EXP record yet. Start participating to earn ⚡ experience & 💰 gold.",
+                ephemeral=True
+            )
 
     @app_commands.command(name="multipliers", description="⚗️ - 🏔️ Your multiplier information.")
     async def next_multiplier(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
         current_time = int(time.time())
-        user_data = get_user_data(user_id)
+        user_data = await get_user_data_async(user_id)
 
         if not user_data:
             await interaction.response.send_message("🚫 You have no EXP record yet. Start participating to gain experience.", ephemeral=True)
@@ -0,0 +1,387 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from discord.ext import commands, tasks
+from sqlalchemy import select, bindparam
+
+from cogs.exp_config import players, async_engine
+
+DEBUG = True
+MAX_CACHED_PLAYERS = 5000      # LRU bound on hot player rows kept in memory
+FLUSH_INTERVAL_SECONDS = 30    # Write-behind interval for dirty rows
+
+
+class PlayerStateCache:
+    """
+    Process-wide write-behind cache for `players` rows.
+    Reads are served from memory, mutations mark columns dirty and are
+    flushed to the database in batches (on an interval and on shutdown).
+    Without the PlayerCacheFlusher running, every mutation is written through.
+
+    Counters (gold, exp) should change through `update(add=...)`: they are kept as
+    pending deltas and flushed as `col = col + delta`, so they compose with the
+    delta UPDATEs adjust_player and the bulk writers run against the table.
+    """
+
+    def __init__(self, max_size=MAX_CACHED_PLAYERS):
+        self.max_size = max_size
+        self.running = False         # Set while the PlayerCacheFlusher loop is active
+        self._rows = OrderedDict()   # user_id -> row dict (LRU order, oldest first)
+        self._dirty = {}             # user_id -> {column: value} to SET on the next flush
+        self._deltas = {}            # user_id -> {column: amount} to ADD on the next flush
+        self._writers = {}           # user_id -> lock/holder for raw SQL writes in flight (see writing())
+        self._flush_lock = asyncio.Lock()
+        self._listeners = []         # callables(user_id, row) run after every in-memory mutation
+
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.evictions = 0
+
+    # === Reads ===
+    async def get(self, user_id):
+        """Return a copy of the player row as a dict, or None if the player doesn't exist."""
+        user_id = str(user_id)
+        row = self._rows.get(user_id)
+        if row is not None:
+            self.hits += 1
+            self._rows.move_to_end(user_id)
+            return dict(row)
+
+        self.misses += 1
+        async with async_engine.connect() as conn:
+            result = (await conn.execute(select(players).where(players.c.user_id == user_id))).fetchone()
+
+        if not result:
+            return None
+
+        # Another coroutine may have loaded (and mutated) the row while we awaited
+        row = self._rows.get(user_id)
+        if row is None:
+            row = self._load(user_id, result)
+        return dict(row)
+
+    async def get_many(self, user_ids):
+        """Return {user_id: row} for the players that exist, loading all misses with a single query."""
+        found = {}
+        missing = []
+        for uid in map(str, user_ids):
+            row = self._rows.get(uid)
+            if row is not None:
+                self.hits += 1
+                self._rows.move_to_end(uid)
+                found[uid] = dict(row)
+            else:
+                missing.append(uid)
+
+        if missing:
+            self.misses += len(missing)
+            async with async_engine.connect() as conn:
+                result = await conn.execute(select(players).where(players.c.user_id.in_(missing)))
+                loaded = result.fetchall()
+            for result_row in loaded:
+                uid = str(result_row.user_id)
+                row = self._rows.get(uid)
+                if row is None:
+                    row = self._load(uid, result_row)
+                found[uid] = dict(row)
+        return found
+
+    def peek(self, user_id):
+        """Return the cached row without loading it or touching the counters/LRU order."""
+        row = self._rows.get(str(user_id))
+        return dict(row) if row is not None else None
+
+    # === Writes ===
+    async def update(self, user_id, add=None, **values):
+        """
+        Apply column changes in memory and mark them dirty: `values` are set, `add` is a
+        {column: amount} of increments. Returns False if the player doesn't exist.
+        """
+        user_id = str(user_id)
+        if user_id not in self._rows and await self.get(user_id) is None:
+            return False
+
+        row = self._rows[user_id]
+        dirty = self._dirty.setdefault(user_id, {})
+        for column, value in values.items():
+            row[column] = value
+            dirty[column] = value
+            if column in self._deltas.get(user_id, {}):
+                # A set supersedes earlier increments
+                del self._deltas[user_id][column]
+                if not self._deltas[user_id]:
+                    del self._deltas[user_id]
+        for column, amount in (add or {}).items():
+            row[column] += amount
+            if column in dirty:
+                dirty[column] = row[column]
+            else:
+                deltas = self._deltas.setdefault(user_id, {})
+                deltas[column] = deltas.get(column, 0) + amount
+        if not dirty:
+            del self._dirty[user_id]
+        self._rows.move_to_end(user_id)
+        self._notify(user_id, row)
+        if not self.running:
+            await self.flush(only=[user_id])
+        return True
+
+    async def insert(self, user_id, **values):
+        """Create a new player row. Inserts are written through immediately."""
+        user_id = str(user_id)
+        row = {column.name: column.default.arg if column.default is not None else None for column in players.columns}
+        row.update(values, user_id=user_id)
+
+        async with async_engine.begin() as conn:
+            await conn.execute(players.insert().values(**row))
+
+        self._store(user_id, row)
+        self._notify(user_id, row)
+        return dict(row)
+
+    def apply(self, user_id, **values):
+        """
+        Refresh a cached row with values already committed to the database (not marked dirty).
+        Pending increments are re-added and pending sets kept, so the row still matches what
+        the table will hold after the next flush. Call it inside writing() for the same user.
+        """
+        user_id = str(user_id)
+        row = self._rows.get(user_id)
+        if row is None:
+            # Not cached: listeners still need the committed values (partial row)
+            self._notify(user_id, dict(values))
+            return
+        dirty = self._dirty.get(user_id, {})
+        deltas = self._deltas.get(user_id, {})
+        for column, value in values.items():
+            if column not in dirty:
+                row[column] = value + deltas.get(column, 0)
+        self._notify(user_id, row)
+
+    def discard(self, user_id):
+        """
+        Drop a cached row without flushing it, e.g. after a transaction that called apply() rolled
+        back. Pending changes are kept and laid over the row when it is next loaded.
+        """
+        self._rows.pop(str(user_id), None)
+
+    @asynccontextmanager
+    async def writing(self, *user_ids):
+        """
+        Wrap a raw SQL write to these players' rows (adjust_player, bulk debits) up to its apply().
+        Writes to the same player are serialized and their pending changes aren't flushed
+        meanwhile, so the RETURNING values handed to apply() exclude exactly the pending deltas.
+        Re-entrant within a task; a transaction touching several players should take them all
+        here before its first UPDATE so locks are always acquired in the same order.
+        """
+        user_ids = sorted(set(map(str, user_ids)))
+        task = asyncio.current_task()
+        entries = []
+        for uid in user_ids:
+            entry = self._writers.setdefault(uid, {"lock": asyncio.Lock(), "users": 0, "holder": None})
+            entry["users"] += 1
+            entries.append(entry)
+        acquired = []
+        try:
+            for entry in entries:
+                if entry["holder"] is task:
+                    continue  # Already held by an enclosing writing() in this task
+                await entry["lock"].acquire()
+                entry["holder"] = task
+                acquired.append(entry)
+            yield
+        finally:
+            for entry in acquired:
+                entry["holder"] = None
+                entry["lock"].release()
+            for uid, entry in zip(user_ids, entries):
+                entry["users"] -= 1
+                if not entry["users"]:
+                    del self._writers[uid]
+        if not self.running:
+            await self.flush(only=user_ids)
+
+    # === Write-behind ===
+    async def flush(self, only=None):
+        """Write dirty rows back in batches, one executemany per distinct set of dirty columns."""
+        async with self._flush_lock:
+            # Snapshot and clear dirty state up front so mutations made during the flush are kept for the next one
+            snapshot = self._take_dirty(only)
+            if not snapshot:
+                return 0
+            try:
+                async with async_engine.begin() as conn:
+                    await self._write_batches(conn, self._batches(snapshot))
+            except Exception:
+                # Re-mark everything so nothing is lost; the next flush retries
+                self._restore_dirty(snapshot)
+                raise
+            self._flushed(snapshot)
+            return len(snapshot)
+
+    @asynccontextmanager
+    async def transaction(self, only=None):
+        """
+        `async_engine.begin()` that also writes the dirty rows (all, or the `only` user_ids).
+        Their dirty state stays cleared only if the transaction commits; when the caller's
+        block or the commit fails they are re-marked for the next flush. The flush lock is
+        held throughout, so don't write to the cache from inside the block.
+        """
+        async with self._flush_lock:
+            snapshot = self._take_dirty(only)
+            try:
+                async with async_engine.begin() as conn:
+                    if snapshot:
+                        await self._write_batches(conn, self._batches(snapshot))
+                    yield conn
+            except BaseException:
+                self._restore_dirty(snapshot)
+                raise
+            self._flushed(snapshot)
+
+    # === Listeners ===
+    def add_listener(self, callback):
+        """
+        Register `callback(user_id, row)` to run after a player row changes (update, insert, apply).
+        For apply() on a player that isn't cached, `row` holds only the applied columns.
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, user_id, row):
+        for callback in self._listeners:
+            try:
+                callback(user_id, row)
+            except Exception as e:
+                print(f"[ERROR]🧊 Player cache listener failed for {user_id}: {e}")
+
+    # === Internals ===
+    def _pending(self, user_id):
+        return user_id in self._dirty or user_id in self._deltas
+
+    def _take_dirty(self, only=None):
+        candidates = set(self._dirty) | set(self._deltas) if only is None else map(str, only)
+        # Players with a raw write in flight are left for a later flush (see writing())
+        user_ids = [uid for uid in candidates if self._pending(uid) and uid not in self._writers]
+        return {uid: (self._dirty.pop(uid, {}), self._deltas.pop(uid, {})) for uid in user_ids}
+
+    def _restore_dirty(self, snapshot):
+        for uid, (values, deltas) in snapshot.items():
+            dirty = self._dirty.setdefault(uid, {})
+            for column, value in values.items():
+                dirty.setdefault(column, value)   # A newer set made since the snapshot wins
+            if not dirty:
+                del self._dirty[uid]
+            for column, amount in deltas.items():
+                if column in self._dirty.get(uid, {}):
+                    continue   # Superseded by a set made since the snapshot
+                pending = self._deltas.setdefault(uid, {})
+                pending[column] = pending.get(column, 0) + amount
+
+    @staticmethod
+    def _batches(snapshot):
+        batches = {}
+        for uid, (values, deltas) in snapshot.items():
+            batches.setdefault((frozenset(values), frozenset(deltas)), []).append({
+                "b_user_id": uid,
+                **{f"b_{column}": value for column, value in values.items()},
+                **{f"d_{column}": amount for column, amount in deltas.items()},
+            })
+        return batches
+
+    def _flushed(self, snapshot):
+        if not snapshot:
+            return
+        self.flushes += 1
+        self.rows_flushed += len(snapshot)
+        if DEBUG:
+            print(f"[DEBUG]🧊 Player cache flushed {len(snapshot)} row(s).")
+        self._evict()
+
+    @staticmethod
+    async def _write_batches(conn, batches):
+        for (columns, counters), params in batches.items():
+            stmt = (
+                players.update()
+                .where(players.c.user_id == bindparam("b_user_id"))
+                .values({
+                    **{column: bindparam(f"b_{column}") for column in columns},
+                    **{column: players.c[column] + bindparam(f"d_{column}") for column in counters},
+                })
+            )
+            await conn.execute(stmt, params)
+
+    def _load(self, user_id, result_row):
+        # A row discarded with changes still pending gets them laid back over the table values
+        row = dict(result_row._mapping)
+        row.update(self._dirty.get(user_id, {}))
+        for column, amount in self._deltas.get(user_id, {}).items():
+            row[column] += amount
+        self._store(user_id, row)
+        return row
+
+    def _store(self, user_id, row):
+        self._rows[user_id] = row
+        self._rows.move_to_end(user_id)
+        self._evict()
+
+    def _evict(self):
+        # Only clean rows are evicted; dirty rows stay until the next flush writes them
+        if len(self._rows) <= self.max_size:
+            return
+        for uid in list(self._rows):
+            if len(self._rows) <= self.max_size:
+                break
+            if not self._pending(uid):
+                del self._rows[uid]
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "cached": len(self._rows),
+            "dirty": len(set(self._dirty) | set(self._deltas)),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "evictions": self.evictions,
+        }
+
+
+player_cache = PlayerStateCache()
+
+
+class PlayerCacheFlusher(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        print("[DEBUG]🧊 PlayerCacheFlusher loaded. Starting flush loop...")
+        player_cache.running = True
+        self.flush_loop.start()
+
+    async def cog_unload(self):
+        # Called on extension unload and on bot.close(), so pending writes survive shutdown
+        self.flush_loop.cancel()
+        player_cache.running = False
+        await player_cache.flush()
+        print(f"[DEBUG]🧊 Player cache flushed on shutdown. Stats: {player_cache.stats()}")
+
+    @tasks.loop(seconds=FLUSH_INTERVAL_SECONDS)
+    async def flush_loop(self):
+        try:
+            await player_cache.flush()
+        except Exception as e:
+            print(f"[ERROR]🧊 Player cache flush failed (will retry): {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(PlayerCacheFlusher(bot))
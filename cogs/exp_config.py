@@ -2,6 +2,8 @@ import os
 import discord
 import sqlalchemy as db
 from sqlalchemy.sql import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine
 from discord.ext import commands
 
 # === Shared Engine and Metadata ===
@@ -11,6 +13,23 @@ if DATABASE_URL.startswith("postgres://"):
 
 engine = db.create_engine(DATABASE_URL)
 
+# === Async Engine (event-loop safe) ===
+def to_async_url(url: str) -> str:
+    """Map a sync SQLAlchemy URL onto its asyncio driver (asyncpg for Postgres, aiosqlite for local SQLite)."""
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+
+def upsert_insert(table):
+    """INSERT with on_conflict_do_nothing/on_conflict_do_update for the configured database (Postgres, or the local SQLite stand-in)."""
+    dialect = sqlite if engine.dialect.name == "sqlite" else postgresql
+    return dialect.insert(table)
+
 # === Load tables AFTER defining shared metadata ===
 from cogs.database.meta import metadata
 from cogs.database.players_table import players
@@ -19,6 +38,8 @@ from cogs.database.recent_activity_table import recent_activity
 from cogs.database.gambling_stats_table import gambling_stats
 from cogs.database.lottery_entries_table import lottery_entries
 from cogs.database.lottery_history_table import lottery_history
+from cogs.database.transactions_table import transactions, transactions_history_index
+from cogs.database.store_stock_table import store_stock
 
 # === Constants ===
 EXP_CHANNEL_ID = int(os.getenv("EXP_CHANNEL_ID"))
@@ -31,11 +52,27 @@ EXP_PER_TICK = 10
 GOLD_PER_TICK = 5
 LEVEL_CAP = 38
 BASE_EXP_SCALE = 100
+VOICE_SECONDS_PER_TICK = EXP_COOLDOWN  # Voice time worth one EXP tick (matches the old once-per-cooldown voice rate)
 
 # === Create All Tables ===
 with engine.connect() as conn:
     metadata.create_all(engine)
 
+# === Add columns introduced after a table was first created (create_all won't alter existing tables) ===
+with engine.begin() as conn:
+    player_columns = {column["name"] for column in db.inspect(conn).get_columns("players")}
+    if "display_name" not in player_columns:
+        conn.execute(db.text("ALTER TABLE players ADD COLUMN display_name VARCHAR"))
+        print("[DEBUG]🗒️ Added players.display_name column.")
+    lottery_history_columns = {column["name"] for column in db.inspect(conn).get_columns("lottery_history")}
+    if "tier" not in lottery_history_columns:
+        conn.execute(db.text("ALTER TABLE lottery_history ADD COLUMN tier INTEGER NOT NULL DEFAULT 1"))
+        print("[DEBUG]🗒️ Added lottery_history.tier column.")
+    if "seed" not in lottery_history_columns:
+        conn.execute(db.text("ALTER TABLE lottery_history ADD COLUMN seed VARCHAR"))
+        print("[DEBUG]🗒️ Added lottery_history.seed column.")
+    transactions_history_index.create(conn, checkfirst=True)
+
 # === Optional Cog Setup ===
 class ExpConfig(commands.Cog):
     def __init__(self, bot):
@@ -0,0 +1,62 @@
+from discord.ext import commands
+from sqlalchemy import select
+
+from cogs.exp_config import players, async_engine, EXP_COOLDOWN
+
+DEBUG = True
+
+
+class CooldownIndex:
+    """
+    Compact user_id -> last_message_ts map used to drop messages inside the
+    EXP cooldown window before any database or cache work happens.
+    """
+
+    def __init__(self, cooldown=EXP_COOLDOWN):
+        self.cooldown = cooldown
+        self._last_ts = {}
+        self.filtered = 0
+        self.passed = 0
+
+    def is_cooling_down(self, user_id, now):
+        """True (and counted) if the user earned EXP less than `cooldown` seconds ago."""
+        last_ts = self._last_ts.get(str(user_id))
+        if last_ts is not None and now - last_ts < self.cooldown:
+            self.filtered += 1
+            return True
+        self.passed += 1
+        return False
+
+    def record(self, user_id, last_message_ts):
+        self._last_ts[str(user_id)] = last_message_ts
+
+    async def warm(self):
+        async with async_engine.connect() as conn:
+            result = await conn.execute(select(players.c.user_id, players.c.last_message_ts))
+            self._last_ts = {str(row.user_id): row.last_message_ts for row in result.fetchall()}
+        if DEBUG:
+            print(f"[DEBUG]⏳ Cooldown index warmed with {len(self._last_ts)} player(s).")
+
+    def stats(self):
+        total = self.filtered + self.passed
+        return {
+            "tracked": len(self._last_ts),
+            "filtered": self.filtered,
+            "passed": self.passed,
+            "filtered_rate": (self.filtered / total) if total else 0.0,
+        }
+
+
+cooldown_index = CooldownIndex()
+
+
+class ExpCooldownIndex(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        await cooldown_index.warm()
+
+
+async def setup(bot):
+    await bot.add_cog(ExpCooldownIndex(bot))
@@ -2,11 +2,17 @@ import discord
 from discord.ext import commands
 import time
 from cogs.exp_config import (
-    db, players, exp_channel, engine, EXP_COOLDOWN, EXP_PER_TICK, GOLD_PER_TICK, LEVEL_CAP, EXP_CHANNEL_ID, TIME_DELTA, MAX_MULTIPLIER,
+    db, players, recent_activity, exp_channel, async_engine, EXP_COOLDOWN, EXP_PER_TICK, GOLD_PER_TICK, LEVEL_CAP, EXP_CHANNEL_ID, TIME_DELTA, MAX_MULTIPLIER,
+    VOICE_SECONDS_PER_TICK,
 )
 from cogs.exp_utils import (
-    get_multiplier, get_user_data, calculate_level, update_user_data, 
+    get_multiplier, get_user_data_async, calculate_level, update_user_data_async, safe_id, adjust_player,
 )
+from cogs.exp_cache import player_cache
+from cogs.exp_cooldown import cooldown_index
+from cogs.exp_announcer import announcer
+from cogs.x_utilities.member_resolver import member_resolver
+from cogs.message_scheduler import scheduler, PRIORITY_HIGH, PRIORITY_FOLLOWUP
 
 notified_users = set()
 
@@ -14,102 +20,263 @@ class ExpEngine(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-async def handle_exp_gain(message: discord.Message, level_up_channel_id: int):
-    print(f"🚂 - ⚡⚡⚡(H_E_G) Handling EXP gain for user: {message.author.id} ⚡⚡⚡")
+async def handle_exp_gain(message: discord.Message, level_up_channel_id: int, player=None, cooldown_checked=False):
     if message.author.bot:
         return
 
     user_id = str(message.author.id)
     current_ts = time.time()
+
+    # ⏳ Still cooling down: drop the message before any SQL, cache work or logging
+    # (the message pipeline checks the index itself before fetching the player)
+    if not cooldown_checked and cooldown_index.is_cooling_down(user_id, current_ts):
+        return
+
+    print(f"🚂 - ⚡⚡⚡(H_E_G) Handling EXP gain for user: {message.author.id} ⚡⚡⚡")
     username = str(message.author.display_name)
 
-    with engine.connect() as conn:
-        result = conn.execute(db.select(players).where(players.c.user_id == user_id)).fetchone()
+    # Callers that already hold the player row (the message pipeline) pass it in
+    result = player if player is not None else await player_cache.get(user_id)
 
-        if result:
-            cooldown_remaining = current_ts - result.last_message_ts
-            print(f"[DEBUG]🚂 - 🥶🔥 Checking cooldown for {username} ({user_id}). Time since last message: {cooldown_remaining:.2f} seconds.")
-            if cooldown_remaining < EXP_COOLDOWN:
-                print(f"[DEBUG]🚂 - ❄️❄️❄️ EXP cooldown active for {username}, ({user_id}). {EXP_COOLDOWN - cooldown_remaining:.2f} seconds remaining before next update.❄️❄️❄️")
-                return
-            else:
-                print(f"[DEBUG]🚂 - 🍾 No cooldown active, proceeding with EXP and gold calculation for {username} ({user_id}).")
-            # Continue with EXP and gold calculation...
-            daily = result.daily_multiplier
-            retire = get_multiplier(result.retirements)
-            combined_multiplier = daily * retire
-            # Calculate rewards
-            gained_exp = int(EXP_PER_TICK * combined_multiplier)
-            gained_gold = int(GOLD_PER_TICK * combined_multiplier)
-            total_exp = result.exp + gained_exp
-            new_level = calculate_level(total_exp)
-            print(f"[DEBUG]🚂 - ✖️☑️ Multiplier applied: {result.daily_multiplier} (daily) × {get_multiplier(result.retirements):.2f} (retirement) = {combined_multiplier:.2f}")
-
-            if result.level >= LEVEL_CAP:
-                total_exp = result.exp
-                new_level = LEVEL_CAP
-                gained_exp = 0
-
-            update = players.update().where(players.c.user_id == user_id).values(
-                exp=total_exp,
-                gold=result.gold + gained_gold,
-                last_message_ts=current_ts,
-                level=new_level
+    if result:
+        cooldown_remaining = current_ts - result["last_message_ts"]
+        print(f"[DEBUG]🚂 - 🥶🔥 Checking cooldown for {username} ({user_id}). Time since last message: {cooldown_remaining:.2f} seconds.")
+        if cooldown_remaining < EXP_COOLDOWN:
+            cooldown_index.record(user_id, result["last_message_ts"])
+            print(f"[DEBUG]🚂 - ❄️❄️❄️ EXP cooldown active for {username}, ({user_id}). {EXP_COOLDOWN - cooldown_remaining:.2f} seconds remaining before next update.❄️❄️❄️")
+            return
+        else:
+            print(f"[DEBUG]🚂 - 🍾 No cooldown active, proceeding with EXP and gold calculation for {username} ({user_id}).")
+        # Continue with EXP and gold calculation...
+        daily = result["daily_multiplier"]
+        retire = get_multiplier(result["retirements"])
+        combined_multiplier = daily * retire
+        # Calculate rewards
+        gained_exp = int(EXP_PER_TICK * combined_multiplier)
+        gained_gold = int(GOLD_PER_TICK * combined_multiplier)
+        total_exp = result["exp"] + gained_exp
+        new_level = calculate_level(total_exp)
+        previous_level = result["level"]
+        print(f"[DEBUG]🚂 - ✖️☑️ Multiplier applied: {daily} (daily) × {retire:.2f} (retirement) = {combined_multiplier:.2f}")
+
+        if result["level"] >= LEVEL_CAP:
+            total_exp = result["exp"]
+            new_level = LEVEL_CAP
+            gained_exp = 0
+
+        # EXP and gold go in as increments so they compose with concurrent adjust_player deltas
+        await player_cache.update(
+            user_id,
+            add={"exp": total_exp - result["exp"], "gold": gained_gold},
+            last_message_ts=current_ts,
+            level=new_level,
+            display_name=username
+        )
+        cooldown_index.record(user_id, current_ts)
+    else:
+        daily = 1.0  # Default daily multiplier for new users
+        retire = get_multiplier(0)
+        combined_multiplier = daily * retire
+
+        gained_exp = int(EXP_PER_TICK * combined_multiplier)
+        gained_gold = int(GOLD_PER_TICK * combined_multiplier)
+        total_exp = gained_exp
+        new_level = calculate_level(total_exp)
+        previous_level = 0
+
+        await player_cache.insert(
+            user_id,
+            exp=total_exp,
+            gold=gained_gold,
+            level=new_level,
+            last_message_ts=current_ts,
+            retirements=0,
+            heirloom_points=0,
+            multiplier=0.0,
+            daily_multiplier=daily,
+            last_multiplier_update=current_ts,
+            display_name=username
+        )
+        cooldown_index.record(user_id, current_ts)
+
+    # 📨 Announce after the state change (buffered into the EXP digest; level-ups bypass it)
+    exp_channel = message.guild.get_channel(EXP_CHANNEL_ID)
+    if exp_channel:
+        await announcer.announce(
+            exp_channel, "exp",
+            f"**{message.author.display_name}** gained ⚡ **{gained_exp} EXP** and 💰 **{gained_gold} gold** "
+            f"(🏔️ **{daily:.2f}x** · 🧬 **{retire:.2f}x**)"
+        )
+
+    if new_level > previous_level:
+        await announce_level_up(message.guild, message.author, new_level, level_up_channel_id)
+
+
+
+async def award_exp_batch(guild: discord.Guild, user_ids, clear_recent_activity_ids=None):
+    """
+    Batch version of handle_exp_gain for background activity (recent_activity, voice).
+    Rows are loaded in one query, EXP/gold/level computed in a single pass, and the
+    updates plus the recent_activity cleanup committed in one transaction.
+    Returns level-up events as (user_id, previous_level, new_level).
+    """
+    current_ts = time.time()
+    user_ids = [str(uid) for uid in dict.fromkeys(user_ids)]
+    eligible = [uid for uid in user_ids if not cooldown_index.is_cooling_down(uid, current_ts)]
+
+    rows = await player_cache.get_many(eligible)
+    level_ups = []
+    awarded = []
+
+    for user_id in eligible:
+        row = rows.get(user_id)
+        member = guild.get_member(int(user_id)) if guild else None
+        display_name = member.display_name if member else None
+
+        if row is None:
+            # New players are rare here; insert them the same way handle_exp_gain does
+            gained_exp = int(EXP_PER_TICK * get_multiplier(0))
+            gained_gold = int(GOLD_PER_TICK * get_multiplier(0))
+            new_level = calculate_level(gained_exp)
+            await player_cache.insert(
+                user_id, exp=gained_exp, gold=gained_gold, level=new_level, last_message_ts=current_ts,
+                retirements=0, heirloom_points=0, multiplier=0.0, daily_multiplier=1.0,
+                last_multiplier_update=current_ts, display_name=display_name
+            )
+            cooldown_index.record(user_id, current_ts)
+            awarded.append((user_id, display_name, gained_exp, gained_gold))
+            if new_level > 0:
+                level_ups.append((user_id, 0, new_level))
+            continue
+
+        if current_ts - row["last_message_ts"] < EXP_COOLDOWN:
+            cooldown_index.record(user_id, row["last_message_ts"])
+            continue
+
+        combined_multiplier = row["daily_multiplier"] * get_multiplier(row["retirements"])
+        gained_exp = int(EXP_PER_TICK * combined_multiplier)
+        gained_gold = int(GOLD_PER_TICK * combined_multiplier)
+        total_exp = row["exp"] + gained_exp
+        new_level = calculate_level(total_exp)
+
+        if row["level"] >= LEVEL_CAP:
+            total_exp = row["exp"]
+            new_level = LEVEL_CAP
+            gained_exp = 0
+
+        values = {"last_message_ts": current_ts, "level": new_level}
+        if display_name:
+            values["display_name"] = display_name
+        await player_cache.update(user_id, add={"exp": total_exp - row["exp"], "gold": gained_gold}, **values)
+        cooldown_index.record(user_id, current_ts)
+
+        awarded.append((user_id, display_name or row.get("display_name") or f"<@{user_id}>", gained_exp, gained_gold))
+        if new_level > row["level"]:
+            level_ups.append((user_id, row["level"], new_level))
+
+    # ✍️ One transaction: bulk UPDATE of every awarded row + one DELETE from recent_activity
+    async with player_cache.transaction(only=[uid for uid, *_ in awarded]) as conn:
+        if clear_recent_activity_ids:
+            await conn.execute(
+                recent_activity.delete().where(recent_activity.c.user_id.in_([int(uid) for uid in clear_recent_activity_ids]))
             )
-            conn.execute(update)
-            conn.commit()
-
-            exp_channel = message.guild.get_channel(EXP_CHANNEL_ID)
-            await exp_channel.send(
-                f"**{message.author.display_name}** gained ⚡ **{gained_exp} EXP** and 💰 **{gained_gold} gold**\n"
-                f"🏔️ Daily Multiplier: **{daily:.2f}x**\n"
-                f"🧬 Generational Multiplier: **{retire:.2f}x**\n"
-                )
 
-            if new_level > result.level:
-                await announce_level_up(message.guild, message.author, new_level, level_up_channel_id)
-        else:
-            daily = 1.0  # Default daily multiplier for new users
-            retire = get_multiplier(0)
-            combined_multiplier = daily * retire
-
-            gained_exp = int(EXP_PER_TICK * combined_multiplier)
-            gained_gold = int(GOLD_PER_TICK * combined_multiplier)
-            total_exp = gained_exp
-            new_level = calculate_level(total_exp)
-
-            conn.execute(players.insert().values(
-                user_id=user_id,
-                exp=total_exp,
-                gold=gained_gold,
-                level=new_level,
-                last_message_ts=current_ts,
-                retirements=0,
-                heirloom_points=0,
-                multiplier=0.0,
-                daily_multiplier=daily,
-                last_multiplier_update=current_ts
-            ))
-            conn.commit()
-
-            exp_channel = message.guild.get_channel(EXP_CHANNEL_ID)
-            if exp_channel:
-                await exp_channel.send(
-                    f"**{message.author.display_name}** gained ⚡ **{gained_exp} EXP** and 💰 **{gained_gold} gold**\n"
-                    f"🏔️ Daily Multiplier: **{daily:.2f}x**\n"
-                    f"🧬 Generational Multiplier: **{retire:.2f}x**"
-                )
+    print(f"[DEBUG]🚂 - ⚡ Batch award: {len(awarded)} awarded, {len(user_ids) - len(awarded)} skipped (cooldown), {len(level_ups)} level-up(s).")
 
-            if new_level > 0:
-                await announce_level_up(message.guild, message.author, new_level, level_up_channel_id)
+    exp_channel = guild.get_channel(EXP_CHANNEL_ID) if guild else None
+    if exp_channel:
+        for user_id, name, gained_exp, gained_gold in awarded:
+            await announcer.announce(exp_channel, "exp", f"**{name}** gained ⚡ **{gained_exp} EXP** and 💰 **{gained_gold} gold**")
 
+    return level_ups
 
+# Fractional EXP/gold owed from partial voice intervals, carried to the next credit
+voice_carry = {}
 
-async def on_user_comment(user_id, bot, is_admin=False):
+async def award_voice_batch(guild: discord.Guild, seconds_by_user):
+    """
+    Credit voice time: EXP/gold prorated by seconds spent (one full tick per
+    VOICE_SECONDS_PER_TICK), written for every user in one batch.
+    Returns (level-up events as (user_id, previous_level, new_level), credited user_ids);
+    users missing from the credited set weren't awarded and their time should be kept.
+    """
+    current_ts = time.time()
+    seconds_by_user = {str(uid): seconds for uid, seconds in seconds_by_user.items() if seconds > 0}
+    rows = await player_cache.get_many(list(seconds_by_user))
+    level_ups = []
+    awarded = []
+
+    for user_id, seconds in seconds_by_user.items():
+        row = rows.get(user_id)
+        member = guild.get_member(int(user_id)) if guild else None
+        display_name = member.display_name if member else None
+
+        daily = row["daily_multiplier"] if row else 1
+        retirements = row["retirements"] if row else 0
+        ticks = seconds / VOICE_SECONDS_PER_TICK
+        exp_carry, gold_carry = voice_carry.get(user_id, (0.0, 0.0))
+        exact_exp = EXP_PER_TICK * daily * get_multiplier(retirements) * ticks + exp_carry
+        exact_gold = GOLD_PER_TICK * daily * get_multiplier(retirements) * ticks + gold_carry
+        gained_exp, gained_gold = int(exact_exp), int(exact_gold)
+
+        try:
+            if row is None:
+                previous_level = 0
+                new_level = calculate_level(gained_exp)
+                await player_cache.insert(
+                    user_id, exp=gained_exp, gold=gained_gold, level=new_level, last_message_ts=current_ts,
+                    retirements=0, heirloom_points=0, multiplier=0.0, daily_multiplier=1.0,
+                    last_multiplier_update=current_ts, display_name=display_name
+                )
+            else:
+                previous_level = row["level"]
+                total_exp = row["exp"] + gained_exp
+                new_level = calculate_level(total_exp)
+                if row["level"] >= LEVEL_CAP:
+                    total_exp = row["exp"]
+                    new_level = LEVEL_CAP
+
+                # Voice counts as activity for the daily multiplier, as it did on the old per-message path
+                values = {"level": new_level, "last_message_ts": current_ts}
+                if display_name:
+                    values["display_name"] = display_name
+                await player_cache.update(user_id, add={"exp": total_exp - row["exp"], "gold": gained_gold}, **values)
+        except Exception as e:
+            print(f"[ERROR]🚂 - 📢 Voice credit failed for {user_id}, keeping their time for the next credit: {e}")
+            continue
+
+        # The carry only moves once the award is in the cache
+        carry = (exact_exp - gained_exp, exact_gold - gained_gold)
+        if carry[0] > 1e-9 or carry[1] > 1e-9:
+            voice_carry[user_id] = carry
+        else:
+            voice_carry.pop(user_id, None)
+        cooldown_index.record(user_id, current_ts)
+        awarded.append(user_id)
+        if new_level > previous_level:
+            level_ups.append((user_id, previous_level, new_level))
+
+    try:
+        await player_cache.flush(only=awarded)
+    except Exception as e:
+        # Already credited in the cache; the rows stay dirty and the next flush retries them
+        print(f"[ERROR]🚂 - 📢 Voice credit flush failed (will retry): {e}")
+
+    print(f"[DEBUG]🚂 - 📢 Voice credit: {len(awarded)} user(s), {sum(seconds_by_user.values()):.0f}s total, {len(level_ups)} level-up(s).")
+    return level_ups, set(awarded)
+
+async def announce_level_ups(guild: discord.Guild, level_ups, channel_id: int):
+    for user_id, _, new_level in level_ups:
+        member = guild.get_member(int(user_id))
+        if member:
+            await announce_level_up(guild, member, new_level, channel_id)
+
+async def on_user_comment(user_id, bot, is_admin=False, user_data=None, member=None):
     print("[DEBUG]🚂 -  on_user_comment triggered, Admin Command: " + str(is_admin))
     current_time = int(time.time())
-    user_data = get_user_data(user_id)
-    member = await bot.fetch_user(user_id)
+    if user_data is None:
+        user_data = await get_user_data_async(user_id)
+    display_name = member.display_name if member is not None else await member_resolver.display_name(bot, user_id)
 
     if not user_data:
         print(f"[DEBUG]🚂 - 🏔️ No user data found for {user_id}.")
@@ -139,59 +306,109 @@ async def on_user_comment(user_id, bot, is_admin=False):
             
             print(f"[DEBUG]🚂 - 🌋 Inactive for 24+ hours — resetting multiplier to baseline.")
 
-            update_user_data(user_id, user_data['multiplier'], new_daily_multiplier, last_message_ts, current_time)
+            await update_user_data_async(user_id, user_data['multiplier'], new_daily_multiplier, last_message_ts, current_time)
             exp_channel = bot.get_channel(EXP_CHANNEL_ID)
             if exp_channel:
-                await exp_channel.send(
-                    f"🌋 {member.display_name}'s daily multiplier has been reset to **1x** due to inactivity."
+                await announcer.announce(
+                    exp_channel, "multiplier",
+                    f"🌋 {display_name}'s daily multiplier has been reset to **1x** due to inactivity."
                 )
         else:
             new_daily_multiplier = min(current_daily_multiplier + 1, MAX_MULTIPLIER)
             print(f"[DEBUG]🚂 - 🏔️ Active within 24h — potentially increasing multiplier to {new_daily_multiplier}.")
 
             if new_daily_multiplier != current_daily_multiplier:
-                update_user_data(user_id, user_data['multiplier'], new_daily_multiplier, last_message_ts, current_time)
+                await update_user_data_async(user_id, user_data['multiplier'], new_daily_multiplier, last_message_ts, current_time)
                 exp_channel = bot.get_channel(EXP_CHANNEL_ID)
                 if exp_channel:
-                    await exp_channel.send(
-                        f"🏔️ {member.display_name}'s daily multiplier updated to **{new_daily_multiplier}x** due to daily posting."
+                    await announcer.announce(
+                        exp_channel, "multiplier",
+                        f"🏔️ {display_name}'s daily multiplier updated to **{new_daily_multiplier}x** due to daily posting."
                     )
             else:
                 print(f"[DEBUG] Multiplier unchanged for {user_id}, no update message sent.")
     else:
         print("[DEBUG]🚂 - Less than 24h since last update, not updating multiplier.")
 
+async def sweep_daily_multipliers(bot, announce=True):
+    """
+    Apply on_user_comment's daily multiplier rules to every player in one
+    UPDATE ... RETURNING: reset to 1x after 24h of inactivity, otherwise
+    step up (to MAX_MULTIPLIER) once per 24h. Returns the changed rows.
+    """
+    current_time = int(time.time())
+
+    inactive = (current_time - players.c.last_message_ts) >= TIME_DELTA
+    stmt = (
+        players.update()
+        .where(
+            ((current_time - players.c.last_multiplier_update) >= TIME_DELTA) &
+            (
+                (inactive & (players.c.daily_multiplier != 1)) |
+                (~inactive & (players.c.daily_multiplier < MAX_MULTIPLIER))
+            )
+        )
+        .values(
+            daily_multiplier=db.case((inactive, 1), else_=players.c.daily_multiplier + 1),
+            last_multiplier_update=current_time,
+        )
+        .returning(players.c.user_id, players.c.daily_multiplier, players.c.display_name)
+    )
+
+    # Pending cached activity (last_message_ts) is written in the same transaction, under the flush
+    # lock, so the rules see it and no flush lands between it and the sweep
+    async with player_cache.transaction() as conn:
+        changed = (await conn.execute(stmt)).fetchall()
+
+    for row in changed:
+        player_cache.apply(row.user_id, daily_multiplier=row.daily_multiplier, last_multiplier_update=current_time)
+
+    print(f"[DEBUG]🚂 - 🏔️ Multiplier sweep updated {len(changed)} player(s) in one statement.")
+
+    exp_channel = bot.get_channel(EXP_CHANNEL_ID)
+    if announce and exp_channel:
+        for row in changed:
+            name = row.display_name or await member_resolver.display_name(bot, row.user_id)
+            if row.daily_multiplier == 1:
+                line = f"🌋 {name}'s daily multiplier has been reset to **1x** due to inactivity."
+            else:
+                line = f"🏔️ {name}'s daily multiplier updated to **{row.daily_multiplier}x** due to daily posting."
+            await announcer.announce(exp_channel, "multiplier", line)
+
+    return changed
+
 async def check_and_reset_multiplier(user_id, bot):
     current_time = int(time.time())
-    user_data = get_user_data(user_id)
+    user_data = await get_user_data_async(user_id)
 
     if user_data:
         time_since_last_message = current_time - user_data['last_message_ts']
-        member = await bot.fetch_user(user_id)  # Fetch the user early to use in all prints
+        display_name = await member_resolver.display_name(bot, user_id)  # Resolve early to use in all prints
 
         if user_data['multiplier'] == 1:
-            print(f"[DEBUG]🚂 - ⏩ Skipping {member.display_name}, already at 1x multiplier.")
+            print(f"[DEBUG]🚂 - ⏩ Skipping {display_name}, already at 1x multiplier.")
             return
 
         # Check if 24 hours have passed since the last post
         if time_since_last_message >= 86400:  # 24 hours in seconds
             # Reset the daily multiplier & update last_message_ts to current time to avoid repetitive resets
-            update_user_data(user_id, user_data['exp'], 1, user_data['last_multiplier_update'], current_time)
+            await update_user_data_async(user_id, user_data['exp'], 1, user_data['last_multiplier_update'], current_time)
             exp_channel = bot.get_channel(EXP_CHANNEL_ID)
             if exp_channel:
-                await exp_channel.send(
-                    f"🌋 {member.display_name}'s daily multiplier has been reset to **1x** due to inactivity."
+                await announcer.announce(
+                    exp_channel, "multiplier",
+                    f"🌋 {display_name}'s daily multiplier has been reset to **1x** due to inactivity."
                 )
-            print(f"[DEBUG]🚂 - 🌋 Reset daily multiplier for {member.display_name} due to inactivity ({time_since_last_message} seconds).")
+            print(f"[DEBUG]🚂 - 🌋 Reset daily multiplier for {display_name} due to inactivity ({time_since_last_message} seconds).")
         else:
             # If the user has been active, ensure the multiplier is not reset
-            print(f"[DEBUG]🚂 - User {member.display_name} has been active within the last 24 hours.")
+            print(f"[DEBUG]🚂 - User {display_name} has been active within the last 24 hours.")
     else:
         print(f"[ERROR]🚂 - User {user_id} not found in database.")
 
 
 async def award_xp_and_gold(user_id, base_xp, base_gold, bot):
-    user_data = get_user_data(user_id)
+    user_data = await get_user_data_async(user_id)
     if user_data:
         # Retrieve both multipliers
         retirement_multiplier = user_data['multiplier']  # Stored as a float like 0.45
@@ -207,23 +424,25 @@ async def award_xp_and_gold(user_id, base_xp, base_gold, bot):
         # Print debug info
         print(f"[DEBUG]🚂 - ⚡⚡⚡(A_x_a_g) Awarded {xp_awarded} XP and {gold_awarded} gold to <{user_id}> — Total Multiplier: {total_multiplier:.2f}x ⚡⚡⚡")
 
-        # Update XP and gold in DB
-        with engine.connect() as conn:
-            update_query = players.update().where(players.c.user_id == user_id).values(
-                exp=user_data['exp'] + xp_awarded,
-                gold=user_data['gold'] + gold_awarded
-            )
-            conn.execute(update_query)
-            conn.commit()
+        # One delta UPDATE; concurrent gold changes between the read above and this write aren't lost
+        updated = await adjust_player(
+            user_id,
+            exp=xp_awarded,
+            gold=gold_awarded,
+            type_="exp_award",
+            description=f"Awarded {xp_awarded} XP and {gold_awarded} gold"
+        ) or {"exp": user_data['exp'] + xp_awarded, "gold": user_data['gold'] + gold_awarded}
 
         # Send result to EXP channel
         exp_channel = bot.get_channel(EXP_CHANNEL_ID)
         if exp_channel:
-            await exp_channel.send(
+            await scheduler.send(
+                exp_channel,
                 f"🏅 <@{user_id}> has been awarded ⚡ **{xp_awarded} XP** and 💰 **{gold_awarded} gold**\n"
-                f"Total: ⚡ **{user_data['exp'] + xp_awarded} XP**, 💰 **{user_data['gold'] + gold_awarded} gold**\n"
+                f"Total: ⚡ **{updated['exp']} XP**, 💰 **{updated['gold']} gold**\n"
                 f"🏔️ Daily Multiplier: **{daily_multiplier}x**\n"
-                f"🧬 Generational Multiplier: **{retirement_multiplier + 1:.2f}x**"
+                f"🧬 Generational Multiplier: **{retirement_multiplier + 1:.2f}x**",
+                priority=PRIORITY_FOLLOWUP
             )
         else:
             print("🚂 - [ERROR] EXP channel not found.")
@@ -231,7 +450,7 @@ async def award_xp_and_gold(user_id, base_xp, base_gold, bot):
 async def announce_level_up(guild: discord.Guild, member: discord.Member, level: int, channel_id: int):
     channel = guild.get_channel(channel_id)
     if channel:
-        await channel.send(f"## 🎆 {member.mention} has reached **Level {level}**!")
+        await scheduler.send(channel, f"## 🎆 {member.mention} has reached **Level {level}**!", priority=PRIORITY_HIGH)
     else:
         print(f"🚂 - [ERROR] Could not find channel ID {channel_id} to announce level up.")
 
@@ -0,0 +1,124 @@
+from discord.ext import commands, tasks
+from sortedcontainers import SortedList
+from sqlalchemy import select
+
+from cogs.exp_config import players, async_engine
+from cogs.exp_cache import player_cache
+
+DEBUG = True
+REBUILD_INTERVAL_MINUTES = 60   # Safety net for writes that bypass the player cache (sync shims, manual SQL)
+
+
+RANK_COLUMNS = ("retirements", "level", "gold", "exp")
+
+
+def rank_key(user_id, row):
+    # Ascending sort on negated stats == ORDER BY retirements, level, gold, exp DESC; user_id breaks ties
+    return (-(row.get("retirements") or 0), -(row.get("level") or 0), -(row.get("gold") or 0), -(row.get("exp") or 0), str(user_id))
+
+
+class LeaderboardIndex:
+    """
+    Ranked in-memory index of every player, ordered like the leaderboard query
+    (retirements, level, gold, exp). Kept current by a player cache listener,
+    which also sees committed writes to players that aren't cached, so top-N,
+    rank and neighbour lookups are O(log n) with no SQL.
+    """
+
+    def __init__(self):
+        self.ready = False         # Set once the index has been built from the database
+        self._sorted = SortedList()
+        self._keys = {}            # user_id -> current rank key
+
+    async def warm(self):
+        async with async_engine.connect() as conn:
+            result = await conn.execute(
+                select(players.c.user_id, players.c.retirements, players.c.level, players.c.gold, players.c.exp)
+            )
+            rows = result.fetchall()
+
+        self._keys = {str(row.user_id): rank_key(row.user_id, row._mapping) for row in rows}
+        # Rows changed in the cache but not flushed yet are newer than the database
+        for user_id in list(self._keys):
+            cached = player_cache.peek(user_id)
+            if cached is not None:
+                self._keys[user_id] = rank_key(user_id, cached)
+        self._sorted = SortedList(self._keys.values())
+        self.ready = True
+        if DEBUG:
+            print(f"[DEBUG]🏆 Leaderboard index built with {len(self._keys)} player(s).")
+
+    def on_player_changed(self, user_id, row):
+        """Player cache listener: reposition the player only if a ranking column moved."""
+        if not self.ready:
+            return
+        old = self._keys.get(user_id)
+        if not all(column in row for column in RANK_COLUMNS):
+            # Partial row from apply() on an uncached player; the rest comes from the indexed values
+            if old is None:
+                return  # Not indexed yet; the next rebuild picks the player up
+            row = {**self._entry(old), **row}
+        key = rank_key(user_id, row)
+        if old == key:
+            return
+        if old is not None:
+            self._sorted.remove(old)
+        self._sorted.add(key)
+        self._keys[user_id] = key
+
+    def top(self, n=10):
+        return [self._entry(key) for key in self._sorted[:n]]
+
+    def rank(self, user_id):
+        """1-based rank, or None if the player isn't indexed."""
+        key = self._keys.get(str(user_id))
+        if key is None:
+            return None
+        return self._sorted.index(key) + 1
+
+    def around(self, user_id, radius=2):
+        """Entries from `radius` places above to `radius` places below the player, with their ranks."""
+        rank = self.rank(user_id)
+        if rank is None:
+            return []
+        start = max(rank - 1 - radius, 0)
+        return [(start + i + 1, self._entry(key)) for i, key in enumerate(self._sorted[start:rank + radius])]
+
+    def __len__(self):
+        return len(self._sorted)
+
+    @staticmethod
+    def _entry(key):
+        retirements, level, gold, exp, user_id = key
+        return {"user_id": user_id, "retirements": -retirements, "level": -level, "gold": -gold, "exp": -exp}
+
+
+leaderboard_index = LeaderboardIndex()
+
+
+class LeaderboardIndexCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        player_cache.add_listener(leaderboard_index.on_player_changed)
+        await leaderboard_index.warm()
+        self.rebuild_loop.start()
+
+    async def cog_unload(self):
+        self.rebuild_loop.cancel()
+        player_cache.remove_listener(leaderboard_index.on_player_changed)
+        leaderboard_index.ready = False
+
+    @tasks.loop(minutes=REBUILD_INTERVAL_MINUTES)
+    async def rebuild_loop(self):
+        if self.rebuild_loop.current_loop == 0:
+            return  # Already built in cog_load
+        try:
+            await leaderboard_index.warm()
+        except Exception as e:
+            print(f"[ERROR]🏆 Leaderboard index rebuild failed: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(LeaderboardIndexCog(bot))
@@ -0,0 +1,106 @@
+import math
+from bisect import bisect_right
+from sqlalchemy import select, bindparam
+
+from cogs.exp_config import players, async_engine, LEVEL_CAP, BASE_EXP_SCALE
+
+DEBUG = True
+HEIRLOOM_MIN_LEVEL = 31
+HEIRLOOM_MAX_LEVEL = 38
+
+
+def _formula_level(exp):
+    # The original curve: level = (exp / BASE_EXP_SCALE) ** 0.75
+    return int((exp / BASE_EXP_SCALE) ** 0.75)
+
+
+def build_level_thresholds(level_cap=LEVEL_CAP):
+    """thresholds[L] = the smallest EXP that reaches level L under the curve, for L in 0..level_cap."""
+    thresholds = [0]
+    for level in range(1, level_cap + 1):
+        candidate = math.ceil(BASE_EXP_SCALE * level ** (4 / 3))
+        # Nudge past float rounding so the table agrees exactly with the formula
+        while candidate > 0 and _formula_level(candidate - 1) >= level:
+            candidate -= 1
+        while _formula_level(candidate) < level:
+            candidate += 1
+        thresholds.append(candidate)
+    return thresholds
+
+
+LEVEL_THRESHOLDS = build_level_thresholds()
+
+
+def level_for_exp(exp: int) -> int:
+    return bisect_right(LEVEL_THRESHOLDS, exp) - 1
+
+
+def exp_to_next_level(exp: int):
+    """EXP still needed for the next level, or None at the level cap."""
+    level = level_for_exp(exp)
+    if level >= LEVEL_CAP:
+        return None
+    return LEVEL_THRESHOLDS[level + 1] - exp
+
+
+def level_progress(exp: int) -> float:
+    """Percent progress through the current level (100.0 at the level cap)."""
+    level = level_for_exp(exp)
+    if level >= LEVEL_CAP:
+        return 100.0
+    start, end = LEVEL_THRESHOLDS[level], LEVEL_THRESHOLDS[level + 1]
+    return (exp - start) / (end - start) * 100
+
+
+async def relevel_all_players():
+    """
+    Recompute every stored level from EXP against the current curve in one
+    vectorized pass and write back only the rows that changed. Use after
+    changing BASE_EXP_SCALE or LEVEL_CAP.
+    """
+    import numpy as np
+    from cogs.exp_cache import player_cache
+
+    # Pending cached EXP must be in the table before it's read back in bulk
+    await player_cache.flush()
+
+    async with async_engine.connect() as conn:
+        rows = (await conn.execute(select(players.c.user_id, players.c.exp, players.c.level))).fetchall()
+
+    report = {"scanned": len(rows), "changed": 0, "up": 0, "down": 0, "newly_eligible": 0, "no_longer_eligible": 0}
+    if not rows:
+        return report
+
+    user_ids = np.array([str(row.user_id) for row in rows], dtype=object)
+    exp = np.array([row.exp or 0 for row in rows], dtype=np.int64)
+    old_levels = np.array([row.level or 0 for row in rows], dtype=np.int64)
+
+    new_levels = np.searchsorted(np.asarray(LEVEL_THRESHOLDS, dtype=np.int64), exp, side="right") - 1
+    changed = new_levels != old_levels
+
+    old_eligible = (old_levels >= HEIRLOOM_MIN_LEVEL) & (old_levels <= HEIRLOOM_MAX_LEVEL)
+    new_eligible = (new_levels >= HEIRLOOM_MIN_LEVEL) & (new_levels <= HEIRLOOM_MAX_LEVEL)
+
+    report.update(
+        changed=int(changed.sum()),
+        up=int((new_levels > old_levels).sum()),
+        down=int((new_levels < old_levels).sum()),
+        newly_eligible=int((new_eligible & ~old_eligible).sum()),
+        no_longer_eligible=int((old_eligible & ~new_eligible).sum()),
+    )
+
+    if report["changed"]:
+        params = [
+            {"b_user_id": uid, "b_level": int(level)}
+            for uid, level in zip(user_ids[changed], new_levels[changed])
+        ]
+        stmt = players.update().where(players.c.user_id == bindparam("b_user_id")).values(level=bindparam("b_level"))
+        async with async_engine.begin() as conn:
+            await conn.execute(stmt, params)
+
+        for param in params:
+            player_cache.apply(param["b_user_id"], level=param["b_level"])
+
+    if DEBUG:
+        print(f"[DEBUG]🌌 Re-level complete: {report}")
+    return report
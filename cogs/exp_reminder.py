@@ -3,6 +3,7 @@ from discord.ext import tasks, commands
 import datetime
 import asyncio
 from cogs.exp_config import EXP_CHANNEL_ID  # Make sure this points to your EXP channel
+from cogs.message_scheduler import scheduler, PRIORITY_REMINDER
 
 class EXPReminder(commands.Cog):
     def __init__(self, bot):
@@ -26,7 +27,7 @@ class EXPReminder(commands.Cog):
         embed.set_image(url="https://theknightsofmalta.net/wp-content/uploads/2025/05/officialretire.png")
         embed.set_footer(text="Retirement unlocks heirloom points starting at level 31.")
 
-        await channel.send(content="", embed=embed)
+        await scheduler.send(channel, content="", embed=embed, priority=PRIORITY_REMINDER)
 
 
 async def setup(bot):
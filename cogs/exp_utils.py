@@ -3,10 +3,13 @@ from sqlalchemy import select
 from discord.ext import commands
 
 from cogs.exp_config import (
-    players, engine, LEVEL_CAP, TIME_DELTA, MAX_MULTIPLIER, BASE_EXP_SCALE,
+    players, engine, async_engine, TIME_DELTA, MAX_MULTIPLIER,
 )
+from cogs.exp_progression import level_for_exp
 
-from cogs.wallet.log_transactions import log_transaction 
+from cogs.wallet.log_transactions import log_transaction, log_transaction_async
+from cogs.exp_cache import player_cache
+from cogs.exp_cooldown import cooldown_index
 
 DEBUG = True
 # 🔒 Ensures all user_id comparisons match the VARCHAR type in Postgres
@@ -21,7 +24,8 @@ def get_multiplier(retirements: int) -> float:
     return min(1 + 0.03 * retirements, 1.48)
 
 def calculate_level(exp: int) -> int:
-    return min(int((exp / BASE_EXP_SCALE) ** 0.75), LEVEL_CAP)
+    # Bisect over the precomputed threshold table (capped at LEVEL_CAP)
+    return level_for_exp(exp)
 
 def get_heirloom_points(level: int) -> int:
     if 31 <= level <= 38:
@@ -43,26 +47,11 @@ def calculate_multiplier(last_activity_time, current_time, current_daily_multipl
     
     return current_daily_multiplier
 ### DICTIONAIRY ### 
-def get_user_data(user_id):
-    with engine.connect() as conn:
-        stmt = select(players).where(players.c.user_id == safe_id(user_id))
-        result = conn.execute(stmt)
-        row = result.fetchone()
-
-        if row:
-            return dict(row._mapping)  # Returns the full row as a dict
-        else:
-            return None
-
-
-def update_user_data(user_id, new_retirement_multiplier, new_daily_multiplier, last_activity_time, last_multiplier_update=None, username=None):
-    if username:
-        print(f"[DEBUG]🗒️🖊️ update_user_data called for {username} ({user_id})")
-    else:
-        print(f"[DEBUG]🗒️🖊️ update_user_data called for user_id={user_id}")
-
-    print(f"[DEBUG]🗒️🖊️ New values: gen_multiplier={new_retirement_multiplier}, daily_multiplier={new_daily_multiplier}, last_activity={last_activity_time}, last_multiplier_update={last_multiplier_update}")
+# Statement builders are shared by the async helpers and the legacy sync shims below.
+def _select_user_stmt(user_id):
+    return select(players).where(players.c.user_id == safe_id(user_id))
 
+def _user_data_values(new_retirement_multiplier, new_daily_multiplier, last_activity_time, last_multiplier_update=None):
     values = {
         "multiplier": new_retirement_multiplier,
         "daily_multiplier": new_daily_multiplier,
@@ -71,43 +60,119 @@ def update_user_data(user_id, new_retirement_multiplier, new_daily_multiplier, l
 
     if last_multiplier_update is not None:
         values["last_multiplier_update"] = last_multiplier_update
+    return values
 
-    with engine.connect() as conn:
-        conn.execute(players.update().where(players.c.user_id == safe_id(user_id)).values(**values))
-        conn.commit()
+def _debug_user_data_update(user_id, username, values):
+    if username:
+        print(f"[DEBUG]🗒️🖊️ update_user_data called for {username} ({user_id})")
+    else:
+        print(f"[DEBUG]🗒️🖊️ update_user_data called for user_id={user_id}")
 
-    print("[DEBUG]🗒️🖊️☑️ User data updated in database")
+    print(f"[DEBUG]🗒️🖊️ New values: gen_multiplier={values['multiplier']}, daily_multiplier={values['daily_multiplier']}, last_activity={values['last_message_ts']}, last_multiplier_update={values.get('last_multiplier_update')}")
 
-def update_user_gold(user_id, new_gold_amount, type_: str = "gold_update", description: str = ""):
+def _check_gold_amount(new_gold_amount):
     if not isinstance(new_gold_amount, int):
         raise ValueError(f"[ERROR] Gold must be an integer, got {type(new_gold_amount)}")
 
-    user_data = get_user_data(user_id)
-    if not user_data:
-        raise ValueError(f"[ERROR] No user data found for ID {user_id}")
+def _adjust_player_stmt(user_id, deltas, require):
+    for column, delta in deltas.items():
+        if column not in players.c or column == "user_id":
+            raise ValueError(f"[ERROR] Unknown player column: {column}")
+        if column == "gold":
+            _check_gold_amount(delta)
+        elif not isinstance(delta, (int, float)):
+            raise ValueError(f"[ERROR] Delta for {column} must be a number, got {type(delta)}")
+
+    return (
+        players.update()
+        .where(players.c.user_id == safe_id(user_id), *require)
+        .values({players.c[column]: players.c[column] + delta for column, delta in deltas.items()})
+        .returning(*players.c)
+    )
 
-    old_gold = user_data.get("gold", 0)
-    delta = new_gold_amount - old_gold
+### ASYNC (use these from cogs; reads and writes go through the write-behind player cache) ###
+async def get_user_data_async(user_id):
+    return await player_cache.get(user_id)  # Returns the full row as a dict
 
+async def update_user_data_async(user_id, new_retirement_multiplier, new_daily_multiplier, last_activity_time, last_multiplier_update=None, username=None):
+    values = _user_data_values(new_retirement_multiplier, new_daily_multiplier, last_activity_time, last_multiplier_update)
+    _debug_user_data_update(user_id, username, values)
+
+    await player_cache.update(user_id, **values)
+    cooldown_index.record(user_id, last_activity_time)  # Keep the cooldown index in step with last_message_ts
+
+    print("[DEBUG]🗒️🖊️☑️ User data updated in cache")
+
+async def adjust_player(user_id, *, require=(), type_: str = "gold_update", description: str = "", conn=None, **deltas):
+    """
+    Atomically add deltas to player columns, e.g. adjust_player(uid, gold=-cost, require=[players.c.gold >= cost]).
+    One UPDATE ... SET col = col + :delta WHERE <require> RETURNING; a gold change is logged to the ledger
+    in the same call. Returns the updated row as a dict, or None if the player doesn't exist or a guard failed.
+
+    Pass `conn` to join a larger transaction; the ledger row is then written in it too. The cached row is
+    refreshed immediately, so a caller that rolls back should `player_cache.discard(user_id)`.
+    """
+    user_id = safe_id(user_id)
+    stmt = _adjust_player_stmt(user_id, deltas, require)
+
+    # Land pending cached changes first so `require` guards see them (cached counters are deltas, so this is only for the guards)
+    await player_cache.flush(only=[user_id])
+
+    async with player_cache.writing(user_id):
+        if conn is not None:
+            row = (await conn.execute(stmt)).fetchone()
+            if row is not None and deltas.get("gold"):
+                await log_transaction_async(user_id, deltas["gold"], type_, description, conn=conn)
+        else:
+            async with async_engine.begin() as own_conn:
+                row = (await own_conn.execute(stmt)).fetchone()
+
+        if row is not None:
+            row = dict(row._mapping)
+            player_cache.apply(user_id, **{column: row[column] for column in deltas})
+
+    if row is None:
+        if DEBUG:
+            print(f"[DEBUG]💰 adjust_player rejected for {user_id}: {deltas} (no player or guard failed)")
+        return None
+
+    if conn is None and deltas.get("gold"):
+        await log_transaction_async(user_id, deltas["gold"], type_, description)
     if DEBUG:
-        print(f"[DEBUG]💰 Updating gold for user {user_id} → {new_gold_amount} (Δ {delta})")
+        print(f"[DEBUG]💰 Adjusted {user_id}: {deltas} → " + ", ".join(f"{column}={row[column]}" for column in deltas))
+    return row
+
+async def get_all_user_ids_async():
+    async with async_engine.connect() as conn:
+        result = await conn.execute(select(players.c.user_id))
+        return [str(row[0]) for row in result.fetchall()]
 
+### SYNC SHIMS (kept while the remaining callers migrate; they block the event loop and bypass the player cache) ###
+def get_user_data(user_id):
     with engine.connect() as conn:
-        conn.execute(
-            players.update()
-            .where(players.c.user_id == safe_id(user_id))
-            .values(gold=new_gold_amount)
-        )
-        conn.commit()
+        row = conn.execute(_select_user_stmt(user_id)).fetchone()
 
-    # Log the transaction
-    if delta != 0:
-        log_transaction(user_id, delta, type_, description)
+    if row:
+        return dict(row._mapping)  # Returns the full row as a dict
+    return None
 
-    if DEBUG:
-        print(f"[DEBUG]💰 Gold updated and transaction logged for {user_id}")
 
+def update_user_data(user_id, new_retirement_multiplier, new_daily_multiplier, last_activity_time, last_multiplier_update=None, username=None):
+    values = _user_data_values(new_retirement_multiplier, new_daily_multiplier, last_activity_time, last_multiplier_update)
+    _debug_user_data_update(user_id, username, values)
+
+    with engine.begin() as conn:
+        conn.execute(players.update().where(players.c.user_id == safe_id(user_id)).values(**values))
+
+    print("[DEBUG]🗒️🖊️☑️ User data updated in database")
 
+def adjust_player_sync(user_id, *, require=(), type_: str = "gold_update", description: str = "", **deltas):
+    """Blocking counterpart of adjust_player for the remaining sync shims."""
+    with engine.begin() as conn:
+        row = conn.execute(_adjust_player_stmt(user_id, deltas, require)).fetchone()
+        if row is not None and deltas.get("gold"):
+            log_transaction(user_id, deltas["gold"], type_, description, conn=conn)
+    return dict(row._mapping) if row is not None else None
 
 def get_all_user_ids():
     with engine.connect() as conn:
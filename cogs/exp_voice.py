@@ -1,71 +1,182 @@
-import asyncio
-import os
+import time
 import traceback
-from discord.ext import commands
+import discord
+from discord.ext import commands, tasks
 
 from cogs.exp_config import (
     EXP_CHANNEL_ID,
 )
 
 from cogs.exp_engine import (
-    handle_exp_gain, on_user_comment, check_and_reset_multiplier, 
+    award_voice_batch, announce_level_ups, voice_carry,
 )
 
+DEBUG = True
+VOICE_TICK_SECONDS = 300   # How often open sessions are credited
+MIN_CREDIT_SECONDS = 60    # Open sessions with less banked time than this wait for the next tick
+
+
 class VoiceExpCog(commands.Cog):
+    """
+    Tracks voice presence from on_voice_state_update events instead of polling
+    every voice channel. Each session banks seconds spent in a (non-AFK) voice
+    channel; banked time is credited in one batch per guild on each tick and
+    immediately when the member leaves. Time is only taken off a session once
+    its credit succeeds, and a closed session stays until it's fully paid.
+    """
+
     def __init__(self, bot):
         self.bot = bot
-        if not hasattr(self, 'voice_activity_check_task'):  # Prevent multiple tasks
-            self.voice_activity_check_task = self.bot.loop.create_task(self.check_voice_activity())
-            print("[DEBUG]📢 VoiceExpCog initialized and background task started.")
-        else:
-            print("[DEBUG] Background task already running.")
-
-    def cog_unload(self):
-        if hasattr(self, 'voice_activity_check_task'):
-            self.voice_activity_check_task.cancel()  # Proper cleanup on cog unload
-            print("[DEBUG]📢 VoiceExpCog unloaded and background task canceled.")
-
-    async def check_voice_activity(self):
-        print("[DEBUG]📢 Background task for checking voice channel activity started.")
-        await self.bot.wait_until_ready()
+        self.sessions = {}  # user_id -> {"guild_id", "joined_at", "since", "banked", "crediting", "open"}
+        self.credited_seconds = 0.0
 
-        while not self.bot.is_closed():
-            try:
-                for guild in self.bot.guilds:
-                    print(f"[DEBUG]📢 Checking guild: {guild.name} (ID: {guild.id})")
-                    for vc in guild.voice_channels:
-                        print(f"[DEBUG]📢 Checking voice channel: {vc.name} - {len(vc.members)} members.") # (ID: {vc.id}) with {len(vc.members)} members.")
-                        for member in vc.members:
-                            if not member.bot:
-                                print(f"[DEBUG]📢👁️‍🗨️ Processing member: {member.display_name}  in voice channel: {vc.name} - (DISCORD ID: {member.id})")  #(ID: {vc.id})
-                                await self.process_user_activity(self.bot, member.id)
+    async def cog_load(self):
+        self.credit_voice_time.start()
+        print("[DEBUG]📢 VoiceExpCog initialized; tracking voice sessions from events.")
 
-            except Exception as e:
-                print(f"[ERROR] Exception in voice activity task: {e}")
-                traceback.print_exc()
+    async def cog_unload(self):
+        self.credit_voice_time.cancel()
+        # Credit whatever is banked so unloading doesn't lose voice time
+        await self.credit_sessions(min_seconds=0)
+        print("[DEBUG]📢 VoiceExpCog unloaded and open sessions credited.")
 
-            await asyncio.sleep(300)  # Sleep for 5 minutes
+    @staticmethod
+    def _counts(state: discord.VoiceState):
+        channel = state.channel if state else None
+        return channel is not None and channel != channel.guild.afk_channel
 
-    async def process_user_activity(self, bot, user_id):
-        """Process activity for a user, assuming voice channel presence."""
-        guild = bot.get_guild(int(os.getenv("GUILD_ID")))
-        member = guild.get_member(int(user_id))
+    def _is_open(self, user_id):
+        session = self.sessions.get(user_id)
+        return session is not None and session["open"]
 
-        if member is None or member.bot:
-            print(f"[DEBUG]📢❌ Member {user_id} invalid or bot. Skipping.")
+    def _open(self, member, now):
+        session = self.sessions.get(member.id)
+        if session is not None:
+            # Rejoined before the last stretch was paid; keep what's banked
+            session.update(guild_id=member.guild.id, joined_at=now, since=now, open=True)
             return
+        self.sessions[member.id] = {
+            "guild_id": member.guild.id, "joined_at": now, "since": now,
+            "banked": 0.0, "crediting": 0.0, "open": True,
+        }
+
+    def _close_if_paid(self, user_id):
+        session = self.sessions.get(user_id)
+        if session is not None and not session["open"] and session["banked"] <= 0 and session["crediting"] <= 0:
+            del self.sessions[user_id]
+            voice_carry.pop(str(user_id), None)
+
+    def _bank(self, session, now):
+        session["banked"] += now - session["since"]
+        session["since"] = now
+
+    def seed_sessions(self):
+        """Open sessions for members already in voice when the bot (re)connects."""
+        now = time.time()
+        for guild in self.bot.guilds:
+            for vc in guild.voice_channels:
+                if vc == guild.afk_channel:
+                    continue
+                for member in vc.members:
+                    if not member.bot and not self._is_open(member.id):
+                        self._open(member, now)
+        if DEBUG:
+            print(f"[DEBUG]📢 Seeded {len(self.sessions)} open voice session(s).")
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.seed_sessions()
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if member.bot:
+            return
+
+        was_in, now_in = self._counts(before), self._counts(after)
+        now = time.time()
 
-        if member.voice and member.voice.channel:
-            print(f"[DEBUG]📢☑️ Member {member.display_name} (ID: {user_id}) is still in a voice channel: {member.voice.channel.name}.")
-            # Simulate message handling for EXP gain
-            fake_message = type('FakeMessage', (object,), {'author': member, 'guild': guild})
-            await handle_exp_gain(fake_message, EXP_CHANNEL_ID)
-            await on_user_comment(user_id, bot)
-            await check_and_reset_multiplier(user_id, bot)
-        else:
-            print(f"[DEBUG]📢❌ Member {member.display_name} (ID: {user_id}) is not in a voice channel or has left.")
+        if now_in and not was_in:
+            if not self._is_open(member.id):
+                self._open(member, now)
+                if DEBUG:
+                    print(f"[DEBUG]📢🔊 {member.display_name} joined {after.channel.name}.")
+        elif was_in and not now_in:
+            if not self._is_open(member.id):
+                return
+            session = self.sessions[member.id]
+            self._bank(session, now)
+            session["open"] = False
+            if DEBUG:
+                print(f"[DEBUG]📢🔇 {member.display_name} left voice after {now - session['joined_at']:.0f}s.")
+            try:
+                await self._credit_guild(member.guild, [member.id])
+            except Exception as e:
+                print(f"[ERROR] Failed to credit voice time for {member.id} (kept for the next tick): {e}")
+        # Moves between counted channels keep the session open
+
+    @tasks.loop(seconds=VOICE_TICK_SECONDS)
+    async def credit_voice_time(self):
+        try:
+            await self.credit_sessions()
+        except Exception as e:
+            print(f"[ERROR] Exception in voice credit tick: {e}")
+            traceback.print_exc()
+
+    @credit_voice_time.before_loop
+    async def before_credit_voice_time(self):
+        await self.bot.wait_until_ready()
+        self.seed_sessions()
+
+    async def credit_sessions(self, min_seconds=MIN_CREDIT_SECONDS):
+        """Bank open sessions and credit each guild's members in one batched write."""
+        now = time.time()
+        by_guild = {}
+        for user_id, session in self.sessions.items():
+            if session["open"]:
+                self._bank(session, now)
+            # Closed sessions still hold time from a credit that failed; always retry those
+            if session["banked"] > 0 and (session["banked"] >= min_seconds or not session["open"]):
+                by_guild.setdefault(session["guild_id"], []).append(user_id)
+
+        credited = {}
+        for guild_id, user_ids in by_guild.items():
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                continue
+            try:
+                credited.update(await self._credit_guild(guild, user_ids))
+            except Exception as e:
+                print(f"[ERROR] Voice credit failed for guild {guild_id} (kept for the next tick): {e}")
+        return credited
+
+    async def _credit_guild(self, guild, user_ids):
+        """Credit the sessions' banked time; it's taken off each session only once the award succeeds."""
+        seconds_by_user = {}
+        for user_id in user_ids:
+            session = self.sessions.get(user_id)
+            if session is not None and session["banked"] > 0:
+                seconds_by_user[user_id] = session["banked"]
+                session["crediting"] += session["banked"]
+                session["banked"] = 0.0
+        if not seconds_by_user:
+            return {}
+
+        credited = set()
+        try:
+            level_ups, credited = await award_voice_batch(guild, seconds_by_user)
+        finally:
+            for user_id, seconds in seconds_by_user.items():
+                session = self.sessions[user_id]
+                session["crediting"] -= seconds
+                if str(user_id) not in credited:
+                    session["banked"] += seconds   # Not awarded; retried on the next tick
+                self._close_if_paid(user_id)
+
+        paid = {user_id: seconds for user_id, seconds in seconds_by_user.items() if str(user_id) in credited}
+        self.credited_seconds += sum(paid.values())
+        await announce_level_ups(guild, level_ups, EXP_CHANNEL_ID)
+        return paid
 
 async def setup(bot):
     await bot.add_cog(VoiceExpCog(bot))
     print("[DEBUG]📢🫡 VoiceExpCog has been added to the bot.")
-
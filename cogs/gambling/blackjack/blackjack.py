@@ -4,8 +4,9 @@ from discord import Embed, Interaction
 from sqlalchemy import select, update, insert
 
 from cogs.gambling.gambling_ui_common import BackToGameButton, PlayAgainButton, RefreshGoldButton
-from cogs.exp_utils import get_user_data, update_user_gold
-from cogs.exp_config import EXP_CHANNEL_ID, engine
+from cogs.exp_utils import get_user_data_async, adjust_player
+from cogs.exp_config import EXP_CHANNEL_ID, async_engine
+from cogs.exp_announcer import announcer
 
 from cogs.gambling.blackjack.blackjack_utils import create_shoe, draw_card, format_hand, hand_value
 from cogs.gambling.bet_amount import BetAmountDropdown
@@ -37,7 +38,7 @@ class BlackjackGameView(BaseCogView):
         self.add_item(BackToGameButton(user_id=self.user_id, parent=self.parent or self, cog=self.cog))
         self.add_item(RefreshGoldButton())
 
-    def get_embed(self, reveal_dealer=False, final=False, delta=None):
+    async def get_embed(self, reveal_dealer=False, final=False, delta=None):
         embed = Embed(title="🃏 Blackjack", color=discord.Color.green())
         embed.add_field(
             name="Your Hand",
@@ -56,7 +57,7 @@ class BlackjackGameView(BaseCogView):
             embed.add_field(name="🎲 Result", value=self.evaluate_result(delta=delta), inline=False)
 
         embed.set_image(url="https://theknightsofmalta.net/wp-content/uploads/2025/05/blackjack.png")  # replace with your themed blackjack banner
-        user_data = get_user_data(self.user_id) or {"gold": 0}
+        user_data = await get_user_data_async(self.user_id) or {"gold": 0}
         embed.add_field(name="💰 Gold", value=f"**{user_data['gold']}**", inline=False)
 
         
@@ -106,12 +107,10 @@ class BlackjackGameView(BaseCogView):
             payout = 0
 
         # Gold update
-        user_data = get_user_data(self.user_id) or {"gold": 0}
         delta = payout - self.bet
-        user_data["gold"] += delta
-        update_user_gold(
+        await adjust_player(
             self.user_id,
-            user_data["gold"],
+            gold=delta,
             type_="gamble_win" if delta > 0 else "gamble_loss" if delta < 0 else "gamble_tie",
             description=f"{'Won' if delta > 0 else 'Lost' if delta < 0 else 'Tied'} Blackjack for {abs(delta)} gold"
         )
@@ -119,8 +118,8 @@ class BlackjackGameView(BaseCogView):
 
         # Stats update
         now = int(time.time())
-        with engine.begin() as conn:
-            existing = conn.execute(select(gambling_stats).where(gambling_stats.c.user_id == self.user_id)).fetchone()
+        async with async_engine.begin() as conn:
+            existing = (await conn.execute(select(gambling_stats).where(gambling_stats.c.user_id == self.user_id))).fetchone()
             values = {
                 "total_bets": (existing.total_bets + 1) if existing else 1,
                 "total_won": (existing.total_won + payout) if payout > 0 and existing else (payout if payout > 0 else 0),
@@ -129,25 +128,28 @@ class BlackjackGameView(BaseCogView):
                 "last_gamble_ts": now
             }
             if existing:
-                conn.execute(update(gambling_stats).where(gambling_stats.c.user_id == self.user_id).values(**values))
+                await conn.execute(update(gambling_stats).where(gambling_stats.c.user_id == self.user_id).values(**values))
             else:
-                conn.execute(insert(gambling_stats).values(user_id=self.user_id, **values))
+                await conn.execute(insert(gambling_stats).values(user_id=self.user_id, **values))
 
         # Public result message
         exp_channel = interaction.client.get_channel(EXP_CHANNEL_ID)
         if exp_channel:
             bet_amount = self.bet
             if delta > 0:
-                await exp_channel.send(
+                await announcer.announce(
+                    exp_channel, "gamble",
                     f"🃏 **{interaction.user.display_name}** bet **{bet_amount}** gold in Blackjack and won 🤑 "
                     f"**+{delta}** gold!"
                 )
             elif delta < 0:
-                await exp_channel.send(
+                await announcer.announce(
+                    exp_channel, "gamble",
                     f"🃏 **{interaction.user.display_name}** bet **{bet_amount}** gold in Blackjack and lost 💀"
                 )
             else:
-                await exp_channel.send(
+                await announcer.announce(
+                    exp_channel, "gamble",
                     f"🃏 **{interaction.user.display_name}** bet **{bet_amount}** gold in Blackjack and tied 🤝"
                 )
 
@@ -156,7 +158,7 @@ class BlackjackGameView(BaseCogView):
         self.add_item(BackToGameButton(user_id=self.user_id, parent=self.parent, cog=self.cog))
         self.add_item(PlayAgainButton(game_key="blackjack"))
         self.add_item(RefreshGoldButton())
-        await interaction.response.edit_message(embed=self.get_embed(reveal_dealer=True, final=True), view=self)
+        await interaction.response.edit_message(embed=await self.get_embed(reveal_dealer=True, final=True), view=self)
 
 class HitButton(Button):
     def __init__(self, game: BlackjackGameView):
@@ -171,7 +173,7 @@ class HitButton(Button):
         if hand_value(self.game.player_hand) > 21:
             await self.game.finalize_game(interaction)
         else:
-            await interaction.response.edit_message(embed=self.game.get_embed(), view=self.game)
+            await interaction.response.edit_message(embed=await self.game.get_embed(), view=self.game)
 
 
 class StandButton(Button):
@@ -214,6 +216,6 @@ class DrawCardsButton(discord.ui.Button):
 
         self.disabled = True
         await interaction.response.edit_message(
-            embed=self.view_ref.get_embed(),
+            embed=await self.view_ref.get_embed(),
             view=self.view_ref
         )
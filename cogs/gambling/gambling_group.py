@@ -6,7 +6,7 @@ from discord.ext import commands
 from sqlalchemy import select
 from cogs.exp_config import engine
 from cogs.database.gambling_stats_table import gambling_stats
-from cogs.exp_utils import get_user_data
+from cogs.exp_utils import get_user_data_async
 from cogs.gambling.UI_MainMenu import GamblingMenuView
 
 class GamblingGroup(commands.Cog):
@@ -24,7 +24,7 @@ async def gamble_menu(interaction: Interaction):
         await interaction.response.send_message("❌ Only admins can use this command.", ephemeral=True)
         return
 
-    user_data = get_user_data(interaction.user.id)
+    user_data = await get_user_data_async(interaction.user.id)
     if not user_data:
         await interaction.response.send_message("❌ Could not fetch user data.", ephemeral=True)
         return
@@ -5,8 +5,9 @@ from zoneinfo import ZoneInfo
 import random
 from discord import Interaction, Embed
 from sqlalchemy import select, insert, update
-from cogs.exp_config import engine, EXP_CHANNEL_ID
-from cogs.exp_utils import get_user_data, update_user_gold
+from cogs.exp_config import async_engine, EXP_CHANNEL_ID, players
+from cogs.exp_utils import get_user_data_async, adjust_player
+from cogs.exp_announcer import announcer
 from cogs.database.gambling_stats_table import gambling_stats
 from cogs.gambling.games_loader import GAMES
 
@@ -15,7 +16,7 @@ receipt_emojis = ["🧾", "📄", "📑", "🗂️", "🗄️"]
 receipt_icon = random.choice(receipt_emojis)
 
 async def handle_gamble_result(interaction: Interaction, user_id: int, game_key: str, amount: int):
-    user_data = get_user_data(user_id)
+    user_data = await get_user_data_async(user_id)
     now = int(time.time())
 
     if not interaction.response.is_done():
@@ -66,19 +67,24 @@ async def handle_gamble_result(interaction: Interaction, user_id: int, game_key:
     win = random.random() < game["odds"]
     payout = int(amount * game["payout"]) if win else 0
     net_change = payout - amount
-    user_data["gold"] += net_change
-    user_data["last_gamble_ts"] = now
-    update_user_gold(
+    # The stake is guarded in the same statement, so a parallel game can't spend it twice
+    row = await adjust_player(
         user_id,
-        user_data["gold"],
+        gold=net_change,
+        require=[players.c.gold >= amount],
         type_="gamble_win" if win else "gamble_loss",
         description=f"{'Won' if win else 'Lost'} {game['name']} for {abs(net_change)} gold"
     )
+    if row is None:
+        await interaction.followup.send(f"❌ You need at least {amount} gold to play.", ephemeral=True)
+        return
+    user_data["gold"] = row["gold"]
+    user_data["last_gamble_ts"] = now
 
 
     # Record stats
-    with engine.begin() as conn:
-        existing = conn.execute(select(gambling_stats).where(gambling_stats.c.user_id == user_id)).fetchone()
+    async with async_engine.begin() as conn:
+        existing = (await conn.execute(select(gambling_stats).where(gambling_stats.c.user_id == user_id))).fetchone()
         values = {
             "total_bets": (existing.total_bets + 1) if existing else 1,
             "total_won": (existing.total_won + payout) if win and existing else (payout if win else 0),
@@ -87,9 +93,9 @@ async def handle_gamble_result(interaction: Interaction, user_id: int, game_key:
             "last_gamble_ts": now
         }
         if existing:
-            conn.execute(update(gambling_stats).where(gambling_stats.c.user_id == user_id).values(**values))
+            await conn.execute(update(gambling_stats).where(gambling_stats.c.user_id == user_id).values(**values))
         else:
-            conn.execute(insert(gambling_stats).values(user_id=user_id, **values))
+            await conn.execute(insert(gambling_stats).values(user_id=user_id, **values))
 
 
 
@@ -123,10 +129,12 @@ async def handle_gamble_result(interaction: Interaction, user_id: int, game_key:
 
     if exp_channel:
         if win:
-            await exp_channel.send(
+            await announcer.announce(
+                exp_channel, "gamble",
                 f"♠️ ♥️ ♦️ ♣️ **{interaction.user.display_name}** wagered **{amount}** gold on {game['name']} {game['emoji']} and won 🤑 **+{net_change}** gold!"
             )
         else:
-            await exp_channel.send(
+            await announcer.announce(
+                exp_channel, "gamble",
                 f"♠️ ♥️ ♦️ ♣️ **{interaction.user.display_name}** wagered **{amount}** gold on {game['name']} {game['emoji']} and lost 💀."
             )
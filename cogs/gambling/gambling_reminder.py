@@ -5,6 +5,7 @@ import datetime
 import pytz
 import random
 from cogs.exp_config import EXP_CHANNEL_ID
+from cogs.message_scheduler import scheduler, PRIORITY_REMINDER
 
 CENTRAL_TZ = pytz.timezone("America/Chicago")
 REMINDER_HOURS = {12, 15, 18}  # 12 PM, 3 PM, 6 PM CST
@@ -49,7 +50,7 @@ class GambleReminder(commands.Cog):
             embed.set_thumbnail(url=variant["img"])
             embed.set_footer(text="Games are available all day - don't miss your chance!")
 
-            await channel.send(content=variant["line"], embed=embed)
+            await scheduler.send(channel, content=variant["line"], embed=embed, priority=PRIORITY_REMINDER)
 
     @gamble_reminder.before_loop
     async def before_gamble_reminder(self):
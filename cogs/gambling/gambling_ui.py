@@ -2,7 +2,7 @@ import discord
 from discord.ui import View
 from discord import Interaction, Embed
 
-from cogs.exp_utils import get_user_data
+from cogs.exp_utils import get_user_data_async
 from cogs.gambling.games_loader import GAMES
 from cogs.gambling.blackjack.blackjack import BlackjackGameView
 from cogs.gambling.roulette.roulette import RouletteOptionView
@@ -153,7 +153,7 @@ class BackToGamblingMenuButton(BaseCogButton):
             description="Pick your game to begin.",
             color=discord.Color.green()
         )
-        user_data = get_user_data(interaction.user.id)
+        user_data = await get_user_data_async(interaction.user.id)
         gold = user_data["gold"] if user_data else 0
         embed.set_footer(text=f"💰 Gold: {gold}")
         await interaction.response.edit_message(embed=embed, view=view)
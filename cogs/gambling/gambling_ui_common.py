@@ -3,7 +3,7 @@ import discord
 from discord import Interaction, Embed
 from discord.ui import Button, View
 
-from cogs.exp_utils import get_user_data, get_user_data
+from cogs.exp_utils import get_user_data_async
 from cogs.gambling.bet_amount import BetAmountDropdown
 from cogs.gambling.play_button import GamblingPlayButton
 from cogs.x_utilities.ui_base import BaseCogButton, BaseCogView
@@ -24,7 +24,7 @@ class PlayAgainButton(Button):
         try:
             # Extract game_key from custom_id
             game_key = self.custom_id.removeprefix("persistent_play_again_")
-            user_data = get_user_data(user_id) or {"gold": 0}
+            user_data = await get_user_data_async(user_id) or {"gold": 0}
             gold = user_data.get("gold", 0)
 
             if game_key == "blackjack":
@@ -93,7 +93,7 @@ class RefreshGoldButton(discord.ui.Button):
         )
 
     async def callback(self, interaction: Interaction):
-        user_data = get_user_data(interaction.user.id)
+        user_data = await get_user_data_async(interaction.user.id)
         gold = user_data.get("gold", 0)
 
         # 💡 Send updated gold info privately
@@ -125,23 +125,23 @@ class BackToGameButton(BaseCogButton):
         self.cog = cog
 
     async def callback(self, interaction: Interaction):
-        from cogs.exp_utils import get_user_data, update_user_gold
+        from cogs.exp_utils import get_user_data_async, adjust_player
         from cogs.exp_config import EXP_CHANNEL_ID
+        from cogs.exp_announcer import announcer
         from cogs.gambling.gambling_ui import GameSelectionView
 
-        user_data = get_user_data(self.user_id) or {"gold": 0}
+        user_data = await get_user_data_async(self.user_id) or {"gold": 0}
 
         # 💥 Penalize if the game was in progress
         if hasattr(self.parent, "player_hand") and self.parent.player_hand:
             penalty = getattr(self.parent, "bet", 100)
 
-            user_data["gold"] -= penalty
-            update_user_gold(
+            user_data = await adjust_player(
                 self.user_id,
-                user_data["gold"],
+                gold=-penalty,
                 type_="gamble_quit",
                 description=f"Left Blackjack early and lost {penalty} gold"
-            )
+            ) or user_data
 
             # 🕵️ Ephemeral to user (safe send)
             embed_notice = discord.Embed(
@@ -159,7 +159,8 @@ class BackToGameButton(BaseCogButton):
             # 📢 Public announcement
             exp_channel = interaction.client.get_channel(EXP_CHANNEL_ID)
             if exp_channel:
-                await exp_channel.send(
+                await announcer.announce(
+                    exp_channel, "gamble",
                     f"🏳️ **{interaction.user.display_name}** fled from a Blackjack game and forfeited **{penalty:,}** gold!"
                 )
 
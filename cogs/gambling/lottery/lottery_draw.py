@@ -0,0 +1,69 @@
+import random
+import secrets
+from itertools import accumulate
+
+
+def new_seed():
+    """Seed for one draw; stored with the results so the draw can be replayed."""
+    return secrets.randbits(63)
+
+
+def split_pot(pot, tiers):
+    """Prize per tier from pot fractions; rounding leftovers go to the first tier so no gold is lost."""
+    prizes = [int(pot * share) for share in tiers]
+    if prizes:
+        prizes[0] += pot - sum(prizes)
+    return prizes
+
+
+def draw_winners(weights, winners, seed):
+    """
+    Pick `winners` distinct indices, each with probability proportional to its
+    weight among the entries not yet drawn. Samples from a Fenwick tree of
+    cumulative weights: O(n) to build, O(log n) per winner and per removal, and
+    one int per entrant however many tickets they hold. The same weights (in the
+    same order) and seed always give the same result.
+    """
+    rng = random.Random(seed)
+    weights = list(weights)
+    size = len(weights)
+
+    # tree[i] holds the sum of weights[i - (i & -i):i], taken from the running totals
+    running = [0, *accumulate(weights)]
+    tree = [running[i] - running[i & (i - 1)] for i in range(size + 1)]
+    total = running[-1]
+    top_step = 1 << (size.bit_length() - 1) if size else 0
+
+    picked = []
+    for _ in range(min(winners, size - weights.count(0))):
+        # Descend to the first entry whose cumulative weight exceeds the target
+        # (what bisect_right over the running totals would return)
+        target = rng.randrange(total)
+        position, step = 0, top_step
+        while step:
+            candidate = position + step
+            if candidate <= size and tree[candidate] <= target:
+                position = candidate
+                target -= tree[candidate]
+            step >>= 1
+        picked.append(position)
+
+        # Without replacement: take the winner's weight out of every node covering it
+        weight, weights[position] = weights[position], 0
+        total -= weight
+        i = position + 1
+        while i <= size:
+            tree[i] -= weight
+            i += i & -i
+    return picked
+
+
+def draw_tiers(entries, pot, tiers, seed):
+    """
+    Run a full draw over `entries` (rows with user_id / user_name / tickets, in a
+    stable order such as by user_id). Returns [(tier, entry, prize)] for tier 1..n;
+    tiers beyond the number of entrants are left undrawn and their share goes to tier 1.
+    """
+    indices = draw_winners([entry.tickets for entry in entries], len(tiers), seed)
+    prizes = split_pot(pot, tiers[:len(indices)])
+    return [(tier + 1, entries[index], prizes[tier]) for tier, index in enumerate(indices)]
@@ -1,5 +1,4 @@
 import time
-import random
 import discord
 from discord import app_commands, Interaction, Embed
 from discord.ext import commands, tasks
@@ -9,18 +8,24 @@ from datetime import datetime, timedelta
 import pytz
 from collections import defaultdict
 
-from cogs.exp_utils import get_user_data, update_user_gold
+from cogs.exp_utils import get_user_data_async, adjust_player
+from cogs.exp_cache import player_cache
 from cogs.gambling.lottery.lottery_menu_UI import LotteryMainView
 from cogs.gambling.lottery.lottery_halloffame_UI import HallOfFameView
-from cogs.exp_config import engine, EXP_CHANNEL_ID
+from cogs.exp_config import async_engine, EXP_CHANNEL_ID, players
+from cogs.exp_announcer import announcer
+from cogs.message_scheduler import scheduler, PRIORITY_HIGH
 from cogs.database.lottery_entries_table import lottery_entries
 from cogs.database.lottery_history_table import lottery_history
+from cogs.gambling.lottery.lottery_draw import new_seed, draw_tiers
+from cogs.gambling.lottery.lottery_round import lottery_round
 
 lottery_group = app_commands.Group(name="lottery", description="🎟️ Malta's Weekly Lottery")
 
 DEBUG = True
 TICKET_COST = 100
 MAX_TICKETS = 10000
+PRIZE_TIERS = (1.0,)   # Share of the pot per winner, tier 1 first; e.g. (0.6, 0.3, 0.1) for three winners
 
 CENTRAL_TZ = pytz.timezone("America/Chicago")
 DRAW_WEEKDAY = 6  # Sunday
@@ -37,25 +42,23 @@ class LotteryGroup(commands.Cog):
         self.last_halloffame_ts = 0
         self.run_lottery_check.start()
 
+    async def cog_load(self):
+        await lottery_round.warm()
+
     def cog_unload(self):
         self.run_lottery_check.cancel()
 
     async def build_stats_embed(self, user):
         user_id = user.id
-        user_data = get_user_data(user_id)
+        user_data = await get_user_data_async(user_id)
 
         if not user_data:
             return Embed(title="❌ User not found", color=discord.Color.blue())
 
-        with engine.begin() as conn:
-            total_tickets = conn.execute(select(func.sum(lottery_entries.c.tickets))).scalar_one_or_none() or 0
-            user_tickets = conn.execute(
-                select(func.sum(lottery_entries.c.tickets))
-                .where(lottery_entries.c.user_id == user_id)
-            ).scalar_one_or_none() or 0
-
-        odds = (user_tickets / total_tickets * 100) if total_tickets else 0
-        jackpot = total_tickets * TICKET_COST
+        await lottery_round.ensure_ready()
+        user_tickets = lottery_round.tickets(user_id)
+        odds = lottery_round.odds(user_id) * 100
+        jackpot = lottery_round.total_tickets * TICKET_COST
 
         embed = Embed(title="🎟️ Your Lottery Stats", color=discord.Color.blue())
         embed.add_field(name="Tickets Bought", value=f"**{user_tickets}**", inline=True)
@@ -72,7 +75,7 @@ class LotteryGroup(commands.Cog):
             await interaction.response.send_message("❌ Amount must be greater than zero.", ephemeral=True)
             return
 
-        user_data = get_user_data(user_id)
+        user_data = await get_user_data_async(user_id)
         if not user_data:
             await interaction.response.send_message("❌ User not found.", ephemeral=True)
             return
@@ -86,34 +89,48 @@ class LotteryGroup(commands.Cog):
             )
             return
 
-        # Subtract gold
-        update_user_gold(
-            user_id,
-            gold - ticket_cost,
-            type_="lottery_buy",
-            description=f"Bought {amount} lottery ticket{'s' if amount != 1 else ''} for {ticket_cost} gold"
-        )
-
-
-        # Insert or update lottery_entries
-        with engine.begin() as conn:
-            from sqlalchemy.dialects.postgresql import insert as pg_insert
-            stmt = pg_insert(lottery_entries).values(
-                user_id=user_id,
-                user_name=user_name,
-                tickets=amount,
-                gold_spent=ticket_cost,
-                timestamp=int(time.time()),
-                winnings=0
-            ).on_conflict_do_update(
-                index_elements=[lottery_entries.c.user_id],
-                set_={
-                    "tickets": lottery_entries.c.tickets + amount,
-                    "gold_spent": lottery_entries.c.gold_spent + ticket_cost,
-                    "timestamp": int(time.time())
-                }
+        # Subtract gold and insert or update lottery_entries in one transaction, so a failed entry
+        # can't keep the gold; the returned totals keep the in-memory round current
+        await lottery_round.ensure_ready()
+        stmt = pg_insert(lottery_entries).values(
+            user_id=user_id,
+            user_name=user_name,
+            tickets=amount,
+            gold_spent=ticket_cost,
+            timestamp=int(time.time()),
+            winnings=0
+        ).on_conflict_do_update(
+            index_elements=[lottery_entries.c.user_id],
+            set_={
+                "tickets": lottery_entries.c.tickets + amount,
+                "gold_spent": lottery_entries.c.gold_spent + ticket_cost,
+                "timestamp": int(time.time())
+            }
+        ).returning(lottery_entries.c.tickets, lottery_entries.c.gold_spent)
+        try:
+            async with async_engine.begin() as conn:
+                # The guard makes a racing second purchase fail instead of overdrawing
+                if await adjust_player(
+                    user_id,
+                    gold=-ticket_cost,
+                    require=[players.c.gold >= ticket_cost],
+                    type_="lottery_buy",
+                    description=f"Bought {amount} lottery ticket{'s' if amount != 1 else ''} for {ticket_cost} gold",
+                    conn=conn
+                ) is None:
+                    entry = None
+                else:
+                    entry = (await conn.execute(stmt)).one()
+        except Exception:
+            player_cache.discard(user_id)  # Drop the debit applied to the cached row
+            raise
+
+        if entry is None:
+            await interaction.response.send_message(
+                f"❌ You need {ticket_cost} gold, but you no longer have enough.", ephemeral=True
             )
-            conn.execute(stmt)
+            return
+        lottery_round.apply(user_id, user_name, entry.tickets, entry.gold_spent)
 
         user_id = interaction.user.id
         now = time.time()
@@ -133,7 +150,8 @@ class LotteryGroup(commands.Cog):
         if counter["count"] <= 3:
             channel = self.bot.get_channel(EXP_CHANNEL_ID)
             if channel:
-                await channel.send(
+                await announcer.announce(
+                    channel, "lottery",
                     f"🎟️ {interaction.user.display_name} just bought **{amount}** ticket{'s' if amount != 1 else ''} for this week's Malta Lottery!"
                 )
             # If this is the 3rd announcement, block further ones for 20 minutes
@@ -147,28 +165,23 @@ class LotteryGroup(commands.Cog):
         # await interaction.followup.send("Tickets bought!", ephemeral=True)
 
     async def build_leaderboard_embed(self):
-        with engine.begin() as conn:
-            rows = conn.execute(
-                select(lottery_entries.c.user_name, func.sum(lottery_entries.c.tickets).label("total"))
-                .group_by(lottery_entries.c.user_name)
-                .order_by(func.sum(lottery_entries.c.tickets).desc())
-                .limit(10)
-            ).fetchall()
+        await lottery_round.ensure_ready()
+        rows = lottery_round.top(10)
 
         if not rows:
             return Embed(title="No ticket purchases yet.", color=discord.Color.blue())
 
-        desc = "\n".join([f"`{i+1}.` **{row.user_name}** — 🎟️ {row.total}" for i, row in enumerate(rows)])
+        desc = "\n".join([f"`{i+1}.` **{user_name}** — 🎟️ {tickets}" for i, (_, user_name, tickets) in enumerate(rows)])
         embed = Embed(title="🏆 Top Ticket Holders", description=desc, color=discord.Color.purple())
         return embed
 
     async def build_history_embed(self):
-        with engine.begin() as conn:
-            rows = conn.execute(
+        async with async_engine.connect() as conn:
+            rows = (await conn.execute(
                 select(lottery_history.c.draw_time, lottery_history.c.winner_name, lottery_history.c.jackpot)
                 .order_by(lottery_history.c.draw_time.desc())
                 .limit(5)
-            ).fetchall()
+            )).fetchall()
 
         if not rows:
             return Embed(title="❌ No lottery draws yet.", color=discord.Color.blue())
@@ -198,13 +211,17 @@ class LotteryGroup(commands.Cog):
         return embed
 
     async def build_help_embed(self):
+        if len(PRIZE_TIERS) == 1:
+            winner_line = "**Winner:** One player is randomly chosen based on ticket weight.\n"
+        else:
+            winner_line = f"**Winners:** {len(PRIZE_TIERS)} different players are randomly chosen based on ticket weight.\n"
         embed = discord.Embed(
             title="🎟️ How the Malta Lottery Works",
             description=(
                 "**Buy Tickets:** Use the **Buy Tickets** button below to purchase entries (100 gold each).\n"
                 "**Draw Time:** Every Sunday at 6 PM CST.\n"
                 "**Jackpot:** Grows with every ticket bought.\n"
-                "**Winner:** One player is randomly chosen based on ticket weight.\n"
+                + winner_line +
                 "**Cooldown:** 30s between purchases.\n\n"
                 "🏆 Use the buttons to view stats, top holders, winners, draw time, Hall of Fame, and help—all here in this menu!"
             ),
@@ -222,7 +239,7 @@ class LotteryGroup(commands.Cog):
         else:
             time_filter = None  # all-time
 
-        with engine.begin() as conn:
+        async with async_engine.connect() as conn:
             query = select(
                 lottery_history.c.winner_name,
                 lottery_history.c.winner_id,
@@ -238,7 +255,7 @@ class LotteryGroup(commands.Cog):
             if time_filter:
                 query = query.where(lottery_history.c.draw_time >= time_filter)
 
-            rows = conn.execute(query).fetchall()
+            rows = (await conn.execute(query)).fetchall()
 
         if not rows:
             return Embed(title="❌ No results for this timeframe.", color=discord.Color.blue())
@@ -272,70 +289,102 @@ class LotteryGroup(commands.Cog):
                 print(f"🎟️ [DEBUG] Running weekly draw at {now.isoformat()}")
             await self.draw_lottery()
 
-    async def draw_lottery(self):
-        with engine.begin() as conn:
-            results = conn.execute(select(lottery_entries)).fetchall()
-            if not results:
-                if DEBUG:
-                    print("🎟️ [DEBUG] No entries found for this week's draw.")
-                return
-
-            tickets_sold = sum(row.tickets for row in results)
-            pot = tickets_sold * TICKET_COST
-            weighted_pool = [row for row in results for _ in range(row.tickets)]
+    async def draw_lottery(self, seed=None):
+        winner_ids = []
+        try:
+            async with async_engine.begin() as conn:
+                # Ordered by user_id so the stored seed replays to the same winners
+                results = (await conn.execute(
+                    select(lottery_entries.c.user_id, lottery_entries.c.user_name, lottery_entries.c.tickets)
+                    .where(lottery_entries.c.tickets > 0)
+                    .order_by(lottery_entries.c.user_id)
+                )).fetchall()
+                if not results:
+                    if DEBUG:
+                        print("🎟️ [DEBUG] No entries found for this week's draw.")
+                    return
+
+                tickets_sold = sum(row.tickets for row in results)
+                pot = tickets_sold * TICKET_COST
+                seed = new_seed() if seed is None else seed
+                winners = draw_tiers(results, pot, PRIZE_TIERS, seed)
+                draw_time = int(get_central_now().timestamp())
+                winner_ids = [entry.user_id for _, entry, _ in winners]
+
+                for tier, entry, prize in winners:
+                    await conn.execute(
+                        update(lottery_entries)
+                        .where(lottery_entries.c.user_id == entry.user_id)
+                        .values(winnings=prize)
+                    )
+
+                await conn.execute(
+                    insert(lottery_history),
+                    [
+                        {
+                            "draw_time": draw_time,
+                            "winner_id": entry.user_id,
+                            "winner_name": entry.user_name,
+                            "jackpot": prize,
+                            "tickets_sold": tickets_sold,
+                            "tier": tier,
+                            "seed": str(seed),
+                        }
+                        for tier, entry, prize in winners
+                    ]
+                )
 
-            if not weighted_pool:
+                await conn.execute(lottery_entries.delete())
                 if DEBUG:
-                    print("🎟️ [DEBUG] No tickets found.")
-                return
-
-            winner_entry = random.choice(weighted_pool)
-            winner_id = winner_entry.user_id
-            winner_name = winner_entry.user_name
-
-            conn.execute(
-                update(lottery_entries)
-                .where(lottery_entries.c.user_id == winner_id)
-                .values(winnings=pot)
-            )
-
-            conn.execute(
-                insert(lottery_history).values(
-                    draw_time=int(get_central_now().timestamp()),
-                    winner_id=winner_id,
-                    winner_name=winner_name,
-                    jackpot=pot,
-                    tickets_sold=tickets_sold
+                    print("🎟️ [DEBUG] Lottery entries have been reset.")
+
+                # Payouts commit together with the history rows and the entry reset. Every winner's
+                # cache lock is taken before the first payout, so locks are acquired in one order.
+                async with player_cache.writing(*winner_ids):
+                    for tier, entry, prize in winners:
+                        await adjust_player(
+                            entry.user_id,
+                            gold=prize,
+                            type_="lottery_win",
+                            description=f"Won tier {tier} of the weekly Malta Lottery for {prize} gold"
+                            if len(winners) > 1 else f"Won the weekly Malta Lottery for {prize} gold",
+                            conn=conn
+                        )
+        except Exception:
+            # Payouts already applied to the cache were rolled back with the draw
+            for winner_id in winner_ids:
+                player_cache.discard(winner_id)
+            raise
+
+        # Re-read rather than clear, so a purchase that landed after the reset isn't lost
+        await lottery_round.warm()
+
+        if DEBUG:
+            for tier, entry, prize in winners:
+                print(f"🎟️ [DEBUG] Tier {tier} winner: {entry.user_name} ({entry.user_id}), Prize: {prize} gold")
+            print(f"🎟️ [DEBUG] Pot: {pot} gold, {len(results)} entrant(s), seed {seed}")
+
+        channel = self.bot.get_channel(EXP_CHANNEL_ID)
+        if channel:
+            if len(winners) == 1:
+                _, entry, _ = winners[0]
+                winner_lines = f"🏆 **Winner**: <@{entry.user_id}> (**{entry.user_name}**)\n"
+            else:
+                medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+                winner_lines = "".join(
+                    f"{medals.get(tier, '🏅')} <@{entry.user_id}> (**{entry.user_name}**) — {prize} gold\n"
+                    for tier, entry, prize in winners
                 )
+            await scheduler.send(
+                channel,
+                f"# 🤑🎟️ The weekly lottery has concluded!\n"
+                f"## 💰 **Jackpot**: {pot} gold\n"
+                f"{winner_lines}\n"
+                f"Congratulations! 🤑\n"
+                f"-# Draw seed `{seed}`",
+                priority=PRIORITY_HIGH
             )
-
-            user_data = get_user_data(winner_id)
-            if user_data:
-                update_user_gold(
-                    winner_id,
-                    user_data["gold"] + pot,
-                    type_="lottery_win",
-                    description=f"Won the weekly Malta Lottery for {pot} gold"
-                )
-
-
-            channel = self.bot.get_channel(EXP_CHANNEL_ID)
-            if channel:
-                await channel.send(
-                    f"# 🤑🎟️ The weekly lottery has concluded!\n"
-                    f"## 💰 **Jackpot**: {pot} gold\n"
-                    f"🏆 **Winner**: <@{winner_id}> (**{winner_name}**)\n\n"
-                    f"Congratulations! 🤑"
-                )
-
-            if DEBUG:
-                print(f"🎟️ [DEBUG] Winner: {winner_name} ({winner_id}), Pot: {pot} gold")
-
-            conn.execute(lottery_entries.delete())
-            if DEBUG:
-                print("🎟️ [DEBUG] Lottery entries have been reset.")
-
-            await channel.send("🧹 All lottery entries have been cleared for the next round. Good luck next week!")
+            await scheduler.send(channel, "🧹 All lottery entries have been cleared for the next round. Good luck next week!", priority=PRIORITY_HIGH)
 
 @lottery_group.command(name="menu", description="🎟️ Open the full lottery menu")
 async def lottery_menu(interaction: Interaction):
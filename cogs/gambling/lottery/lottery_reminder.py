@@ -4,6 +4,7 @@ import random
 import asyncio
 from discord.ext import commands, tasks
 from cogs.exp_config import EXP_CHANNEL_ID
+from cogs.message_scheduler import scheduler, PRIORITY_REMINDER
 import pytz
 from datetime import datetime, timedelta
 
@@ -59,7 +60,7 @@ class LotteryReminder(commands.Cog):
         )
         embed.set_footer(text="Drawing occurs every Sunday at 6 PM CST. Buy tickets anytime before then!")
 
-        await channel.send(content=message, embed=embed)
+        await scheduler.send(channel, content=message, embed=embed, priority=PRIORITY_REMINDER)
         if DEBUG:
             print(f"[DEBUG]✅ Lottery reminder sent at {now}")
 
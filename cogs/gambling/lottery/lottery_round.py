@@ -0,0 +1,112 @@
+import asyncio
+import heapq
+from sqlalchemy import select
+
+from cogs.exp_config import async_engine
+from cogs.database.lottery_entries_table import lottery_entries
+
+DEBUG = True
+
+
+class LotteryRound:
+    """
+    The current week's entries kept in memory: pot, total tickets, per-user
+    tickets and a top-holders heap. Rebuilt from lottery_entries at startup and
+    after each draw; buy_tickets applies the values its upsert returns, so the
+    lottery menu reads never query the database.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.total_tickets = 0
+        self.pot = 0                # Gold spent on tickets this round
+        self._tickets = {}          # user_id -> tickets
+        self._gold_spent = {}       # user_id -> gold spent
+        self._names = {}            # user_id -> display name at last purchase
+        self._heap = []             # (-tickets, user_id); stale pairs are dropped lazily
+        self._replay = None         # Purchases applied while warm() is loading, laid over its snapshot
+        self._warm_lock = asyncio.Lock()
+
+    async def warm(self):
+        async with self._warm_lock:
+            self._replay = []
+            try:
+                async with async_engine.connect() as conn:
+                    rows = (await conn.execute(
+                        select(
+                            lottery_entries.c.user_id,
+                            lottery_entries.c.user_name,
+                            lottery_entries.c.tickets,
+                            lottery_entries.c.gold_spent,
+                        )
+                    )).fetchall()
+            finally:
+                replay, self._replay = self._replay, None
+            self._tickets = {int(row.user_id): row.tickets for row in rows}
+            self._gold_spent = {int(row.user_id): row.gold_spent for row in rows}
+            self._names = {int(row.user_id): row.user_name for row in rows}
+            self._recount()
+            # The snapshot may predate these commits; their totals are absolute, so re-applying is safe either way
+            for purchase in replay:
+                self.apply(*purchase)
+            self.ready = True
+        if DEBUG:
+            print(f"[DEBUG]🎟️ Lottery round loaded: {len(self._tickets)} entrant(s), {self.total_tickets} ticket(s).")
+
+    async def ensure_ready(self):
+        if not self.ready:
+            await self.warm()
+
+    def _recount(self):
+        self.total_tickets = sum(self._tickets.values())
+        self.pot = sum(self._gold_spent.values())
+        self._heap = [(-tickets, user_id) for user_id, tickets in self._tickets.items()]
+        heapq.heapify(self._heap)
+
+    # === Writes ===
+    def apply(self, user_id, user_name, tickets, gold_spent):
+        """Record a user's totals as committed to lottery_entries (the upsert's RETURNING values)."""
+        user_id = int(user_id)
+        if self._replay is not None:
+            self._replay.append((user_id, user_name, tickets, gold_spent))
+        self.total_tickets += tickets - self._tickets.get(user_id, 0)
+        self.pot += gold_spent - self._gold_spent.get(user_id, 0)
+        self._tickets[user_id] = tickets
+        self._gold_spent[user_id] = gold_spent
+        self._names[user_id] = user_name
+        heapq.heappush(self._heap, (-tickets, user_id))
+        if len(self._heap) > 2 * len(self._tickets) + 64:
+            # Mostly stale pairs from repeat buyers; rebuild from the live counts
+            self._heap = [(-count, uid) for uid, count in self._tickets.items()]
+            heapq.heapify(self._heap)
+
+    # === Reads ===
+    def tickets(self, user_id):
+        return self._tickets.get(int(user_id), 0)
+
+    def odds(self, user_id):
+        return self.tickets(user_id) / self.total_tickets if self.total_tickets else 0
+
+    def top(self, n=10):
+        """[(user_id, user_name, tickets)] for the n biggest holders, most tickets first."""
+        top, seen = [], set()
+        while self._heap and len(top) < n:
+            neg_tickets, user_id = heapq.heappop(self._heap)
+            if user_id in seen or self._tickets.get(user_id) != -neg_tickets:
+                continue  # Superseded by a later purchase
+            seen.add(user_id)
+            top.append((neg_tickets, user_id))
+        for pair in top:
+            heapq.heappush(self._heap, pair)
+        return [(user_id, self._names.get(user_id, str(user_id)), -neg_tickets) for neg_tickets, user_id in top]
+
+    def stats(self):
+        return {
+            "entrants": len(self._tickets),
+            "tickets": self.total_tickets,
+            "pot": self.pot,
+            "heap": len(self._heap),
+        }
+
+
+lottery_round = LotteryRound()
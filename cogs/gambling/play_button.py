@@ -1,5 +1,5 @@
 from cogs.gambling.gambling_logic import handle_gamble_result
-from cogs.exp_utils import get_user_data
+from cogs.exp_utils import get_user_data_async
 import asyncio
 import discord
 from discord import Interaction
@@ -24,7 +24,7 @@ class GamblingPlayButton(discord.ui.Button):
         if amount <= 0:
             return await interaction.followup.send("❌ Invalid bet amount.", ephemeral=True)
 
-        user_data = get_user_data(self.user_id) or {"gold": 0}
+        user_data = await get_user_data_async(self.user_id) or {"gold": 0}
 
 
         # ✅ BLACKJACK (custom view-based game)
@@ -3,8 +3,9 @@ import discord
 from discord.ui import View, Button, Modal, TextInput
 from discord import Interaction, Embed
 
-from cogs.exp_utils import update_user_gold
+from cogs.exp_utils import adjust_player
 from cogs.exp_config import EXP_CHANNEL_ID
+from cogs.exp_announcer import announcer
 from cogs.gambling.roulette.roulette_utils import spin_roulette, payout
 from cogs.gambling.gambling_ui_common import BetAmountSelectionView, PlayAgainButton, BackToGameButton, RefreshGoldButton
 from cogs.x_utilities.ui_base import BaseCogView
@@ -49,13 +50,13 @@ class RoulettePlayButton(Button):
         net_change = payout_amount - self.view_ref.bet
 
         # ✅ Update user gold
-        self.view_ref.user_gold += net_change
-        update_user_gold(
+        row = await adjust_player(
             self.view_ref.user_id,
-            self.view_ref.user_gold,
+            gold=net_change,
             type_="roulette_win" if net_change > 0 else "roulette_loss",
             description=f"Roulette: {self.view_ref.bet} on {self.view_ref.choice} ({self.view_ref.bet_type}) → {self.view_ref.result_number} ({self.view_ref.result_color})"
         )
+        self.view_ref.user_gold = row["gold"] if row else self.view_ref.user_gold + net_change
 
 
         # ✅ Broadcast result to EXP_CHANNEL_ID
@@ -63,12 +64,14 @@ class RoulettePlayButton(Button):
         if exp_channel:
             if self.view_ref.payout_multiplier > 0:
                 net_gain = int(self.view_ref.bet * (self.view_ref.payout_multiplier - 1))
-                await exp_channel.send(
+                await announcer.announce(
+                    exp_channel, "gamble",
                     f"🎡 **{interaction.user.display_name}** bet **{self.view_ref.bet}** gold on **{self.view_ref.choice}** "
                     f"({self.view_ref.bet_type}) and won 🤑 **+{net_gain}**!"
                 )
             else:
-                await exp_channel.send(
+                await announcer.announce(
+                    exp_channel, "gamble",
                     f"🎡 **{interaction.user.display_name}** bet **{self.view_ref.bet}** gold on **{self.view_ref.choice}** "
                     f"({self.view_ref.bet_type}) and lost 💀"
                 )
@@ -260,10 +263,10 @@ class BackToRouletteOptionsButton(Button):
         )
 
     async def callback(self, interaction: Interaction):
-        from cogs.exp_utils import get_user_data
+        from cogs.exp_utils import get_user_data_async
         from cogs.gambling.roulette.roulette import RouletteOptionView
 
-        user_data = get_user_data(interaction.user.id)
+        user_data = await get_user_data_async(interaction.user.id)
         if not user_data:
             await interaction.response.send_message("❌ Could not load your data.", ephemeral=True)
             return
@@ -3,7 +3,7 @@ from discord.ext import commands
 from discord import app_commands, Interaction, Embed, ButtonStyle
 from discord.ui import View, Button
 
-from cogs.exp_utils import get_user_data
+from cogs.exp_utils import get_user_data_async
 
 DEBUG = True
 
@@ -96,7 +96,7 @@ class HubGroup(commands.Cog):
     @is_admin()
     async def hub(self, interaction: Interaction):
         user_id = interaction.user.id
-        user_data = get_user_data(user_id)
+        user_data = await get_user_data_async(user_id)
 
         if not user_data:
             await interaction.response.send_message("❌ Couldn't fetch your profile.", ephemeral=True)
@@ -0,0 +1,142 @@
+import time
+from collections import defaultdict
+import discord
+from discord.ext import commands
+
+from cogs.exp_config import EXP_CHANNEL_ID
+from cogs.exp_cache import player_cache
+from cogs.exp_cooldown import cooldown_index
+from cogs.exp_engine import handle_exp_gain, on_user_comment
+
+DEBUG = True
+VERBOSE_TIMINGS = False  # Per-message timing lines; aggregates are always in /crpg_pipeline_stats
+COOLDOWN_STAGES = ("title", "trail")  # Reactions with their own cooldowns; still run inside the EXP cooldown
+
+
+class MessageContext:
+    """Per-message state shared by every pipeline stage."""
+
+    def __init__(self, message: discord.Message):
+        self.message = message
+        self.user_id = str(message.author.id)
+        self.now = time.time()
+        self.player = None  # players row (dict), fetched once through the player cache
+        self.timings = {}   # stage name -> milliseconds
+
+
+class MessagePipeline(commands.Cog):
+    """
+    Single on_message listener for the bot. Replaces the separate MaltaBot,
+    ExpCommands and UserTriggers listeners: player state is fetched once and
+    EXP gain, multiplier update, title announcement and trail reaction run
+    as ordered stages over the same context.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.stages = [
+            ("exp", self.stage_exp_gain),
+            ("multiplier", self.stage_multiplier),
+            ("title", self.stage_title_announcement),
+            ("trail", self.stage_trail_reaction),
+        ]
+        self.messages_processed = 0
+        self.stage_totals_ms = defaultdict(float)
+        self.stage_max_ms = defaultdict(float)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.author.bot:
+            return
+
+        # 💬 DMs: debug echo, then commands only
+        if message.guild is None:
+            debug_info = (f"Received DM from {message.author} (ID: {message.author.id}): "
+                          f"{message.content}")
+            print(debug_info)
+            await message.channel.send(f"Debug: {debug_info}")
+            await self.process_commands_if_prefixed(message)
+            return
+
+        ctx = MessageContext(message)
+
+        # ⏳ Inside the EXP cooldown: no player SELECT, EXP/multiplier stages or timing output;
+        # the reactions only run when the row is already cached
+        if cooldown_index.is_cooling_down(ctx.user_id, ctx.now):
+            ctx.player = player_cache.peek(ctx.user_id)
+            if ctx.player:
+                for name, stage in self.stages:
+                    if name in COOLDOWN_STAGES:
+                        await self.run_stage(ctx, name, stage)
+            await self.process_commands_if_prefixed(message)
+            return
+
+        ctx.player = await player_cache.get(ctx.user_id)
+
+        for name, stage in self.stages:
+            started = time.perf_counter()
+            await self.run_stage(ctx, name, stage)
+            self.record_timing(ctx, name, (time.perf_counter() - started) * 1000)
+
+        await self.process_commands_if_prefixed(message)
+
+        self.messages_processed += 1
+        if VERBOSE_TIMINGS:
+            timings = " | ".join(f"{name}: {ms:.1f}ms" for name, ms in ctx.timings.items())
+            print(f"[DEBUG]🧵 Pipeline for {message.author.display_name} ({ctx.user_id}) — {timings} | total: {sum(ctx.timings.values()):.1f}ms")
+
+    async def process_commands_if_prefixed(self, message: discord.Message):
+        # ⏩ Skip the command parser entirely for ordinary chat
+        if message.content.startswith(self.bot.command_prefix):
+            await self.bot.process_commands(message)
+
+    async def run_stage(self, ctx: MessageContext, name, stage):
+        try:
+            await stage(ctx)
+        except Exception as e:
+            print(f"[ERROR]🧵 Pipeline stage '{name}' failed for {ctx.user_id}: {e}")
+
+    # === Stages ===
+    async def stage_exp_gain(self, ctx: MessageContext):
+        await handle_exp_gain(ctx.message, EXP_CHANNEL_ID, player=ctx.player, cooldown_checked=True)
+        # Served from the cache; picks up the new row for first-time players
+        ctx.player = await player_cache.get(ctx.user_id)
+
+    async def stage_multiplier(self, ctx: MessageContext):
+        if not ctx.player:
+            return
+        # 🔒 Multiplier logic - Only update once per 24h (handled internally)
+        await on_user_comment(ctx.user_id, self.bot, user_data=ctx.player, member=ctx.message.author)
+
+    async def stage_title_announcement(self, ctx: MessageContext):
+        triggers = self.bot.get_cog("UserTriggers")
+        if not triggers or not ctx.player:
+            return
+        await triggers.maybe_trigger_title_announcement(ctx.message, ctx.user_id, ctx.player, ctx.now)
+
+    async def stage_trail_reaction(self, ctx: MessageContext):
+        triggers = self.bot.get_cog("UserTriggers")
+        if not triggers or not ctx.player:
+            return
+        await triggers.trigger_trail_reaction(ctx.message, ctx.user_id, ctx.now, ctx.player["last_trail_trigger_ts"])
+
+    # === Timings ===
+    def record_timing(self, ctx: MessageContext, name, elapsed_ms):
+        ctx.timings[name] = elapsed_ms
+        self.stage_totals_ms[name] += elapsed_ms
+        self.stage_max_ms[name] = max(self.stage_max_ms[name], elapsed_ms)
+
+    def stats(self):
+        processed = self.messages_processed or 1
+        return {
+            name: {
+                "avg_ms": self.stage_totals_ms[name] / processed,
+                "max_ms": self.stage_max_ms[name],
+                "total_ms": self.stage_totals_ms[name],
+            }
+            for name, _ in self.stages
+        }
+
+
+async def setup(bot):
+    await bot.add_cog(MessagePipeline(bot))
@@ -0,0 +1,284 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import defaultdict, deque
+import discord
+from discord.ext import commands
+
+DEBUG = True
+
+# === Priority lanes (lower runs first) ===
+PRIORITY_FOLLOWUP = 0    # Channel posts answering a member's command (retirement, leaderboard, awards)
+PRIORITY_HIGH = 1        # Level-ups, lottery results
+PRIORITY_BROADCAST = 2   # Gameplay broadcasts / digests
+PRIORITY_REMINDER = 3    # Reminders, weather, forecasts, time posts
+
+LANE_NAMES = {
+    PRIORITY_FOLLOWUP: "followup",
+    PRIORITY_HIGH: "high",
+    PRIORITY_BROADCAST: "broadcast",
+    PRIORITY_REMINDER: "reminder",
+}
+
+# Items older than this are dropped instead of sent late (None = never dropped)
+LANE_MAX_AGE = {
+    PRIORITY_FOLLOWUP: None,
+    PRIORITY_HIGH: None,
+    PRIORITY_BROADCAST: 300,
+    PRIORITY_REMINDER: 1800,
+}
+# Under pressure (queue deeper than this) new items in these lanes are dropped
+LANE_MAX_DEPTH = {
+    PRIORITY_BROADCAST: 200,
+    PRIORITY_REMINDER: 20,
+}
+
+# Discord's documented per-channel message limit is 5 per 5 seconds; stay one under it
+CHANNEL_BUCKET_SIZE = 4
+CHANNEL_BUCKET_WINDOW = 5.0
+GLOBAL_RATE_PER_SECOND = 40      # Global limit is 50/s per bot
+
+WAIT_HISTOGRAM_BOUNDS = [0.1, 0.5, 1, 5, 30, 60]  # seconds
+
+
+class _Bucket:
+    """Sliding-window budget for one route (channel or webhook)."""
+
+    def __init__(self, size, window):
+        self.size = size
+        self.window = window
+        self.sent = deque()
+        self.blocked_until = 0.0
+
+    def ready_at(self, now):
+        while self.sent and now - self.sent[0] >= self.window:
+            self.sent.popleft()
+        ready = self.blocked_until
+        if len(self.sent) >= self.size:
+            ready = max(ready, self.sent[0] + self.window)
+        return ready
+
+    def consume(self, now):
+        self.sent.append(now)
+
+
+class MessageScheduler:
+    """
+    Central outbound queue for bot-initiated messages. Items are sent in
+    priority order while respecting per-route and global budgets, so the
+    bot stays under Discord's limits instead of relying on 429 retries.
+    Sends run as tasks: independent channels proceed concurrently, while
+    each route has at most one send in flight so its messages keep their order.
+    """
+
+    def __init__(self):
+        self.running = False
+        self._heap = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._buckets = defaultdict(lambda: _Bucket(CHANNEL_BUCKET_SIZE, CHANNEL_BUCKET_WINDOW))
+        self._global = _Bucket(GLOBAL_RATE_PER_SECOND, 1.0)
+        self._worker = None
+        self._inflight = {}   # route -> task delivering its current message
+
+        self.depth = defaultdict(int)
+        self.sent = defaultdict(int)
+        self.dropped = defaultdict(int)
+        self.rate_limited = 0
+        self.wait_histogram = defaultdict(lambda: [0] * (len(WAIT_HISTOGRAM_BOUNDS) + 1))
+
+    async def send(self, target, content=None, *, priority=PRIORITY_BROADCAST, wait=False, **kwargs):
+        """
+        Queue `target.send(content, **kwargs)`. With wait=True the sent message
+        (or None if dropped) is returned; otherwise the call returns immediately.
+        Falls back to a direct send when the scheduler isn't running.
+        """
+        if not self.running:
+            return await target.send(content, **kwargs)
+
+        max_depth = LANE_MAX_DEPTH.get(priority)
+        if max_depth is not None and self.depth[priority] >= max_depth:
+            self.dropped[priority] += 1
+            if DEBUG:
+                print(f"[DEBUG]📮 Dropped {LANE_NAMES[priority]} message under pressure (depth {self.depth[priority]})")
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), time.monotonic(), target, content, kwargs, future))
+        self.depth[priority] += 1
+        self._wakeup.set()
+
+        if wait:
+            return await future
+        return None
+
+    def start(self):
+        self.running = True
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.running = False
+        if self._worker:
+            self._worker.cancel()
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        # Drain anything left directly so nothing queued is silently lost on shutdown
+        while self._heap:
+            priority, _, _, target, content, kwargs, future = heapq.heappop(self._heap)
+            self.depth[priority] -= 1
+            try:
+                message = await target.send(content, **kwargs)
+                if not future.done():
+                    future.set_result(message)
+            except Exception as e:
+                print(f"[ERROR]📮 Failed to drain queued message: {e}")
+
+    async def _run(self):
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            item = self._pop_ready(now)
+            if item is None:
+                # Everything queued is waiting on a budget or an in-flight send; sleep until the
+                # earliest budget frees up (a finished send wakes the loop itself)
+                budgets = [self._route_ready_at(entry[3], now) for entry in self._heap if self._route(entry[3]) not in self._inflight]
+                timeout = max(min(budgets) - now, 0.05) if budgets else None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            route = self._route(item[3])
+            task = asyncio.create_task(self._deliver(item, now))
+            self._inflight[route] = task
+            task.add_done_callback(lambda _, route=route: self._delivered(route))
+
+    def _delivered(self, route):
+        self._inflight.pop(route, None)
+        self._wakeup.set()
+
+    def _route_ready_at(self, target, now):
+        return max(self._buckets[self._route(target)].ready_at(now), self._global.ready_at(now))
+
+    def _pop_ready(self, now):
+        # Highest priority item whose route is idle and has budget; lower lanes are deferred, not reordered ahead
+        skipped = []
+        ready = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            priority, _, queued_at, _, _, _, future = entry
+            max_age = LANE_MAX_AGE.get(priority)
+            if max_age is not None and now - queued_at > max_age:
+                self.depth[priority] -= 1
+                self.dropped[priority] += 1
+                if not future.done():
+                    future.set_result(None)
+                continue
+            if self._route(entry[3]) not in self._inflight and self._route_ready_at(entry[3], now) <= now:
+                ready = entry
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return ready
+
+    async def _deliver(self, entry, now):
+        priority, _, queued_at, target, content, kwargs, future = entry
+        bucket = self._buckets[self._route(target)]
+        bucket.consume(now)
+        self._global.consume(now)
+
+        try:
+            message = await target.send(content, **kwargs)
+        except discord.HTTPException as e:
+            if e.status == 429:
+                # discord.py retries 429s itself; this only fires once it gives up (max_ratelimit_timeout).
+                # Block the route for retry_after and requeue the item
+                retry_after = getattr(e, "retry_after", None) or _retry_after_from_response(e) or CHANNEL_BUCKET_WINDOW
+                bucket.blocked_until = time.monotonic() + retry_after
+                self.rate_limited += 1
+                heapq.heappush(self._heap, entry)
+                print(f"[ERROR]📮 429 on route {self._route(target)}; backing off {retry_after:.1f}s")
+                return
+            self.depth[priority] -= 1
+            if not future.done():
+                future.set_exception(e)
+            print(f"[ERROR]📮 Failed to send queued {LANE_NAMES[priority]} message: {e}")
+            return
+        except Exception as e:
+            self.depth[priority] -= 1
+            if not future.done():
+                future.set_exception(e)
+            print(f"[ERROR]📮 Failed to send queued {LANE_NAMES[priority]} message: {e}")
+            return
+
+        self.depth[priority] -= 1
+        self.sent[priority] += 1
+        self._record_wait(priority, time.monotonic() - queued_at)
+        if not future.done():
+            future.set_result(message)
+
+    @staticmethod
+    def _route(target):
+        return getattr(target, "id", None) or id(target)
+
+    def _record_wait(self, priority, waited):
+        histogram = self.wait_histogram[priority]
+        for i, bound in enumerate(WAIT_HISTOGRAM_BOUNDS):
+            if waited < bound:
+                histogram[i] += 1
+                return
+        histogram[-1] += 1
+
+    def stats(self):
+        lanes = {}
+        for priority, name in LANE_NAMES.items():
+            lanes[name] = {
+                "depth": self.depth[priority],
+                "sent": self.sent[priority],
+                "dropped": self.dropped[priority],
+                "wait_histogram": list(self.wait_histogram[priority]),
+            }
+        return {"lanes": lanes, "rate_limited": self.rate_limited}
+
+
+def _retry_after_from_response(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("X-RateLimit-Reset-After")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def histogram_labels():
+    labels = [f"<{bound}s" for bound in WAIT_HISTOGRAM_BOUNDS]
+    labels.append(f"≥{WAIT_HISTOGRAM_BOUNDS[-1]}s")
+    return labels
+
+
+scheduler = MessageScheduler()
+
+
+class MessageSchedulerCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        scheduler.start()
+        print("[DEBUG]📮 MessageScheduler started. Outbound messages are now queued by priority.")
+
+    async def cog_unload(self):
+        await scheduler.stop()
+
+
+async def setup(bot):
+    await bot.add_cog(MessageSchedulerCog(bot))
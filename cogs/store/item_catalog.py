@@ -0,0 +1,194 @@
+import json
+import os
+from discord.ext import commands, tasks
+
+DEBUG = True
+DATA_DIR = os.path.join(os.path.dirname(__file__), "Items")
+RELOAD_CHECK_SECONDS = 60   # How often item files are checked for changes (mtime)
+
+
+CATEGORY_TO_FILES = {
+    "armor": [
+        "Armor/armor_hands.json",
+        "Armor/armor_head.json",
+        "Armor/armor_legs.json",
+        "Armor/armor_shoulders.json",
+        "Armor/armor_torso.json"
+    ],
+    "estates": ["Estates/estates.json"],
+    "mounts": [
+        "Mounts/mounts.json",
+        "Mounts/mounts_armor.json"
+    ],
+    "pets": ["Pets/pets.json"],
+    "shields": ["Shields/shields.json"],
+    "titles": ["Titles/titles.json"],
+    "trails": ["Trails/trails.json"],
+    "utility": ["Utility/utility.json"],
+    "weapons - 1H": [
+        "Weapons_1H/weapons_1h_axe.json",
+        "Weapons_1H/weapons_1h_mace.json",
+        "Weapons_1H/weapons_1h_sword.json"
+    ],
+    "weapons - 2h": [
+        "Weapons_2H/weapons_2h_axe.json",
+        "Weapons_2H/weapons_2h_mace.json",
+        "Weapons_2H/weapons_2h_sword.json"
+    ],
+    "weapons - arrows": [
+        "Weapons_Arrows/arrows_cut.json",
+        "Weapons_Arrows/arrows_pierce.json"
+    ],
+    "weapons - Bolts": [
+        "Weapons_Bolts/bolts_cut.json",
+        "Weapons_Bolts/bolts_pierce.json"
+    ],
+    "weapons - polearms": [
+        "Weapons_Polearm/weapons_polearm_2d.json",
+        "Weapons_Polearm/weapons_polearm_4d.json"
+    ],
+    "weapons - crossbows": ["Weapons_XBows/weapons_xbows.json"]
+}
+
+
+class _CatalogSnapshot:
+    """One immutable-by-convention build of the catalog; reloads swap in a whole new snapshot."""
+
+    def __init__(self):
+        self.by_id = {}          # item_id -> item
+        self.by_category = {}    # store category (lowercase) -> [items]
+        self.by_type = {}        # item "category" field (item_type) -> [items]
+        self.by_file = {}        # file stem (e.g. "shields", "arrows_cut") -> [items]
+        self.items = []
+        self.mtimes = {}         # path -> mtime at load
+
+
+class ItemCatalog:
+    """
+    Store items from cogs/store/Items/*.json, parsed once and indexed by id,
+    store category, item type and file. Lookups are dict hits with no file I/O;
+    a reload builds a fresh snapshot and swaps it in, so readers never see a
+    half-built catalog.
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self._snapshot = None
+        self.loads = 0
+
+    # === Loading ===
+    def load(self):
+        snapshot = _CatalogSnapshot()
+        for path in self._item_files():
+            try:
+                snapshot.mtimes[path] = os.path.getmtime(path)
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"[ERROR]🍯 Failed to load {path}: {e}")
+                continue
+
+            if not isinstance(data, list):
+                if DEBUG:
+                    print(f"[WARN]🍯 Skipping '{path}': expected a list of items")
+                continue
+
+            stem = os.path.splitext(os.path.basename(path))[0]
+            for item in data:
+                if not isinstance(item, dict) or "id" not in item:
+                    if DEBUG:
+                        print(f"[WARN]🍯 Skipping non-item entry in '{stem}': {item}")
+                    continue
+                snapshot.items.append(item)
+                snapshot.by_id[item["id"]] = item
+                snapshot.by_file.setdefault(stem, []).append(item)
+                snapshot.by_type.setdefault(str(item.get("category", "")).lower(), []).append(item)
+
+        for category, files in CATEGORY_TO_FILES.items():
+            stems = [os.path.splitext(os.path.basename(filename))[0] for filename in files]
+            snapshot.by_category[category.lower()] = [item for stem in stems for item in snapshot.by_file.get(stem, [])]
+
+        self._snapshot = snapshot
+        self.loads += 1
+        if DEBUG:
+            print(f"[DEBUG]🍯 Item catalog loaded: {len(snapshot.items)} items from {len(snapshot.mtimes)} file(s).")
+        return len(snapshot.items)
+
+    def reload_if_changed(self):
+        """Reload when any item file was added, removed or modified since the last load."""
+        if self._snapshot is None:
+            return self.load()
+        current = {}
+        for path in self._item_files():
+            try:
+                current[path] = os.path.getmtime(path)
+            except OSError:
+                continue
+        if current != self._snapshot.mtimes:
+            return self.load()
+        return None
+
+    def _item_files(self):
+        paths = []
+        for root, _, files in os.walk(self.data_dir):
+            paths.extend(os.path.join(root, name) for name in files if name.endswith(".json"))
+        return sorted(paths)
+
+    @property
+    def snapshot(self):
+        if self._snapshot is None:
+            self.load()
+        return self._snapshot
+
+    # === Lookups (lists are copies; callers may shuffle or filter them freely) ===
+    def get(self, item_id):
+        return self.snapshot.by_id.get(item_id)
+
+    def category(self, category_name):
+        return list(self.snapshot.by_category.get(category_name.lower(), []))
+
+    def of_type(self, item_type):
+        return list(self.snapshot.by_type.get(item_type.lower(), []))
+
+    def from_files(self, *stems):
+        by_file = self.snapshot.by_file
+        return [item for stem in stems for item in by_file.get(stem, [])]
+
+    def all_items(self):
+        return list(self.snapshot.items)
+
+    def stats(self):
+        snapshot = self.snapshot
+        return {
+            "items": len(snapshot.items),
+            "files": len(snapshot.mtimes),
+            "categories": len(snapshot.by_category),
+            "loads": self.loads,
+        }
+
+
+catalog = ItemCatalog()
+
+
+class ItemCatalogCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        catalog.load()
+        self.reload_loop.start()
+
+    async def cog_unload(self):
+        self.reload_loop.cancel()
+
+    @tasks.loop(seconds=RELOAD_CHECK_SECONDS)
+    async def reload_loop(self):
+        try:
+            if catalog.reload_if_changed() is not None:
+                print("[DEBUG]🍯 Item files changed on disk; catalog reloaded.")
+        except Exception as e:
+            print(f"[ERROR]🍯 Item catalog reload check failed: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(ItemCatalogCog(bot))
@@ -1,12 +1,14 @@
+import asyncio
 import discord
 from discord.ext import commands
 from discord import app_commands, Interaction, Embed, ButtonStyle
 from discord.ui import View, button
-from cogs.store.store_utils import STORE_CATEGORIES, get_all_items, get_item_by_id, get_item_by_category, roll_random_title_for_user
-from cogs.store.store_search import filter_weapon_items
+from cogs.store.store_utils import STORE_CATEGORIES, get_item_by_id, get_item_by_category, get_title_owners_async, roll_random_title_for_user_async, tracks_stock
+from cogs.store.store_stock import stock_view
+from cogs.x_utilities.member_resolver import member_resolver
+from cogs.store.store_search import search_weapons, SORTABLE_COLUMNS
 from cogs.exp_config import EXP_CHANNEL_ID
 from cogs.store.store_search import get_item_from_any_store
-from sqlalchemy.sql import select
 import traceback
 DEBUG = True
 ROLL_PRICE = 10000
@@ -54,25 +56,61 @@ class StoreGroup(commands.Cog):
             await interaction.response.send_message(embed=embed, view=CategoryView(interaction, self.show_items_by_category), ephemeral=True)
 
         @self.shop_group.command(name="filter", description="🍯 - 🔍 Filter weapons by damage type and weapon type (1h, 2h, polearm)")
-        @app_commands.describe(damage_type="e.g. blunt, pierce", weapon_type="e.g. 1h, 2h")
-        async def shop_filter(interaction: discord.Interaction, damage_type: str = None, weapon_type: str = None):
+        @app_commands.describe(
+            damage_type="e.g. blunt, pierce",
+            weapon_type="e.g. 1h, 2h",
+            min_handling="Minimum handling",
+            max_handling="Maximum handling",
+            min_reach="Minimum reach",
+            max_reach="Maximum reach",
+            max_price="Maximum price in gold",
+            sort_by=f"Sort results by: {', '.join(SORTABLE_COLUMNS)}"
+        )
+        async def shop_filter(
+            interaction: discord.Interaction,
+            damage_type: str = None,
+            weapon_type: str = None,
+            min_handling: int = None,
+            max_handling: int = None,
+            min_reach: int = None,
+            max_reach: int = None,
+            max_price: int = None,
+            sort_by: str = None
+        ):
             print(f"[🍯ℹ️ DEBUG] /shop filter used by {interaction.user} (ID: {interaction.user.id})")
-            all_items = get_all_items()
-            filtered = filter_weapon_items(all_items, damage_types=damage_type, weapon_types=weapon_type)
+            if sort_by is not None:
+                sort_by = sort_by.lower().replace(" ", "_")
+                if sort_by not in SORTABLE_COLUMNS:
+                    await interaction.response.send_message(
+                        f"❌ Can't sort by `{sort_by}`. Choose one of: {', '.join(SORTABLE_COLUMNS)}.", ephemeral=True
+                    )
+                    return
+
+            filtered, total = search_weapons(
+                damage_types=damage_type,
+                weapon_types=weapon_type,
+                min_handling=min_handling,
+                max_handling=max_handling,
+                min_reach=min_reach,
+                max_reach=max_reach,
+                max_price=max_price,
+                sort_by=sort_by,
+                limit=15
+            )
 
             if not filtered:
                 await interaction.response.send_message("No items match the filter.", ephemeral=True)
                 return
 
             embed = discord.Embed(title="Filtered Weapons", color=discord.Color.purple())
-            for item in filtered[:15]:
+            for item in filtered:
                 embed.add_field(
-                    name=f"{item.get('display', '')} {item['name']} - {item.get('price', 0)} gold",
+                    name=f"{item.get('display', '')} {item['name']} - {stock_view.price(item)} gold",
                     value=f"Damage: {', '.join(item.get('damage_types', []))} | Handling: {item.get('handling', '?')}",
                     inline=False
                 )
-            if len(filtered) > 15:
-                embed.set_footer(text=f"Showing first 15 of {len(filtered)} results.")
+            if total > len(filtered):
+                embed.set_footer(text=f"Showing first {len(filtered)} of {total} results.")
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
         @self.shop_group.command(name="info", description="🍯 - 📘 Get detailed information about an item by its ID")
@@ -85,13 +123,15 @@ class StoreGroup(commands.Cog):
                 return
 
             embed = discord.Embed(
-                title=f"{item.get('name', 'Unknown Item')} - {item.get('price', 0)} gold",
+                title=f"{item.get('name', 'Unknown Item')} - {stock_view.price(item)} gold",
                 color=discord.Color.teal(),
                 description=item.get('description', 'No description.')
             )
             embed.add_field(name="Type", value=item.get("type", "N/A"), inline=True)
             embed.add_field(name="Category", value=item.get("category", "N/A"), inline=True)
             embed.add_field(name="Tier", value=str(item.get("tier", "N/A")), inline=True)
+            if tracks_stock(item) and item.get("category", "").lower() != "titles":
+                embed.add_field(name="Stock", value=str(stock_view.stock(item)), inline=True)
 
             if item.get("damage_types"):
                 embed.add_field(name="Damage Types", value=", ".join(item["damage_types"]), inline=False)
@@ -135,7 +175,7 @@ class StoreGroup(commands.Cog):
                 )
 
             name = item.get("name", item_id)
-            price = item.get("price", 0)
+            price = stock_view.price(item)
 
             embed = discord.Embed(
                 title=f"🛒 Confirm Purchase: {name}",
@@ -152,58 +192,13 @@ class StoreGroup(commands.Cog):
         async def shop_sell(interaction: discord.Interaction, item_id: str):
             user_id = interaction.user.id
 
-            from cogs.exp_config import engine
-            from cogs.database.user_inventory_table import user_inventory
-            from cogs.store.store_utils import get_item_by_id, get_user_data, update_user_data, remove_item_from_inventory
+            from cogs.store.store_utils import process_sale_async
 
             if DEBUG:
                 print(f"[DEBUG]🍯💰 Attempting to sell item '{item_id}' for user {user_id}")
 
-            with engine.begin() as conn:
-                stmt = select(user_inventory).where(
-                    (user_inventory.c.user_id == user_id) &
-                    (user_inventory.c.item_id == item_id)
-                )
-                result = conn.execute(stmt).fetchone()
-
-                if not result:
-                    await interaction.response.send_message("❌ Item not found in your inventory.", ephemeral=True)
-                    return
-
-                if result.equipped:
-                    await interaction.response.send_message("❌ You must unequip the item before selling it.", ephemeral=True)
-                    return
-
-                if result.item_type == "titles":
-                    await interaction.response.send_message("❌ Titles cannot be sold.", ephemeral=True)
-                    return
-
-            item = get_item_by_id(item_id)
-            if not item:
-                await interaction.response.send_message("❌ Item data not found.", ephemeral=True)
-                return
-
-            price = item.get("price", 0)
-            refund = int(price * 0.6)
-
-            data = get_user_data(user_id)
-            data["gold"] += refund
-            update_user_data(
-                user_id,
-                data["multiplier"],
-                data["daily_multiplier"],
-                data["last_message_ts"],
-                data["last_multiplier_update"],
-                gold=data["gold"]
-            )
-
-            remove_item_from_inventory(user_id, item_id, result.item_type)
-
-            if DEBUG:
-                print(f"[DEBUG]🍯💰 User {user_id} sold '{item_id}' for {refund} gold.")
-            await interaction.response.send_message(
-                f"✅ You sold **{item.get('name', item_id)}** for **{refund}** gold!", ephemeral=True
-            )
+            _, message = await process_sale_async(user_id, item_id)
+            await interaction.response.send_message(message, ephemeral=True)
 
 
         @self.shop_group.command(name="roll", description="🍯 - 🎲 Roll for a random unclaimed title")
@@ -227,7 +222,7 @@ class StoreGroup(commands.Cog):
                 if interaction.user.id != self.user_id:
                     return await interaction.response.send_message("🍯❌ Not your confirmation!", ephemeral=True)
 
-                success, result = roll_random_title_for_user(self.user_id, price=ROLL_PRICE)
+                success, result = await roll_random_title_for_user_async(self.user_id, price=ROLL_PRICE)
 
                 if not success:
                     await interaction.response.edit_message(content=result, view=None)  # result is error message
@@ -277,6 +272,15 @@ class StoreGroup(commands.Cog):
 
         current_page = 0
 
+        owners = {}
+        owner_names = {}
+        if is_title:
+            # Acknowledge first: the owner lookup and name resolve can outlast the interaction deadline
+            await interaction.response.defer()
+            # Owners for the whole category in one lookup, names in one batched resolve
+            owners = await get_title_owners_async([item["id"] for item in items])
+            if owners:
+                owner_names = await member_resolver.display_names(self.bot, set(owners.values()))
 
         async def get_embed(page):
             if is_title:
@@ -291,18 +295,12 @@ class StoreGroup(commands.Cog):
                 if item.get("avatar_url"):
                     embed.set_image(url=item["avatar_url"])
 
-                # ⬇️ Ownership status logic
-                from cogs.store.store_utils import get_user_by_title_id
-
-                owner_id = get_user_by_title_id(item['id'])
+                # ⬇️ Ownership status logic (prefetched above)
+                owner_id = owners.get(item['id'])
                 if owner_id:
-                    try:
-                        user = await interaction.client.fetch_user(owner_id)
-                        embed.add_field(name="Status", value=f"🍯❌ Taken by {user.mention}", inline=False)
-                    except Exception as e:
-                        print(f"[ERROR] Failed to fetch user for title owner: {e}")
-                        traceback.print_exc()
-                        embed.add_field(name="Status", value="🍯❌ Taken (unable to resolve user)", inline=False)
+                    owner_name = owner_names.get(str(owner_id))
+                    taken_by = f"**{owner_name}**" if owner_name else f"<@{owner_id}>"
+                    embed.add_field(name="Status", value=f"🍯❌ Taken by {taken_by}", inline=False)
                 else:
                     embed.add_field(name="Status", value="🍯✅ Available", inline=False)
 
@@ -312,14 +310,22 @@ class StoreGroup(commands.Cog):
                     color=discord.Color.blue()
                 )
                 for item in pages[page]:
-                    title_line = f"{item.get('display', '')} {item['name']} - {item.get('price', 0)} gold".strip()
+                    title_line = f"{item.get('display', '')} {item['name']} - {stock_view.price(item)} gold".strip()
+                    if tracks_stock(item):
+                        stock = stock_view.stock(item)
+                        title_line += f" ({stock} left)" if stock > 0 else " (sold out)"
                     description = item.get('short_description') or item.get('description', 'No description.')
                     embed.add_field(name=title_line, value=description, inline=False)
 
             return embed
 
         view = Paginator(get_embed, pages, self.send_category_selection)
-        await interaction.response.edit_message(embed=await get_embed(current_page), view=view)
+        embed = await view.render(current_page)
+        if interaction.response.is_done():
+            await interaction.edit_original_response(embed=embed, view=view)
+        else:
+            await interaction.response.edit_message(embed=embed, view=view)
+        view.prefetch_neighbours()
 
         
     async def send_category_selection(self, interaction):
@@ -338,6 +344,28 @@ class Paginator(discord.ui.View):
         self.get_embed = get_embed
         self.pages = pages
         self.show_category_callback = show_category_callback
+        self._rendered = {}   # page -> task building its embed
+
+    def render(self, page):
+        """Awaitable embed for `page`, reusing a pre-rendered one when available."""
+        task = self._rendered.get(page)
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            task = self._rendered[page] = asyncio.create_task(self.get_embed(page))
+        return task
+
+    def prefetch_neighbours(self):
+        # Build the previous and next pages in the background so a flip is just an edit
+        for page in (self.page - 1, self.page + 1):
+            if 0 <= page < len(self.pages):
+                self.render(page)
+
+    async def show_page(self, interaction):
+        await interaction.response.edit_message(embed=await self.render(self.page), view=self)
+        self.prefetch_neighbours()
+
+    async def on_timeout(self):
+        for task in self._rendered.values():
+            task.cancel()
 
     @discord.ui.button(label="🍯 Back to Shop", style=discord.ButtonStyle.danger)
     async def back(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -347,13 +375,13 @@ class Paginator(discord.ui.View):
     async def prev(self, interaction: discord.Interaction, button: discord.ui.Button):
         if self.page > 0:
             self.page -= 1
-            await interaction.response.edit_message(embed=await self.get_embed(self.page), view=self)
+            await self.show_page(interaction)
 
     @discord.ui.button(label="Next ➡️🍯", style=discord.ButtonStyle.secondary)
     async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
         if self.page < len(self.pages) - 1:
             self.page += 1
-            await interaction.response.edit_message(embed=await self.get_embed(self.page), view=self)
+            await self.show_page(interaction)
 
 class ConfirmPurchaseView(discord.ui.View):
     def __init__(self, user_id, item_id, item_type):
@@ -367,10 +395,11 @@ class ConfirmPurchaseView(discord.ui.View):
         if interaction.user.id != self.user_id:
             return await interaction.response.send_message("🍯❌ Not your confirmation!", ephemeral=True)
 
-        from cogs.store.store_utils import process_purchase, get_item_by_id
+        from cogs.store.store_utils import process_purchase_async, get_item_by_id
+        from cogs.exp_announcer import announcer
         from cogs.exp_config import EXP_CHANNEL_ID
 
-        success, message = process_purchase(self.user_id, self.item_id, self.item_type)
+        success, message = await process_purchase_async(self.user_id, self.item_id, self.item_type)
 
         await interaction.response.edit_message(content=message, view=None)
 
@@ -380,7 +409,7 @@ class ConfirmPurchaseView(discord.ui.View):
             public_message = f"🍯🛒 **{interaction.user.display_name}** has purchased **{item_name}**!"
             exp_channel = interaction.client.get_channel(EXP_CHANNEL_ID)
             if exp_channel:
-                await exp_channel.send(public_message)
+                await announcer.announce(exp_channel, "shop", public_message)
 
     @discord.ui.button(label="No", style=discord.ButtonStyle.red, emoji="❌")
     async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -2,6 +2,7 @@ import discord
 from discord.ext import tasks, commands
 import random
 from cogs.exp_config import EXP_CHANNEL_ID
+from cogs.message_scheduler import scheduler, PRIORITY_REMINDER
 import datetime
 import asyncio
 import pytz
@@ -55,7 +56,7 @@ class ShopReminder(commands.Cog):
                     embed.set_image(url=variant["img"])
                     embed.set_footer(text="The market is always open! Trails are out and functional! Take a look!")
 
-                    await channel.send(content=variant["line"], embed=embed)
+                    await scheduler.send(channel, content=variant["line"], embed=embed, priority=PRIORITY_REMINDER)
 
             # Sleep until the next top-of-hour
             next_hour = (now + datetime.timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
@@ -1,12 +1,213 @@
-from cogs.store.store_utils import (load_all_melee_weapon_items, load_items_from_json, get_all_items)
+import numpy as np
+from cogs.store.store_utils import get_all_items
+from cogs.store.item_catalog import catalog
+from cogs.store.store_stock import stock_view
+
+DEBUG = True
+MELEE_FILES = (
+    "weapons_1h_axe", "weapons_1h_sword", "weapons_1h_mace",
+    "weapons_2h_axe", "weapons_2h_mace", "weapons_2h_sword",
+    "weapons_polearm_2d", "weapons_polearm_4d",
+)
+
+# Numeric item attributes compiled into float columns (missing -> the default the old per-item filters used)
+NUMERIC_COLUMNS = (
+    "price", "tier", "weight",
+    "handling", "swing_speed", "thrust_speed", "length", "reach",
+    "speed", "durability", "can_be_used_on_mounts",
+    "accuracy", "missile_speed", "aim_speed", "reload_speed",
+    "ammo_count", "stack_weight",
+    "maneuver", "charge_damage", "hit_points", "armor_value",
+    "head_armor", "body_armor", "arm_armor", "leg_armor",
+)
+COLUMN_DEFAULTS = {"handling": 100, "tier": 1}
+# String attributes compiled into integer codes
+CODED_COLUMNS = ("category", "weapon_type", "armory", "mount_type", "material", "file")
+# List attributes compiled into bitmasks (one bit per distinct value)
+MASK_COLUMNS = ("damage_types", "compatible_mounts")
+
+
+def _number(value, default):
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(default)
+
+def _text_values(item, file_stem):
+    category = str(item.get("category", ""))
+    return {
+        "category": category,
+        "weapon_type": category.split("/")[-1],
+        "armory": str(item.get("armory", "")),
+        "mount_type": str(item.get("mount_type", "")),
+        "material": str(item.get("material", "")).lower(),
+        "file": file_stem,
+    }
+
+
+class ItemSearchIndex:
+    """
+    Columnar copy of the item catalog for store search. Every filter is a
+    vectorized boolean mask over NumPy columns, with optional sort and top-k,
+    so query cost doesn't grow with per-item Python checks. Rebuilt lazily
+    when the catalog reloads; the price column follows store_stock overrides.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._price_version = None
+        self.items = []
+        self.numeric = {}       # column -> float64 array
+        self.codes = {}         # column -> int32 array
+        self.vocab = {}         # column -> {value: code}
+        self.masks = {}         # column -> uint64 array
+        self.bits = {}          # column -> {value: bit}
+        self.row_by_id = {}
+        self.builds = 0
+
+    # === Building ===
+    def _ensure_current(self):
+        snapshot = catalog.snapshot
+        if snapshot is not self._snapshot:
+            self._build(snapshot)
+        if self._price_version != stock_view.price_version:
+            self.numeric["price"] = np.array([_number(stock_view.price(item), 0) for item in self.items], dtype=np.float64)
+            self._price_version = stock_view.price_version
+
+    def _build(self, snapshot):
+        file_of = {id(item): stem for stem, file_items in snapshot.by_file.items() for item in file_items}
+        items = list(snapshot.items)
+
+        numeric = {}
+        for column in NUMERIC_COLUMNS:
+            default = COLUMN_DEFAULTS.get(column, 0)
+            numeric[column] = np.array([_number(item.get(column, default), default) for item in items], dtype=np.float64)
+        numeric["price"] = np.array([_number(stock_view.price(item), 0) for item in items], dtype=np.float64)
+
+        vocab = {column: {} for column in CODED_COLUMNS}
+        codes = {column: np.empty(len(items), dtype=np.int32) for column in CODED_COLUMNS}
+        bits = {column: {} for column in MASK_COLUMNS}
+        masks = {column: np.zeros(len(items), dtype=np.uint64) for column in MASK_COLUMNS}
+
+        for row, item in enumerate(items):
+            for column, value in _text_values(item, file_of.get(id(item), "")).items():
+                codes[column][row] = vocab[column].setdefault(value, len(vocab[column]))
+            for column in MASK_COLUMNS:
+                values = item.get(column) or []
+                if isinstance(values, str):
+                    values = [values]
+                bitmask = 0
+                for value in values:
+                    bit = bits[column].get(value)
+                    if bit is None:
+                        if len(bits[column]) >= 64:
+                            print(f"[WARN]🍯🔍 More than 64 distinct '{column}' values; '{value}' is not indexed.")
+                            continue
+                        bit = bits[column][value] = 1 << len(bits[column])
+                    bitmask |= bit
+                masks[column][row] = bitmask
+
+        self.items = items
+        self.numeric, self.codes, self.vocab, self.masks, self.bits = numeric, codes, vocab, masks, bits
+        self.row_by_id = {item["id"]: row for row, item in enumerate(items)}
+        self._snapshot = snapshot
+        self._price_version = stock_view.price_version
+        self.builds += 1
+        if DEBUG:
+            print(f"[DEBUG]🍯🔍 Search index built over {len(items)} items.")
+
+    # === Queries ===
+    def search(self, *, within=None, files=None, any_of=None, equals=None, ranges=None,
+               sort_by=None, descending=False, limit=None):
+        """
+        Returns (items, total_matches).
+          within:  only consider these items (e.g. a list the caller already narrowed)
+          files:   only items from these catalog file stems
+          any_of:  {mask column: [values]} — item has at least one of the values
+          equals:  {coded column: value or [values]} — item matches one of the values
+          ranges:  {numeric column: (min, max)} — either bound may be None
+          sort_by: numeric column; with `limit` only the top-k rows are fully sorted
+        """
+        self._ensure_current()
+        mask = np.ones(len(self.items), dtype=bool)
+
+        if within is not None:
+            rows = [self.row_by_id[item["id"]] for item in within if isinstance(item, dict) and item.get("id") in self.row_by_id]
+            selected = np.zeros(len(self.items), dtype=bool)
+            selected[rows] = True
+            mask &= selected
+
+        if files is not None:
+            wanted = [self.vocab["file"][stem] for stem in files if stem in self.vocab["file"]]
+            mask &= np.isin(self.codes["file"], wanted)
+
+        for column, values in (any_of or {}).items():
+            if isinstance(values, str):
+                values = [values]
+            wanted = 0
+            for value in values:
+                wanted |= self.bits[column].get(value, 0)
+            mask &= (self.masks[column] & np.uint64(wanted)) != 0
+
+        for column, values in (equals or {}).items():
+            if isinstance(values, str):
+                values = [values]
+            wanted = [self.vocab[column][value] for value in values if value in self.vocab[column]]
+            mask &= np.isin(self.codes[column], wanted)
+
+        for column, (low, high) in (ranges or {}).items():
+            values = self.numeric[column]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+
+        rows = np.flatnonzero(mask)
+        total = len(rows)
+
+        if sort_by is not None:
+            keys = self.numeric[sort_by][rows]
+            if descending:
+                keys = -keys
+            if limit is not None and 0 < limit < total:
+                top = np.argpartition(keys, limit - 1)[:limit]
+                rows = rows[top[np.argsort(keys[top], kind="stable")]]
+            else:
+                rows = rows[np.argsort(keys, kind="stable")]
+
+        if limit is not None:
+            rows = rows[:max(limit, 0)]
+        return [self.items[row] for row in rows], total
+
+    def query(self, **kwargs):
+        return self.search(**kwargs)[0]
+
+    def stats(self):
+        self._ensure_current()
+        return {
+            "items": len(self.items),
+            "columns": len(self.numeric) + len(self.codes) + len(self.masks),
+            "builds": self.builds,
+        }
+
+
+search_index = ItemSearchIndex()
+
+
+def _bounds(**bounds):
+    # {"reach": (min, max)} for every column with at least one bound set
+    return {column: bound for column, bound in bounds.items() if bound[0] is not None or bound[1] is not None}
+
+# Each filter below has a `_*_query` that turns its keyword filters into a search spec.
+# `filter_*` applies it to a list the caller already has; `get_filtered_*` runs it over
+# the catalog files directly, which keeps the whole query vectorized.
 
 ############################
 #############MELEE##########
 ############################
 
-def filter_weapon_items(
-    items,
-    *,
+def _weapon_query(
     damage_types=None,
     weapon_types=None,
     min_handling=None,
@@ -18,60 +219,41 @@ def filter_weapon_items(
     min_reach=None,
     max_reach=None
 ):
-    results = []
-
-    for item in items:
-        # Filter by damage type
-        if damage_types:
-            if isinstance(damage_types, str):
-                damage_types = [damage_types]
-            if not any(d in item.get("damage_types", []) for d in damage_types):
-                continue
-
-        # Filter by weapon type (1h, 2h, polearm, bows, etc.)
-        if weapon_types:
-            if isinstance(weapon_types, str):
-                weapon_types = [weapon_types]
-            if not any(w == item.get("category", "").split("/")[-1] for w in weapon_types):
-                continue
-
-        # Handling (maneuverability)
-        handling = item.get("handling", 100)
-        if min_handling is not None and handling < min_handling:
-            continue
-        if max_handling is not None and handling > max_handling:
-            continue
-
-        # Swing speed
-        if min_swing_speed is not None and item.get("swing_speed", 0) < min_swing_speed:
-            continue
-
-        # Thrust speed
-        if min_thrust_speed is not None and item.get("thrust_speed", 0) < min_thrust_speed:
-            continue
-
-        # Length & Reach
-        if min_length is not None and item.get("length", 0) < min_length:
-            continue
-        if max_length is not None and item.get("length", 0) > max_length:
-            continue
-        if min_reach is not None and item.get("reach", 0) < min_reach:
-            continue
-        if max_reach is not None and item.get("reach", 0) > max_reach:
-            continue
+    return {
+        "any_of": {"damage_types": damage_types} if damage_types else None,
+        "equals": {"weapon_type": weapon_types} if weapon_types else None,
+        "ranges": _bounds(
+            handling=(min_handling, max_handling),
+            swing_speed=(min_swing_speed, None),
+            thrust_speed=(min_thrust_speed, None),
+            length=(min_length, max_length),
+            reach=(min_reach, max_reach),
+        ),
+    }
+
+def filter_weapon_items(items, **kwargs):
+    return search_index.query(within=items, **_weapon_query(**kwargs))
 
-        results.append(item)
+def get_filtered_weapons(damage_types=None, weapon_types=None, **kwargs):
+    return search_index.query(files=MELEE_FILES, **_weapon_query(damage_types=damage_types, weapon_types=weapon_types, **kwargs))
 
-    return results
+# Sortable from /shop filter; cheap-first for price and weight, best-first for the rest
+SORTABLE_COLUMNS = ("price", "weight", "handling", "swing_speed", "thrust_speed", "length", "reach")
+ASCENDING_SORTS = {"price", "weight"}
 
-def get_filtered_weapons(damage_types=None, weapon_types=None, **kwargs):
-    weapons = load_all_melee_weapon_items()
-    return filter_weapon_items(weapons, damage_types=damage_types, weapon_types=weapon_types, **kwargs)
+def search_weapons(*, sort_by=None, limit=None, min_price=None, max_price=None, **filters):
+    """Weapon filters plus a price range, sort and top-k over the whole catalog. Returns (items, total_matches)."""
+    spec = _weapon_query(**filters)
+    spec["ranges"].update(_bounds(price=(min_price, max_price)))
+    return search_index.search(
+        sort_by=sort_by,
+        descending=sort_by not in ASCENDING_SORTS,
+        limit=limit,
+        **spec
+    )
 
 
-def filter_shields(
-    items,
-    *,
+def _shield_query(
     min_weight=None,
     max_weight=None,
     min_speed=None,
@@ -80,39 +262,27 @@ def filter_shields(
     armory_type=None,
     can_be_used_on_mounts=None
 ):
-    results = []
-
-    for item in items:
-        if min_weight and item.get("weight", 0) < min_weight:
-            continue
-        if max_weight and item.get("weight", 0) > max_weight:
-            continue
-        if min_speed and item.get("speed", 0) < min_speed:
-            continue
-        if min_reach and item.get("reach", 0) < min_reach:
-            continue
-        if min_durability and item.get("durability", 0) < min_durability:
-            continue
-        if armory_type and item.get("armory", "") != armory_type:
-            continue
-        if can_be_used_on_mounts is not None and item.get("can_be_used_on_mounts", False) != can_be_used_on_mounts:
-            continue
-
-        results.append(item)
-
-    return results
+    ranges = _bounds(
+        weight=(min_weight or None, max_weight or None),
+        speed=(min_speed or None, None),
+        reach=(min_reach or None, None),
+        durability=(min_durability or None, None),
+    )
+    if can_be_used_on_mounts is not None:
+        ranges["can_be_used_on_mounts"] = (float(can_be_used_on_mounts), float(can_be_used_on_mounts))
+    return {"equals": {"armory": armory_type} if armory_type else None, "ranges": ranges}
+
+def filter_shields(items, **kwargs):
+    return search_index.query(within=items, **_shield_query(**kwargs))
 
 def get_filtered_shields(**kwargs):
-    shields = load_items_from_json("shields")
-    return filter_shields(shields, **kwargs)
+    return search_index.query(files=("shields",), **_shield_query(**kwargs))
 
 ############################
 ###########RANGED###########
 ############################
 
-def filter_ranged_items(
-    items,
-    *,
+def _ranged_query(
     category=None,
     min_accuracy=None,
     min_missile_speed=None,
@@ -120,142 +290,102 @@ def filter_ranged_items(
     min_reload_speed=None,
     max_weight=None
 ):
-    results = []
-
-    for item in items:
-        # Category filter
-        if category and item.get("category") != category:
-            continue
-
-        if min_accuracy is not None and item.get("accuracy", 0) < min_accuracy:
-            continue
-        if min_missile_speed is not None and item.get("missile_speed", 0) < min_missile_speed:
-            continue
-        if min_aim_speed is not None and item.get("aim_speed", 0) < min_aim_speed:
-            continue
-        if min_reload_speed is not None and item.get("reload_speed", 0) < min_reload_speed:
-            continue
-        if max_weight is not None and item.get("weight", 0) > max_weight:
-            continue
-
-        results.append(item)
-
-    return results
+    return {
+        "equals": {"category": category} if category else None,
+        "ranges": _bounds(
+            accuracy=(min_accuracy, None),
+            missile_speed=(min_missile_speed, None),
+            aim_speed=(min_aim_speed, None),
+            reload_speed=(min_reload_speed, None),
+            weight=(None, max_weight),
+        ),
+    }
+
+def filter_ranged_items(items, **kwargs):
+    return search_index.query(within=items, **_ranged_query(**kwargs))
 
 def get_filtered_bows_xbows(**kwargs):
-    bows = load_items_from_json("weapons_bows")
-    return filter_ranged_items(bows, **kwargs)
+    return search_index.query(files=("weapons_bows",), **_ranged_query(**kwargs))
 
-def filter_ammo_items(
-    items,
-    *,
+def _ammo_query(
     damage_types=None,
     min_ammo_count=None,
     max_stack_weight=None
 ):
-    results = []
-
-    for item in items:
-        if damage_types:
-            if isinstance(damage_types, str):
-                damage_types = [damage_types]
-            if not any(d in item.get("damage_types", []) for d in damage_types):
-                continue
-
-        if min_ammo_count and item.get("ammo_count", 0) < min_ammo_count:
-            continue
+    return {
+        "any_of": {"damage_types": damage_types} if damage_types else None,
+        "ranges": _bounds(
+            ammo_count=(min_ammo_count or None, None),
+            stack_weight=(None, max_stack_weight or None),
+        ),
+    }
 
-        if max_stack_weight and item.get("stack_weight", 0) > max_stack_weight:
-            continue
-
-        results.append(item)
-
-    return results
+def filter_ammo_items(items, **kwargs):
+    return search_index.query(within=items, **_ammo_query(**kwargs))
 
 def get_filtered_arrows(**kwargs):
-    arrows = load_items_from_json("arrows_cut", "arrows_pierce")
-    return filter_ammo_items(arrows, **kwargs)
+    return search_index.query(files=("arrows_cut", "arrows_pierce"), **_ammo_query(**kwargs))
 
 def get_filtered_bolts(**kwargs):
-    bolts = load_items_from_json("bolts_cut", "bolts_pierce")
-    return filter_ammo_items(bolts, **kwargs)
+    return search_index.query(files=("bolts_cut", "bolts_pierce"), **_ammo_query(**kwargs))
 
 
 ############################
 ###########MOUNTS###########
 ############################
 
-def filter_mount_items(
-    items,
-    *,
+def _mount_query(
     mount_type=None,
     min_speed=None,
     min_maneuver=None,
     min_charge_damage=None,
     min_hit_points=None
 ):
-    results = []
-
-    for item in items:
-        if mount_type and item.get("mount_type") != mount_type:
-            continue
-        if min_speed and item.get("speed", 0) < min_speed:
-            continue
-        if min_maneuver and item.get("maneuver", 0) < min_maneuver:
-            continue
-        if min_charge_damage and item.get("charge_damage", 0) < min_charge_damage:
-            continue
-        if min_hit_points and item.get("hit_points", 0) < min_hit_points:
-            continue
-
-        results.append(item)
-
-    return results
+    return {
+        "equals": {"mount_type": mount_type} if mount_type else None,
+        "ranges": _bounds(
+            speed=(min_speed or None, None),
+            maneuver=(min_maneuver or None, None),
+            charge_damage=(min_charge_damage or None, None),
+            hit_points=(min_hit_points or None, None),
+        ),
+    }
+
+def filter_mount_items(items, **kwargs):
+    return search_index.query(within=items, **_mount_query(**kwargs))
 
 def get_filtered_mounts(**kwargs):
-    mounts = load_items_from_json("mounts")
-    return filter_mount_items(mounts, **kwargs)
+    return search_index.query(files=("mounts",), **_mount_query(**kwargs))
 
-def filter_mount_armor(
-    items,
-    *,
+def _mount_armor_query(
     material=None,
     compatible_with=None,
     min_armor_value=None,
     max_weight=None,
     min_tier=None
 ):
-    results = []
-
-    for item in items:
-        if material and item.get("material", "").lower() != material.lower():
-            continue
-        if compatible_with:
-            if compatible_with not in item.get("compatible_mounts", []):
-                continue
-        if min_armor_value and item.get("armor_value", 0) < min_armor_value:
-            continue
-        if max_weight and item.get("weight", 0) > max_weight:
-            continue
-        if min_tier and item.get("tier", 1) < min_tier:
-            continue
-
-        results.append(item)
-
-    return results
+    return {
+        "equals": {"material": material.lower()} if material else None,
+        "any_of": {"compatible_mounts": [compatible_with]} if compatible_with else None,
+        "ranges": _bounds(
+            armor_value=(min_armor_value or None, None),
+            weight=(None, max_weight or None),
+            tier=(min_tier or None, None),
+        ),
+    }
+
+def filter_mount_armor(items, **kwargs):
+    return search_index.query(within=items, **_mount_armor_query(**kwargs))
 
 def get_filtered_mount_armor(**kwargs):
-    armor_items = load_items_from_json("mounts_armor")
-    return filter_mount_armor(armor_items, **kwargs)
+    return search_index.query(files=("mounts_armor",), **_mount_armor_query(**kwargs))
 
 
 ############################
 ###########ARMOR###########
 ############################
 
-def filter_armor_items(
-    items,
-    *,
+def _armor_query(
     material=None,
     min_head_armor=None,
     min_body_armor=None,
@@ -263,45 +393,34 @@ def filter_armor_items(
     min_leg_armor=None,
     max_weight=None
 ):
-    results = []
-
-    for item in items:
-        if material and item.get("material", "").lower() != material.lower():
-            continue
-        if min_head_armor and item.get("head_armor", 0) < min_head_armor:
-            continue
-        if min_body_armor and item.get("body_armor", 0) < min_body_armor:
-            continue
-        if min_arm_armor and item.get("arm_armor", 0) < min_arm_armor:
-            continue
-        if min_leg_armor and item.get("leg_armor", 0) < min_leg_armor:
-            continue
-        if max_weight and item.get("weight", 0) > max_weight:
-            continue
-
-        results.append(item)
-
-    return results
+    return {
+        "equals": {"material": material.lower()} if material else None,
+        "ranges": _bounds(
+            head_armor=(min_head_armor or None, None),
+            body_armor=(min_body_armor or None, None),
+            arm_armor=(min_arm_armor or None, None),
+            leg_armor=(min_leg_armor or None, None),
+            weight=(None, max_weight or None),
+        ),
+    }
+
+def filter_armor_items(items, **kwargs):
+    return search_index.query(within=items, **_armor_query(**kwargs))
 
 def get_filtered_head_armor(**kwargs):
-    items = load_items_from_json("armor_head")
-    return filter_armor_items(items, **kwargs)
+    return search_index.query(files=("armor_head",), **_armor_query(**kwargs))
 
 def get_filtered_shoulders_armor(**kwargs):
-    items = load_items_from_json("armor_shoulders")
-    return filter_armor_items(items, **kwargs)
+    return search_index.query(files=("armor_shoulders",), **_armor_query(**kwargs))
 
 def get_filtered_torso_armor(**kwargs):
-    items = load_items_from_json("armor_torso")
-    return filter_armor_items(items, **kwargs)
+    return search_index.query(files=("armor_torso",), **_armor_query(**kwargs))
 
 def get_filtered_hand_armor(**kwargs):
-    items = load_items_from_json("armor_hands")
-    return filter_armor_items(items, **kwargs)
+    return search_index.query(files=("armor_hands",), **_armor_query(**kwargs))
 
 def get_filtered_leg_armor(**kwargs):
-    items = load_items_from_json("armor_legs")
-    return filter_armor_items(items, **kwargs)
+    return search_index.query(files=("armor_legs",), **_armor_query(**kwargs))
 
 
 
@@ -0,0 +1,136 @@
+import asyncio
+from discord.ext import commands, tasks
+from sqlalchemy import select
+
+from cogs.exp_config import engine, async_engine, upsert_insert
+from cogs.database.store_stock_table import store_stock
+from cogs.store.item_catalog import catalog
+
+DEBUG = True
+REFRESH_INTERVAL_MINUTES = 10   # Re-read the table in case it was edited outside the bot
+
+
+def _seed_stmt():
+    # Items that ship with a stock count get a row; the JSON value is only the starting stock
+    seed = [
+        {"item_id": item["id"], "stock": item["stock"]}
+        for item in catalog.all_items()
+        if isinstance(item.get("stock"), int)
+    ]
+    if not seed:
+        return None
+    return upsert_insert(store_stock).values(seed).on_conflict_do_nothing(index_elements=["item_id"])
+
+def _upsert_stmt(item_id, **fields):
+    stmt = upsert_insert(store_stock).values(item_id=item_id, **fields)
+    return stmt.on_conflict_do_update(index_elements=["item_id"], set_=fields)
+
+def decrement_stock_stmt(item_id):
+    """Take one unit if any are left. Returns the new stock, or no row when sold out."""
+    return (
+        store_stock.update()
+        .where((store_stock.c.item_id == item_id) & (store_stock.c.stock > 0))
+        .values(stock=store_stock.c.stock - 1)
+        .returning(store_stock.c.stock)
+    )
+
+
+class StoreStockView:
+    """
+    Cached copy of the store_stock table (item_id -> stock / price override).
+    Store pages read availability and prices from here without a query;
+    purchases decrement the table atomically and write the result back.
+    """
+
+    def __init__(self):
+        self.ready = False      # Set once the table has been seeded and read
+        self._rows = {}         # item_id -> {"stock": int | None, "price": int | None}
+        self._load_lock = asyncio.Lock()
+        self.loads = 0
+        self.price_version = 0  # Bumped whenever effective prices may have changed (search index watches it)
+
+    async def load(self):
+        async with self._load_lock:
+            async with async_engine.begin() as conn:
+                seed = _seed_stmt()
+                if seed is not None:
+                    await conn.execute(seed)
+                rows = (await conn.execute(select(store_stock.c.item_id, store_stock.c.stock, store_stock.c.price))).fetchall()
+            self._rows = {row.item_id: {"stock": row.stock, "price": row.price} for row in rows}
+            self.ready = True
+            self.loads += 1
+            self.price_version += 1
+        if DEBUG:
+            print(f"[DEBUG]🍯📦 Store stock view loaded with {len(self._rows)} row(s).")
+
+    async def ensure_loaded(self):
+        if not self.ready:
+            await self.load()
+
+    # === Reads (fall back to the catalog values until the view is loaded) ===
+    def stock(self, item):
+        row = self._rows.get(item.get("id"))
+        if row is not None and row["stock"] is not None:
+            return row["stock"]
+        return item.get("stock", 0)
+
+    def price(self, item):
+        row = self._rows.get(item.get("id"))
+        if row is not None and row["price"] is not None:
+            return row["price"]
+        return item.get("price", 0)
+
+    # === Writes ===
+    def apply(self, item_id, **fields):
+        """Record values already committed to the table."""
+        self._rows.setdefault(item_id, {"stock": None, "price": None}).update(fields)
+        if "price" in fields:
+            self.price_version += 1
+
+    async def set(self, item_id, **fields):
+        async with async_engine.begin() as conn:
+            await conn.execute(_upsert_stmt(item_id, **fields))
+        self.apply(item_id, **fields)
+
+    def set_sync(self, item_id, **fields):
+        with engine.begin() as conn:
+            conn.execute(_upsert_stmt(item_id, **fields))
+        self.apply(item_id, **fields)
+
+    def stats(self):
+        tracked = [row["stock"] for row in self._rows.values() if row["stock"] is not None]
+        return {
+            "rows": len(self._rows),
+            "sold_out": sum(1 for stock in tracked if stock <= 0),
+            "price_overrides": sum(1 for row in self._rows.values() if row["price"] is not None),
+            "loads": self.loads,
+        }
+
+
+stock_view = StoreStockView()
+
+
+class StoreStockCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        await stock_view.load()
+        self.refresh_loop.start()
+
+    async def cog_unload(self):
+        self.refresh_loop.cancel()
+
+    @tasks.loop(minutes=REFRESH_INTERVAL_MINUTES)
+    async def refresh_loop(self):
+        if self.refresh_loop.current_loop == 0:
+            return  # Already loaded in cog_load
+        try:
+            # Also seeds rows for items added to the catalog since the last load
+            await stock_view.load()
+        except Exception as e:
+            print(f"[ERROR]🍯📦 Store stock refresh failed: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(StoreStockCog(bot))
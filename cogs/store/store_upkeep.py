@@ -1,225 +1,548 @@
+import numpy as np
+from datetime import datetime, timezone, timedelta
+from discord.ext import commands, tasks
+from sqlalchemy import select, func, tuple_, values, column, String, Integer
 
+from cogs.exp_config import players, async_engine
+from cogs.exp_cache import player_cache
+from cogs.database.user_inventory_table import user_inventory
+from cogs.database.transactions_table import transactions
+from cogs.store.item_catalog import catalog
+from cogs.store.store_stock import stock_view
+from cogs.wallet.log_transactions import log_transactions_async
+from cogs.character.loadout_cache import loadout_cache
 
-def calculate_melee_weapon_upkeep(item):
+DEBUG = True
+UPKEEP_HOUR = 0                 # Bill once a day at midnight CST
+UPKEEP_CHECK_MINUTES = 10
+UPKEEP_TYPE = "upkeep"          # Ledger type; also how the last billing day is found after a restart
+
+CST = timezone(timedelta(hours=-6))
+
+
+def _number(value, default):
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(default)
+
+
+# Each formula below is written once against an attribute accessor `a`, so the same
+# code prices a single item (_ItemAttributes) or a whole category at once (_ColumnAttributes).
+class _ItemAttributes:
+    def __init__(self, item):
+        self.item = item
+
+    def num(self, name, default=0):
+        return _number(self.item.get(name, default), default)
+
+    def has(self, name, value):
+        return value in (self.item.get(name) or [])
+
+    def equals(self, name, value):
+        return self.item.get(name) == value
+
+
+class _ColumnAttributes:
+    """One array per attribute over a category's items; `price` honours store_stock overrides."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def num(self, name, default=0):
+        if name == "price":
+            return np.array([_number(stock_view.price(item), 0) for item in self.items], dtype=np.float64)
+        return np.array([_number(item.get(name, default), default) for item in self.items], dtype=np.float64)
+
+    def has(self, name, value):
+        return np.array([value in (item.get(name) or []) for item in self.items], dtype=bool)
+
+    def equals(self, name, value):
+        return np.array([item.get(name) == value for item in self.items], dtype=bool)
+
+
+
+
+def _melee_weapon_upkeep(a):
     # Base cost (price of the item scaled down)
-    base_cost = item.get("price", 0) * 0.03
+    base_cost = a.num("price", 0) * 0.03
 
     # Weight factor (heavier weapons usually require more upkeep)
-    weight_factor = item.get("weight", 0) * 0.6
+    weight_factor = a.num("weight", 0) * 0.6
 
     # Swing speed factor (faster weapons may need more upkeep due to maintenance of agility)
-    swing_speed = item.get("swing_speed", 0)
-    swing_speed_factor = max(0, 100 - swing_speed) * 0.4  # slower = higher upkeep
+    swing_speed = a.num("swing_speed", 0)
+    swing_speed_factor = np.maximum(0, 100 - swing_speed) * 0.4  # slower = higher upkeep
 
     # Thrust speed factor (similar logic to swing speed)
-    thrust_speed = item.get("thrust_speed", 0)
-    thrust_speed_factor = max(0, 100 - thrust_speed) * 0.3  # slower thrust = higher upkeep
+    thrust_speed = a.num("thrust_speed", 0)
+    thrust_speed_factor = np.maximum(0, 100 - thrust_speed) * 0.3  # slower thrust = higher upkeep
 
     # Handling factor (the more maneuverable a weapon, the more upkeep)
-    handling = item.get("handling", 100)
-    handling_factor = max(0, 100 - handling) * 0.4  # low handling = more upkeep
+    handling = a.num("handling", 100)
+    handling_factor = np.maximum(0, 100 - handling) * 0.4  # low handling = more upkeep
 
     # Reach factor (longer weapons need more maintenance)
-    reach = item.get("reach", 0)
+    reach = a.num("reach", 0)
     reach_factor = reach * 0.2  # longer reach = more upkeep
 
     # Length factor (longer weapons are harder to maintain)
-    length = item.get("length", 0)
+    length = a.num("length", 0)
     length_factor = length * 0.3  # longer = more upkeep
 
     # Damage types (special damage types may increase upkeep, e.g., blunt vs cutting)
-    damage_types = item.get("damage_types", [])
-    damage_type_factor = 0
-    if "pierce" in damage_types:
-        damage_type_factor += 0.2
-    if "cut" in damage_types:
-        damage_type_factor += 0.15
-    if "blunt" in damage_types:
-        damage_type_factor += 0.25
+    damage_type_factor = (
+        a.has("damage_types", "pierce") * 0.2
+        + a.has("damage_types", "cut") * 0.15
+        + a.has("damage_types", "blunt") * 0.25
+    )
 
     # Tier factor (higher tier = more expensive upkeep)
-    tier_factor = item.get("tier", 1) ** 1.2
+    tier_factor = a.num("tier", 1) ** 1.2
 
     # Total upkeep cost
     total_upkeep = base_cost + weight_factor + swing_speed_factor + thrust_speed_factor + handling_factor + reach_factor + length_factor + (damage_type_factor * base_cost) + tier_factor
-    return round(total_upkeep)
+    return total_upkeep
 
-def calculate_mount_upkeep(item):
-    base = item.get("price", 0) * 0.025
-    weight_factor = item.get("body_length", 0) * 0.1
-    charge_factor = item.get("charge_damage", 0) * 0.2
-    tankiness = item.get("hit_points", 0) * 0.05
-    return round(base + weight_factor + charge_factor + tankiness)
+def _mount_upkeep(a):
+    base = a.num("price", 0) * 0.025
+    weight_factor = a.num("body_length", 0) * 0.1
+    charge_factor = a.num("charge_damage", 0) * 0.2
+    tankiness = a.num("hit_points", 0) * 0.05
+    return base + weight_factor + charge_factor + tankiness
 
-def calculate_mount_armor_upkeep(item):
+def _mount_armor_upkeep(a):
     # Base upkeep cost based on price (scaled down)
-    base_upkeep = item.get("price", 0) * 0.02
+    base_upkeep = a.num("price", 0) * 0.02
 
     # Weight factor (heavier armor means more upkeep)
-    weight_factor = item.get("weight", 0) * 0.05
+    weight_factor = a.num("weight", 0) * 0.05
 
     # Armor value factor (higher armor value = more upkeep)
-    armor_value_factor = item.get("armor_value", 0) * 0.1
+    armor_value_factor = a.num("armor_value", 0) * 0.1
 
     # Tier factor (higher tier = higher upkeep)
-    tier_factor = item.get("tier", 1) ** 1.3  # More complex = more upkeep
+    tier_factor = a.num("tier", 1) ** 1.3  # More complex = more upkeep
 
     # Total upkeep calculation
     total_upkeep = base_upkeep + weight_factor + armor_value_factor + tier_factor
-    return round(total_upkeep)
+    return total_upkeep
 
-def calculate_ranged_upkeep(item):
+def _ranged_upkeep(a):
     # Base upkeep cost based on price (scaled down)
-    base = item.get("price", 0) * 0.03
+    base = a.num("price", 0) * 0.03
 
     # Penalty based on reload speed (longer reload = higher upkeep)
-    reload_penalty = max(0, 100 - item.get("reload_speed", 0)) * 0.1
+    reload_penalty = np.maximum(0, 100 - a.num("reload_speed", 0)) * 0.1
 
     # Penalty based on aim speed (slower aiming = higher upkeep)
-    aim_penalty = max(0, 100 - item.get("aim_speed", 0)) * 0.1
+    aim_penalty = np.maximum(0, 100 - a.num("aim_speed", 0)) * 0.1
 
     # Bonus based on accuracy (more accurate = lower upkeep)
-    accuracy_bonus = item.get("accuracy", 0) * 0.05
+    accuracy_bonus = a.num("accuracy", 0) * 0.05
 
     # Weight factor (heavier ranged weapons need more upkeep)
-    weight_factor = item.get("weight", 0) * 0.05
+    weight_factor = a.num("weight", 0) * 0.05
 
     # Total upkeep cost
     total_upkeep = base + reload_penalty + aim_penalty + accuracy_bonus + weight_factor
-    return round(total_upkeep)
+    return total_upkeep
 
 
-def calculate_ammo_upkeep(item):
-    base_upkeep = item.get("price", 0) * 0.04
+def _ammo_upkeep(a):
+    base_upkeep = a.num("price", 0) * 0.04
 
     # Damage type factor
-    type_multiplier = 1.0
-    for dmg in item.get("damage_types", []):
-        if dmg == "pierce":
-            type_multiplier += 0.2
-        elif dmg == "cut":
-            type_multiplier += 0.1
+    type_multiplier = 1.0 + a.has("damage_types", "pierce") * 0.2 + a.has("damage_types", "cut") * 0.1
 
     # Weight adds a bit
-    weight_factor = item.get("stack_weight", 0) * 0.1
+    weight_factor = a.num("stack_weight", 0) * 0.1
 
     # Ammo count adds small per-arrow upkeep (e.g., 0.02 per arrow)
-    ammo_bonus = item.get("ammo_count", 0) * 0.02
+    ammo_bonus = a.num("ammo_count", 0) * 0.02
 
     upkeep = base_upkeep * type_multiplier + weight_factor + ammo_bonus
-    return round(upkeep)
+    return upkeep
 
-def calculate_shield_upkeep(item):
+def _shield_upkeep(a):
     # Base upkeep cost based on price (scaled down)
-    base_upkeep = item.get("price", 0) * 0.03
+    base_upkeep = a.num("price", 0) * 0.03
 
     # Weight factor (heavier shields generally cost more to maintain)
-    weight_factor = item.get("weight", 0) * 0.1
+    weight_factor = a.num("weight", 0) * 0.1
 
     # Speed factor (slower shields may require more upkeep due to maneuvering issues)
-    speed_factor = max(0, 100 - item.get("speed", 100)) * 0.05  # slower = higher upkeep
+    speed_factor = np.maximum(0, 100 - a.num("speed", 100)) * 0.05  # slower = higher upkeep
 
     # Reach factor (larger shields may need more maintenance)
-    reach_factor = item.get("reach", 0) * 0.05
+    reach_factor = a.num("reach", 0) * 0.05
 
     # Armory factor (cavalry shields might need more upkeep)
-    armory_factor = 0
-    if item.get("armory") == "cavalry":
-        armory_factor = 0.15  # cavalry shields are more specialized
+    armory_factor = a.equals("armory", "cavalry") * 0.15  # cavalry shields are more specialized
 
     # Total upkeep calculation (without durability)
     total_upkeep = base_upkeep + weight_factor + speed_factor + reach_factor + armory_factor
-    return round(total_upkeep)
+    return total_upkeep
 
-def calculate_armor_upkeep(item):
+def _armor_upkeep(a):
     # Base upkeep cost based on price (scaled down)
-    base_upkeep = item.get("price", 0) * 0.03
+    base_upkeep = a.num("price", 0) * 0.03
 
     # Weight factor (heavier armor generally costs more to maintain)
-    weight_factor = item.get("weight", 0) * 0.1
+    weight_factor = a.num("weight", 0) * 0.1
 
     # Armory factor (specialized armor for cavalry might need more upkeep)
-    armory_factor = 0
-    if item.get("armory") == "cavalry":
-        armory_factor = 0.15  # Cavalry armor is specialized, thus more upkeep
+    armory_factor = a.equals("armory", "cavalry") * 0.15  # Cavalry armor is specialized, thus more upkeep
 
     # Total upkeep calculation
     total_upkeep = base_upkeep + weight_factor + armory_factor
-    return round(total_upkeep)
+    return total_upkeep
 
-def calculate_head_armor_upkeep(item):
+def _head_armor_upkeep(a):
     # Base upkeep
-    base_upkeep = item.get("price", 0) * 0.03
+    base_upkeep = a.num("price", 0) * 0.03
 
     # Weight factor (heavier helmets cost more to maintain)
-    weight_factor = item.get("weight", 0) * 0.1
+    weight_factor = a.num("weight", 0) * 0.1
 
     # Head armor value (higher protection = more maintenance)
-    head_armor_value = item.get("head_armor", 0)
+    head_armor_value = a.num("head_armor", 0)
     head_armor_factor = head_armor_value * 0.15
 
     # Total upkeep
     total_upkeep = base_upkeep + weight_factor + head_armor_factor
-    return round(total_upkeep)
+    return total_upkeep
 
-def calculate_shoulder_armor_upkeep(item):
+def _shoulder_armor_upkeep(a):
     # Base upkeep
-    base_upkeep = item.get("price", 0) * 0.03
+    base_upkeep = a.num("price", 0) * 0.03
 
     # Weight factor
-    weight_factor = item.get("weight", 0) * 0.1
+    weight_factor = a.num("weight", 0) * 0.1
 
     # Body armor and arm armor values
-    body_armor_factor = item.get("body_armor", 0) * 0.1
-    arm_armor_factor = item.get("arm_armor", 0) * 0.1
+    body_armor_factor = a.num("body_armor", 0) * 0.1
+    arm_armor_factor = a.num("arm_armor", 0) * 0.1
 
     # Total upkeep
     total_upkeep = base_upkeep + weight_factor + body_armor_factor + arm_armor_factor
-    return round(total_upkeep)
+    return total_upkeep
 
-def calculate_torso_armor_upkeep(item):
+def _torso_armor_upkeep(a):
     # Base upkeep
-    base_upkeep = item.get("price", 0) * 0.03
+    base_upkeep = a.num("price", 0) * 0.03
 
     # Weight factor
-    weight_factor = item.get("weight", 0) * 0.1
+    weight_factor = a.num("weight", 0) * 0.1
 
     # Body armor, arm armor, and leg armor values
-    body_armor_factor = item.get("body_armor", 0) * 0.15
-    arm_armor_factor = item.get("arm_armor", 0) * 0.1
-    leg_armor_factor = item.get("leg_armor", 0) * 0.1
+    body_armor_factor = a.num("body_armor", 0) * 0.15
+    arm_armor_factor = a.num("arm_armor", 0) * 0.1
+    leg_armor_factor = a.num("leg_armor", 0) * 0.1
 
     # Total upkeep
     total_upkeep = base_upkeep + weight_factor + body_armor_factor + arm_armor_factor + leg_armor_factor
-    return round(total_upkeep)
+    return total_upkeep
 
-def calculate_hand_armor_upkeep(item):
+def _hand_armor_upkeep(a):
     # Base upkeep
-    base_upkeep = item.get("price", 0) * 0.03
+    base_upkeep = a.num("price", 0) * 0.03
 
     # Weight factor
-    weight_factor = item.get("weight", 0) * 0.1
+    weight_factor = a.num("weight", 0) * 0.1
 
     # Arm armor factor
-    arm_armor_factor = item.get("arm_armor", 0) * 0.1
+    arm_armor_factor = a.num("arm_armor", 0) * 0.1
 
     # Total upkeep
     total_upkeep = base_upkeep + weight_factor + arm_armor_factor
-    return round(total_upkeep)
+    return total_upkeep
 
-def calculate_leg_armor_upkeep(item):
+def _leg_armor_upkeep(a):
     # Base upkeep
-    base_upkeep = item.get("price", 0) * 0.03
+    base_upkeep = a.num("price", 0) * 0.03
 
     # Weight factor
-    weight_factor = item.get("weight", 0) * 0.1
+    weight_factor = a.num("weight", 0) * 0.1
 
     # Leg armor factor
-    leg_armor_factor = item.get("leg_armor", 0) * 0.15
+    leg_armor_factor = a.num("leg_armor", 0) * 0.15
 
     # Total upkeep
     total_upkeep = base_upkeep + weight_factor + leg_armor_factor
-    return round(total_upkeep)
+    return total_upkeep
+
+
+### PER-ITEM HELPERS ###
+def calculate_melee_weapon_upkeep(item):
+    return round(float(_melee_weapon_upkeep(_ItemAttributes(item))))
+
+def calculate_mount_upkeep(item):
+    return round(float(_mount_upkeep(_ItemAttributes(item))))
+
+def calculate_mount_armor_upkeep(item):
+    return round(float(_mount_armor_upkeep(_ItemAttributes(item))))
+
+def calculate_ranged_upkeep(item):
+    return round(float(_ranged_upkeep(_ItemAttributes(item))))
+
+def calculate_ammo_upkeep(item):
+    return round(float(_ammo_upkeep(_ItemAttributes(item))))
+
+def calculate_shield_upkeep(item):
+    return round(float(_shield_upkeep(_ItemAttributes(item))))
+
+def calculate_armor_upkeep(item):
+    return round(float(_armor_upkeep(_ItemAttributes(item))))
+
+def calculate_head_armor_upkeep(item):
+    return round(float(_head_armor_upkeep(_ItemAttributes(item))))
+
+def calculate_shoulder_armor_upkeep(item):
+    return round(float(_shoulder_armor_upkeep(_ItemAttributes(item))))
+
+def calculate_torso_armor_upkeep(item):
+    return round(float(_torso_armor_upkeep(_ItemAttributes(item))))
+
+def calculate_hand_armor_upkeep(item):
+    return round(float(_hand_armor_upkeep(_ItemAttributes(item))))
+
+def calculate_leg_armor_upkeep(item):
+    return round(float(_leg_armor_upkeep(_ItemAttributes(item))))
+
+
+# Catalog file -> formula. Items from other files (pets, titles, trails, utility, estates) have no upkeep.
+UPKEEP_FORMULAS = {
+    "weapons_1h_axe": _melee_weapon_upkeep,
+    "weapons_1h_mace": _melee_weapon_upkeep,
+    "weapons_1h_sword": _melee_weapon_upkeep,
+    "weapons_2h_axe": _melee_weapon_upkeep,
+    "weapons_2h_mace": _melee_weapon_upkeep,
+    "weapons_2h_sword": _melee_weapon_upkeep,
+    "weapons_polearm_2d": _melee_weapon_upkeep,
+    "weapons_polearm_4d": _melee_weapon_upkeep,
+    "weapons_bows": _ranged_upkeep,
+    "weapons_xbows": _ranged_upkeep,
+    "arrows_cut": _ammo_upkeep,
+    "arrows_pierce": _ammo_upkeep,
+    "bolts_cut": _ammo_upkeep,
+    "bolts_pierce": _ammo_upkeep,
+    "shields": _shield_upkeep,
+    "mounts": _mount_upkeep,
+    "mounts_armor": _mount_armor_upkeep,
+    "armor_head": _head_armor_upkeep,
+    "armor_shoulders": _shoulder_armor_upkeep,
+    "armor_torso": _torso_armor_upkeep,
+    "armor_hands": _hand_armor_upkeep,
+    "armor_legs": _leg_armor_upkeep,
+}
+
+
+class UpkeepTable:
+    """
+    Daily upkeep of every catalog item, computed one category at a time over
+    attribute arrays. Rebuilt when the catalog reloads or prices change; a
+    billing cycle then only has to look costs up by item.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._price_version = None
+        self.item_codes = {}                        # item_id -> position in `costs`
+        self.costs = np.zeros(0, dtype=np.int64)
+
+    def refresh(self):
+        snapshot = catalog.snapshot
+        if snapshot is self._snapshot and self._price_version == stock_view.price_version:
+            return
+
+        item_codes = {}
+        chunks = []
+        for stem, formula in UPKEEP_FORMULAS.items():
+            items = snapshot.by_file.get(stem, [])
+            if not items:
+                continue
+            for item in items:
+                item_codes[item["id"]] = len(item_codes)
+            chunks.append(np.round(formula(_ColumnAttributes(items))))
+
+        costs = np.concatenate(chunks).astype(np.int64) if chunks else np.zeros(0, dtype=np.int64)
+        self.item_codes, self.costs = item_codes, np.maximum(costs, 0)
+        self._snapshot = snapshot
+        self._price_version = stock_view.price_version
+        if DEBUG:
+            print(f"[DEBUG]🍯🔧 Upkeep table built for {len(item_codes)} item(s).")
+
+    def cost(self, item_id):
+        self.refresh()
+        code = self.item_codes.get(item_id)
+        return int(self.costs[code]) if code is not None else 0
+
+
+upkeep_table = UpkeepTable()
+
+
+def _billing_plan(equipped, gold_by_user):
+    """
+    Work out each player's charge. Players who can't cover their full bill have
+    their most expensive items unequipped until what's left is affordable.
+    Returns (charges {user_id: amount}, unequips [(user_id, item_id, item_type)], totals per user).
+    """
+    upkeep_table.refresh()
+    if not equipped:
+        return {}, [], {}
+
+    user_ids = np.array([row.user_id for row in equipped], dtype=np.int64)
+    item_codes = np.array([upkeep_table.item_codes.get(row.item_id, -1) for row in equipped], dtype=np.int64)
+    billable = item_codes >= 0
+    costs = np.where(billable, upkeep_table.costs[np.where(billable, item_codes, 0)], 0)
+
+    # One pass: total per player via bincount over compact user codes
+    unique_users, user_index = np.unique(user_ids, return_inverse=True)
+    totals = np.bincount(user_index, weights=costs, minlength=len(unique_users)).astype(np.int64)
+    gold = np.array([gold_by_user.get(int(uid), 0) for uid in unique_users], dtype=np.int64)
+
+    charges = {}
+    unequips = []
+    short = totals > gold
+    for uid, total in zip(unique_users[~short], totals[~short]):
+        if total > 0:
+            charges[int(uid)] = int(total)
+
+    for position in np.flatnonzero(short):
+        uid = int(unique_users[position])
+        rows = np.flatnonzero((user_index == position) & (costs > 0))
+        remaining = int(totals[position])
+        for row in rows[np.argsort(-costs[rows], kind="stable")]:
+            if remaining <= gold[position]:
+                break
+            remaining -= int(costs[row])
+            entry = equipped[row]
+            unequips.append((uid, entry.item_id, entry.item_type))
+        if remaining > 0:
+            charges[uid] = remaining
+
+    return charges, unequips, {int(uid): int(total) for uid, total in zip(unique_users, totals)}
+
+
+def _debit_stmt(charges):
+    # One guarded UPDATE ... FROM (VALUES ...) for every player; rows that would go negative are skipped
+    amounts = values(column("user_id", String), column("amount", Integer), name="upkeep_charges").data(
+        [(str(uid), amount) for uid, amount in charges.items()]
+    )
+    return (
+        players.update()
+        .where(players.c.user_id == amounts.c.user_id)
+        .where(players.c.gold >= amounts.c.amount)
+        .values(gold=players.c.gold - amounts.c.amount)
+        .returning(players.c.user_id, players.c.gold)
+    )
+
+
+async def run_upkeep_cycle(dry_run=False):
+    """
+    Charge every player the upkeep on their equipped items. With dry_run=True nothing
+    is written and the report shows what would be charged and unequipped.
+    """
+    async with async_engine.connect() as conn:
+        equipped = (await conn.execute(
+            select(user_inventory.c.user_id, user_inventory.c.item_id, user_inventory.c.item_type)
+            .where(user_inventory.c.equipped == True)
+        )).fetchall()
+
+    billed_users = sorted({str(row.user_id) for row in equipped})
+    # Gold is read straight from the table, so cached changes for these players go first
+    await player_cache.flush(only=billed_users)
+    gold_by_user = {}
+    if billed_users:
+        async with async_engine.connect() as conn:
+            rows = (await conn.execute(select(players.c.user_id, players.c.gold).where(players.c.user_id.in_(billed_users)))).fetchall()
+        gold_by_user = {int(row.user_id): row.gold or 0 for row in rows}
+    # Equipment of users without a players row can't be billed
+    equipped = [row for row in equipped if int(row.user_id) in gold_by_user]
+
+    charges, unequips, totals = _billing_plan(equipped, gold_by_user)
+    report = {
+        "dry_run": dry_run,
+        "equipped_items": len(equipped),
+        "players": len(totals),
+        "charged_players": len(charges),
+        "gold": sum(charges.values()),
+        "unequipped": len(unequips),
+        "skipped": 0,
+    }
+    if dry_run or not (charges or unequips):
+        if DEBUG:
+            print(f"[DEBUG]🍯🔧 Upkeep {'dry run' if dry_run else 'cycle'}: {report}")
+        return report
+
+    debited = {}
+    # Holds back cache flushes for the charged players until their debited balances are applied
+    async with player_cache.writing(*charges):
+        async with async_engine.begin() as conn:
+            if charges:
+                debited = {int(row.user_id): row.gold for row in (await conn.execute(_debit_stmt(charges))).fetchall()}
+                await log_transactions_async(
+                    [(uid, -charges[uid], UPKEEP_TYPE, f"Daily upkeep on equipped gear ({totals[uid]} gold due)") for uid in debited],
+                    conn=conn
+                )
+            # Gear only comes off alongside a charge that went through (or when nothing is left to charge)
+            unequips = [entry for entry in unequips if entry[0] not in charges or entry[0] in debited]
+            if unequips:
+                await conn.execute(
+                    user_inventory.update()
+                    .where(tuple_(user_inventory.c.user_id, user_inventory.c.item_id, user_inventory.c.item_type).in_(unequips))
+                    .values(equipped=False)
+                )
+
+        for uid, gold in debited.items():
+            player_cache.apply(uid, gold=gold)
+    loadout_cache.invalidate(*{uid for uid, _, _ in unequips})
+
+    # A balance that dropped since it was read fails the guard; that player is billed next cycle
+    report["skipped"] = len(charges) - len(debited)
+    report["unequipped"] = len(unequips)
+    report["charged_players"] = len(debited)
+    report["gold"] = sum(charges[uid] for uid in debited)
+    if DEBUG:
+        print(f"[DEBUG]🍯🔧 Upkeep cycle: {report}")
+    return report
+
+
+async def _last_billed_date():
+    async with async_engine.connect() as conn:
+        last = (await conn.execute(
+            select(func.max(transactions.c.timestamp)).where(transactions.c.type == UPKEEP_TYPE)
+        )).scalar()
+    return last.astimezone(CST).date() if last is not None else None
+
+
+class UpkeepCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.last_billed = None
+
+    async def cog_load(self):
+        self.upkeep_loop.start()
+
+    async def cog_unload(self):
+        self.upkeep_loop.cancel()
+
+    @tasks.loop(minutes=UPKEEP_CHECK_MINUTES)
+    async def upkeep_loop(self):
+        now = datetime.now(CST)
+        if now.hour != UPKEEP_HOUR:
+            return
+        try:
+            if self.last_billed is None:
+                # Survive restarts inside the billing hour without charging twice
+                self.last_billed = await _last_billed_date()
+            if self.last_billed == now.date():
+                return
+            await run_upkeep_cycle()
+            self.last_billed = now.date()
+        except Exception as e:
+            print(f"[ERROR]🍯🔧 Upkeep cycle failed: {e}")
+
 
 async def setup(bot):
-    pass
+    await bot.add_cog(UpkeepCog(bot))
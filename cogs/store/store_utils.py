@@ -1,134 +1,40 @@
-import json
-import os
 import time
-from sqlalchemy.sql import insert, delete, select, and_
-from cogs.exp_config import engine
+from sqlalchemy.sql import insert, delete, select, and_, or_, literal
+from sqlalchemy import BigInteger, Boolean, String
+from cogs.exp_config import engine, async_engine
 from cogs.database.user_inventory_table import user_inventory
-from cogs.exp_utils import get_user_data, update_user_data, update_user_gold
+from cogs.store.item_catalog import catalog, CATEGORY_TO_FILES
+from cogs.store.store_stock import stock_view, decrement_stock_stmt
+from cogs.store.title_ownership import title_owners, owned_titles_stmt
+from cogs.character.loadout_cache import loadout_cache
+from cogs.exp_config import players
+from cogs.exp_cache import player_cache
+from cogs.exp_utils import (
+    get_user_data, adjust_player_sync,
+    get_user_data_async, adjust_player,
+)
 
 DEBUG = True  # Set to False in production
-DATA_DIR = os.path.join(os.path.dirname(__file__), "Items")
-
-
-CATEGORY_TO_FILES = {
-    "armor": [
-        "Armor/armor_hands.json",
-        "Armor/armor_head.json",
-        "Armor/armor_legs.json",
-        "Armor/armor_shoulders.json",
-        "Armor/armor_torso.json"
-    ],
-    "estates": ["Estates/estates.json"],
-    "mounts": [
-        "Mounts/mounts.json",
-        "Mounts/mounts_armor.json"
-    ],
-    "pets": ["Pets/pets.json"],
-    "shields": ["Shields/shields.json"],
-    "titles": ["Titles/titles.json"],
-    "trails": ["Trails/trails.json"],
-    "utility": ["Utility/utility.json"],
-    "weapons - 1H": [
-        "Weapons_1H/weapons_1h_axe.json",
-        "Weapons_1H/weapons_1h_mace.json",
-        "Weapons_1H/weapons_1h_sword.json"
-    ],
-    "weapons - 2h": [
-        "Weapons_2h/weapons_2h_axe.json",
-        "Weapons_2h/weapons_2h_mace.json",
-        "Weapons_2h/weapons_2h_sword.json"
-    ],
-    "weapons - arrows": [
-        "Weapons_Arrows/arrows_cut.json",
-        "Weapons_Arrows/arrows_pierce.json"
-    ],
-    "weapons - Bolts": [
-        "Weapons_Bolts/bolts_cut.json",
-        "Weapons_Bolts/bolts_pierce.json"
-    ],
-    "weapons - polearms": [
-        "Weapons_Polearm/weapons_polearm_2d.json",
-        "Weapons_Polearm/weapons_polearm_4d.json"
-    ],
-    "weapons - crossbows": ["Weapons_XBows/weapons_xbows.json"]
-}
-
+TITLE_ROLL_ATTEMPTS = 3   # Redraws when the ownership index turns out to be stale
 STORE_CATEGORIES = list(CATEGORY_TO_FILES.keys())
 
-STORE_ROOT = "cogs/Items"
-
-# Generic loader for a single item JSON file
-def load_items_from_json(file_path):
-    full_path = os.path.join(STORE_ROOT, file_path + ".json")
-    if os.path.exists(full_path):
-        if DEBUG:
-            print(f"[DEBUG] Loading items from: {full_path}")
-        with open(full_path, "r") as f:
-            return json.load(f)
-    if DEBUG:
-        print(f"[DEBUG] File not found: {full_path}")
-    return []
+# Catalog reads are served by the in-memory ItemCatalog (parsed once, reloaded when the files change)
+def load_items_from_json(*file_stems):
+    return catalog.from_files(*file_stems)
 
 # Return all items across all files
 def get_all_items():
-    all_items = []
-    for file_list in CATEGORY_TO_FILES.values():
-        for filename in file_list:
-            full_path = os.path.join(DATA_DIR, filename)
-            if os.path.exists(full_path):
-                print(f"[DEBUG] Trying to load: {full_path}")  # 🔍 Add this line
-                try:
-                    with open(full_path, "r", encoding="utf-8") as f:
-                        all_items.extend(json.load(f))
-                except json.JSONDecodeError as e:
-                    print(f"[ERROR] Failed to load {full_path}: {e}")
-    if DEBUG:
-        print(f"[DEBUG] Loaded {len(all_items)} total items from all categories")
-    return all_items
+    return catalog.all_items()
 
 # Get item by ID (searching across all files)
 def get_item_by_id(item_id):
-    for file_list in CATEGORY_TO_FILES.values():
-        for filename in file_list:
-            path = os.path.join(DATA_DIR, filename)
-            if os.path.exists(path):
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        items = json.load(f)
-                        for item in items:
-                            if not isinstance(item, dict):
-                                if DEBUG:
-                                    print(f"[WARN] Skipping non-dict item in '{filename}': {item}")
-                                continue
-                            if item.get("id") == item_id:
-                                if DEBUG:
-                                    print(f"[DEBUG] Found item '{item_id}' in file '{filename}'")
-                                return item
-                except json.JSONDecodeError as e:
-                    print(f"[ERROR] Failed to parse '{filename}': {e}")
-    if DEBUG:
+    item = catalog.get(item_id)
+    if DEBUG and item is None:
         print(f"[DEBUG] Item '{item_id}' not found in any category")
-    return None
-
-
+    return item
 
 def get_item_by_category(category_name):
-    file_list = CATEGORY_TO_FILES.get(category_name.lower(), [])
-    items = []
-    for filename in file_list:
-        path = os.path.join(DATA_DIR, filename)
-        if DEBUG:
-            print(f"[DEBUG] Attempting to load: {path}")
-        if os.path.exists(path):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    items.extend(json.load(f))
-            except json.JSONDecodeError as e:
-                print(f"[ERROR] Failed to load {path}: {e}")
-        else:
-            if DEBUG:
-                print(f"[DEBUG] File not found: {path}")
-    return items
+    return catalog.category(category_name)
 
 
 # Get all available category names
@@ -160,38 +66,35 @@ def check_item_availability(item_id):
         if DEBUG:
             print(f"[DEBUG] Item '{item_id}' not found.")
         return False
+    return is_item_available(item)
 
-    # ✅ Always allow trails to be bought
-    if item.get("category", "").lower() == "trails":
+def tracks_stock(item):
+    # ✅ Trails are unlimited and always allowed to be bought
+    return item.get("category", "").lower() != "trails"
+
+def is_item_available(item):
+    item_id = item.get("id")
+    if not tracks_stock(item):
         if DEBUG:
             print(f"[DEBUG] Item '{item_id}' is a trail and always available.")
         return True
 
-    available = item.get("stock", 0) > 0
+    # Stock lives in the store_stock table; this reads its cached view
+    available = stock_view.stock(item) > 0
     if DEBUG:
         print(f"[DEBUG] Item '{item_id}' availability: {available}")
     return available
 
-# Update item stock in its file
+# Set item stock in the store_stock table (the item JSON files are read-only)
 def update_item_stock(item_id, new_stock):
-    for file_list in CATEGORY_TO_FILES.values():
-        for filename in file_list:
-            path = os.path.join(DATA_DIR, filename)
-            if not os.path.exists(path):
-                continue
-            with open(path, "r", encoding="utf-8") as f:
-                items = json.load(f)
-            for item in items:
-                if item["id"] == item_id:
-                    item["stock"] = new_stock
-                    with open(path, "w", encoding="utf-8") as f:
-                        json.dump(items, f, indent=4)
-                    if DEBUG:
-                        print(f"[DEBUG] Updated stock for '{item_id}' to {new_stock} in file '{filename}'")
-                    return True
+    if catalog.get(item_id) is None:
+        if DEBUG:
+            print(f"[DEBUG] Failed to update stock for '{item_id}' — not found")
+        return False
+    stock_view.set_sync(item_id, stock=new_stock)
     if DEBUG:
-        print(f"[DEBUG] Failed to update stock for '{item_id}' — not found")
-    return False
+        print(f"[DEBUG] Updated stock for '{item_id}' to {new_stock}")
+    return True
 
 
 # Get user inventory
@@ -202,64 +105,131 @@ def get_user_inventory(user_id):
         print(f"[DEBUG] Inventory for user {user_id}: {inventory}")
     return inventory
 
+### INVENTORY STATEMENTS (shared by the sync shims and the async helpers) ###
+def _unequip_type_stmt(user_id, item_type):
+    return user_inventory.update().where(
+        (user_inventory.c.user_id == int(user_id)) &
+        (user_inventory.c.item_type == item_type) &
+        (user_inventory.c.equipped == True)
+    ).values(equipped=False)
+
+def _owned_title_stmt(user_id):
+    return select(user_inventory).where(
+        (user_inventory.c.user_id == int(user_id)) &
+        (user_inventory.c.item_type == "titles")
+    )
+
+def _inventory_insert_stmt(user_id, item_id, item_type, equipped):
+    return insert(user_inventory).values(
+        user_id=int(user_id),
+        item_id=item_id,
+        item_type=item_type,
+        equipped=True if item_type == "titles" else equipped
+    )
+
+def _equip_stmt(user_id, item_id, item_type):
+    return user_inventory.update().where(
+        (user_inventory.c.user_id == int(user_id)) &
+        (user_inventory.c.item_id == item_id) &
+        (user_inventory.c.item_type == item_type)
+    ).values(equipped=True)
+
+def _ownership_stmt(user_id, item_id, item_type):
+    return select(user_inventory).where(and_(
+        user_inventory.c.user_id == int(user_id),
+        user_inventory.c.item_id == item_id,
+        user_inventory.c.item_type == item_type
+    ))
+
+def _remove_item_stmt(user_id, item_id, item_type):
+    return delete(user_inventory).where(and_(
+        user_inventory.c.user_id == int(user_id),
+        user_inventory.c.item_id == item_id,
+        user_inventory.c.item_type == item_type
+    ))
+
+def _sell_item_stmt(user_id, item_id):
+    # Only an unequipped, non-title row can be sold; RETURNING tells the seller it was still there
+    return delete(user_inventory).where(and_(
+        user_inventory.c.user_id == int(user_id),
+        user_inventory.c.item_id == item_id,
+        user_inventory.c.equipped == False,
+        user_inventory.c.item_type != "titles"
+    )).returning(user_inventory.c.item_type)
+
+def _inventory_row_stmt(user_id, item_id):
+    return select(user_inventory.c.item_type, user_inventory.c.equipped).where(and_(
+        user_inventory.c.user_id == int(user_id),
+        user_inventory.c.item_id == item_id
+    ))
+
+def _equipped_title_stmt(user_id):
+    return select(user_inventory).where(and_(
+        user_inventory.c.user_id == int(user_id),
+        user_inventory.c.item_type == "titles",
+        user_inventory.c.equipped == True
+    ))
+
+def _title_owner_stmt(title_id):
+    return select(user_inventory).where(
+        (user_inventory.c.item_id == title_id) &
+        (user_inventory.c.item_type == "titles")
+    )
+
+def _claim_title_stmt(user_id, title_id):
+    # Guarded insert: only if nobody holds this title and the user has none yet
+    taken = select(user_inventory.c.item_id).where(
+        (user_inventory.c.item_type == "titles") &
+        or_(user_inventory.c.item_id == title_id, user_inventory.c.user_id == int(user_id))
+    ).exists()
+    row = select(
+        literal(int(user_id), BigInteger),
+        literal(title_id, String),
+        literal("titles", String),
+        literal(True, Boolean)
+    ).where(~taken)
+    return insert(user_inventory).from_select(
+        ["user_id", "item_id", "item_type", "equipped"], row
+    ).returning(user_inventory.c.item_id)
+
 def add_item_to_inventory(user_id, item_id, item_type, equipped=False):
     with engine.begin() as conn:
         if equipped:
             # Unequip any currently equipped item of this type
-            unequip_stmt = user_inventory.update().where(
-                (user_inventory.c.user_id == user_id) &
-                (user_inventory.c.item_type == item_type) &
-                (user_inventory.c.equipped == True)
-            ).values(equipped=False)
-            result = conn.execute(unequip_stmt)
+            result = conn.execute(_unequip_type_stmt(user_id, item_type))
             if DEBUG:
                 print(f"[DEBUG]👤🔁 Unequipped {result.rowcount} previously equipped {item_type}(s)")
         # In add_item_to_inventory before insert, if item_type is "titles"
         if item_type == "titles":
-            check_stmt = select(user_inventory).where(
-                (user_inventory.c.user_id == user_id) &
-                (user_inventory.c.item_type == "titles")
-            )
-            result = conn.execute(check_stmt).fetchone()
+            result = conn.execute(_owned_title_stmt(user_id)).fetchone()
             if result:
                 # User already owns a title
                 if DEBUG:
                     print(f"[DEBUG]👤🛑 User {user_id} already owns a title — blocking insert.")
                 return  # Or raise/return failure
-        stmt = insert(user_inventory).values(
-            user_id=user_id,
-            item_id=item_id,
-            item_type=item_type,
-            equipped=True if item_type == "titles" else equipped
-        )
+        stmt = _inventory_insert_stmt(user_id, item_id, item_type, equipped)
         try:
             conn.execute(stmt)
+            if item_type == "titles":
+                title_owners.claim(item_id, user_id)
             if DEBUG:
                 print(f"[DEBUG]👤📦 Added item '{item_id}' ({item_type}) to user {user_id}'s inventory with equipped={equipped}")
         except Exception as e:
             if DEBUG:
                 print(f"[ERROR]👤🚨 Failed to add item '{item_id}' for user {user_id}: {e}")
+    loadout_cache.invalidate(user_id)
 
 def equip_item(user_id, item_id, item_type):
     with engine.begin() as conn:
         # Unequip any currently equipped item of this type
-        unequip_stmt = user_inventory.update().where(
-            (user_inventory.c.user_id == user_id) &
-            (user_inventory.c.item_type == item_type) &
-            (user_inventory.c.equipped == True)
-        ).values(equipped=False)
-        conn.execute(unequip_stmt)
+        conn.execute(_unequip_type_stmt(user_id, item_type))
 
         # Equip the new item
-        equip_stmt = user_inventory.update().where(
-            (user_inventory.c.user_id == user_id) &
-            (user_inventory.c.item_id == item_id) &
-            (user_inventory.c.item_type == item_type)
-        ).values(equipped=True)
-        conn.execute(equip_stmt)
+        conn.execute(_equip_stmt(user_id, item_id, item_type))
 
         if DEBUG:
             print(f"[DEBUG] 👤🧢 Equipped '{item_id}' ({item_type}) for user {user_id}")
+    loadout_cache.invalidate(user_id)
 
 
 # Get user gold
@@ -271,38 +241,26 @@ def get_user_gold(user_id):
     return gold
 
 def add_gold_to_user(user_id, amount):
-    data = get_user_data(user_id)
-    data["gold"] += amount
-    update_user_data(user_id, data["multiplier"], data["daily_multiplier"], data["last_message_ts"], data["last_multiplier_update"])
+    adjust_player_sync(user_id, gold=amount, type_="gold_update", description="Gold added")
     if DEBUG:
         print(f"[DEBUG] Added {amount} gold to user {user_id}")
 
 def get_item_price(item_id):
     item = get_item_by_id(item_id)
-    price = item.get("price", 0) if item else 0
+    price = stock_view.price(item) if item else 0
     if DEBUG:
         print(f"[DEBUG] Price for item '{item_id}': {price}")
     return price
 
 def update_item_price(item_id, new_price):
-    for file_list in CATEGORY_TO_FILES.values():
-        for filename in file_list:
-            path = os.path.join(DATA_DIR, filename)
-            if not os.path.exists(path):
-                continue
-            with open(path, "r", encoding="utf-8") as f:
-                items = json.load(f)
-            for item in items:
-                if item["id"] == item_id:
-                    item["price"] = new_price
-                    with open(path, "w", encoding="utf-8") as f:
-                        json.dump(items, f, indent=4)
-                    if DEBUG:
-                        print(f"[DEBUG] Updated price for '{item_id}' to {new_price} in file '{filename}'")
-                    return True
+    if catalog.get(item_id) is None:
+        if DEBUG:
+            print(f"[DEBUG] Failed to update price — item '{item_id}' not found")
+        return False
+    stock_view.set_sync(item_id, price=new_price)
     if DEBUG:
-        print(f"[DEBUG] Failed to update price — item '{item_id}' not found")
-    return False
+        print(f"[DEBUG] Updated price for '{item_id}' to {new_price}")
+    return True
 
 # Process item purchase
 def process_purchase(user_id, item_id, item_type):
@@ -315,7 +273,7 @@ def process_purchase(user_id, item_id, item_type):
 
     user_data = get_user_data(user_id)
     gold = user_data.get("gold", 0)
-    price = item.get("price", 0)
+    price = stock_view.price(item)
 
     if gold < price:
         return False, "Not enough gold"
@@ -323,39 +281,29 @@ def process_purchase(user_id, item_id, item_type):
     # Check ownership
     if check_item_ownership(user_id, item_id, item_type):
         return False, "You already own this item"
-    
-    # Debug before deducting
-    if DEBUG:
-        if user_data["gold"] < price:
-            print(f"[WARN]❌ User {user_id} does NOT have enough gold ({user_data['gold']} < {price}) — this should not happen past pre-check.")
-        else:
-            print(f"[DEBUG]💸 Deducting {price} gold from user {user_id}")
 
-    # Deduct gold
-    user_data["gold"] = max(0, user_data["gold"] - price)
+    if DEBUG:
+        print(f"[DEBUG]💸 Deducting {price} gold from user {user_id}")
 
-    # Update player data (keep existing multiplier-related info)
-    update_user_gold(
+    # Debit-if-sufficient in one statement; a concurrent spend can't take the balance negative
+    if adjust_player_sync(
         user_id,
-        user_data["gold"],
+        gold=-price,
+        require=[players.c.gold >= price],
         type_="shop_purchase",
         description=f"Bought {item['name']} ({item_type})"
-    )
-
-    update_user_data(
-        user_id,
-        user_data["multiplier"],
-        user_data["daily_multiplier"],
-        user_data["last_message_ts"],
-        user_data["last_multiplier_update"]
-    )
+    ) is None:
+        return False, "Not enough gold"
 
     # Add item to SQL inventory
     add_item_to_inventory(user_id, item_id, item_type)
 
     # Decrease stock
-    if "stock" in item:
-        update_item_stock(item_id, item["stock"] - 1)
+    if tracks_stock(item):
+        with engine.begin() as conn:
+            taken = conn.execute(decrement_stock_stmt(item_id)).fetchone()
+        if taken is not None:
+            stock_view.apply(item_id, stock=taken.stock)
 
     if DEBUG:
         print(f"[DEBUG]👤💰 User {user_id} purchased '{item_id}' ({item_type}) for {price} gold")
@@ -364,12 +312,7 @@ def process_purchase(user_id, item_id, item_type):
 
 def check_item_ownership(user_id, item_id, item_type):
     with engine.connect() as conn:
-        stmt = select(user_inventory).where(and_(
-            user_inventory.c.user_id == user_id,
-            user_inventory.c.item_id == item_id,
-            user_inventory.c.item_type == item_type
-        ))
-        result = conn.execute(stmt).fetchone()
+        result = conn.execute(_ownership_stmt(user_id, item_id, item_type)).fetchone()
         owned = result is not None
         if DEBUG:
             print(f"[DEBUG]👤🔍 User {user_id} owns '{item_id}' ({item_type}): {owned}")
@@ -378,120 +321,364 @@ def check_item_ownership(user_id, item_id, item_type):
 
 def remove_item_from_inventory(user_id, item_id, item_type):
     with engine.begin() as conn:
-        stmt = delete(user_inventory).where(and_(
-            user_inventory.c.user_id == user_id,
-            user_inventory.c.item_id == item_id,
-            user_inventory.c.item_type == item_type
-        ))
-        conn.execute(stmt)
+        conn.execute(_remove_item_stmt(user_id, item_id, item_type))
+        if item_type == "titles":
+            title_owners.release(item_id)
         if DEBUG:
             print(f"[DEBUG]👤❌ Removed item '{item_id}' ({item_type}) from user {user_id}'s inventory")
+    loadout_cache.invalidate(user_id)
 
 def get_unowned_titles():
     from random import shuffle
 
-    all_titles = get_item_by_category("Titles")
-    unclaimed = []
-
+    # One query for every claimed title instead of one per title
     with engine.connect() as conn:
-        for title in all_titles:
-            stmt = select(user_inventory).where(and_(
-                user_inventory.c.item_id == title["id"],
-                user_inventory.c.item_type == "title"
-            ))
-            result = conn.execute(stmt).fetchone()
-            if result is None:
-                unclaimed.append(title)
+        owned = {row.item_id for row in conn.execute(owned_titles_stmt())}
+    unclaimed = [title for title in get_item_by_category("Titles") if title["id"] not in owned]
 
     shuffle(unclaimed)
     return unclaimed
 
 def roll_random_title_for_user(user_id, price):
-    from random import shuffle
-
-    # Get all title items
-    titles = get_item_by_category("Titles")
-    shuffle(titles)
+    from random import choice
 
     # Check if user already owns a title
     with engine.connect() as conn:
-        owned = conn.execute(
-            select(user_inventory).where(
-                and_(
-                    user_inventory.c.user_id == user_id,
-                    user_inventory.c.item_type == "titles",
-                    user_inventory.c.equipped == True
-                )
-            )
-        ).fetchone()
+        owned = conn.execute(_equipped_title_stmt(user_id)).fetchone()
 
     if owned:
-        return "confirm_overwrite", owned["item_id"]  # Prompt user
-
-    # Find a random unowned title
-    for title in titles:
-        title_id = title["id"]
-        if not check_item_ownership(user_id, title_id, "titles"):
-            user_data = get_user_data(user_id)
-
-            # Safety check to prevent KeyError
-            if not user_data or "gold" not in user_data:
-                return False, "❌ You don't have any gold yet. Earn some first!"
-
-            if user_data["gold"] < price:
-                return False, "❌ Not enough gold for a roll."
-            
-            # Debug before deducting
-            if DEBUG:
-                if user_data["gold"] < price:
-                    print(f"[WARN]❌ User {user_id} does NOT have enough gold ({user_data['gold']} < {price}) — this should not happen past pre-check.")
-                else:
-                    print(f"[DEBUG]💸 Deducting {price} gold from user {user_id}")
+        return "confirm_overwrite", owned.item_id  # Prompt user
 
-            # Deduct gold
-            user_data["gold"] = max(0, user_data["gold"] - price)
+    unclaimed = get_unowned_titles()
+    if not unclaimed:
+        return False, "❌ No unclaimed titles left."
+    title = choice(unclaimed)
+    title_id = title["id"]
 
-            update_user_gold(
-                user_id,
-                user_data["gold"],
-                type_="title_roll",
-                description=f"Rolled and received {title['name']}"
-            )
-            update_user_data(
-                user_id,
-                user_data["multiplier"],
-                user_data["daily_multiplier"],
-                user_data["last_message_ts"],
-                user_data["last_multiplier_update"]
-            )
-            # Equip title directly
-            add_item_to_inventory(user_id, title_id, "titles", equipped=True)
-            return True, title  # Send full title dict
+    user_data = get_user_data(user_id)
 
-    return False, "❌ No unclaimed titles left."
+    # Safety check to prevent KeyError
+    if not user_data or "gold" not in user_data:
+        return False, "❌ You don't have any gold yet. Earn some first!"
+
+    if DEBUG:
+        print(f"[DEBUG]💸 Deducting {price} gold from user {user_id}")
+
+    if adjust_player_sync(
+        user_id,
+        gold=-price,
+        require=[players.c.gold >= price],
+        type_="title_roll",
+        description=f"Rolled and received {title['name']}"
+    ) is None:
+        return False, "❌ Not enough gold for a roll."
+    # Equip title directly
+    add_item_to_inventory(user_id, title_id, "titles", equipped=True)
+    return True, title  # Send full title dict
 
 
 
 def get_equipped_title(user_id):
     with engine.connect() as conn:
-        stmt = select(user_inventory).where(and_(
-            user_inventory.c.user_id == user_id,
-            user_inventory.c.item_type == "titles",
-            user_inventory.c.equipped == True
-        ))
-        result = conn.execute(stmt).fetchone()
+        result = conn.execute(_equipped_title_stmt(user_id)).fetchone()
         return dict(result._mapping) if result else None
 def get_user_by_title_id(title_id):
     with engine.connect() as conn:
-        stmt = select(user_inventory).where(
-            (user_inventory.c.item_id == title_id) &
-            (user_inventory.c.item_type == "titles")
-        )
-        result = conn.execute(stmt).fetchone()
+        result = conn.execute(_title_owner_stmt(title_id)).fetchone()
+        if DEBUG:
+            print(f"[DEBUG] Owner of title '{title_id}': {result.user_id if result else 'None'}")
+        return result.user_id if result else None
+
+
+
+### ASYNC HELPERS (use these from cogs; the sync versions above remain as shims) ###
+async def add_item_to_inventory_async(user_id, item_id, item_type, equipped=False):
+    async with async_engine.begin() as conn:
+        added = await _add_item_in_transaction(conn, user_id, item_id, item_type, equipped)
+    if added and item_type == "titles":
+        title_owners.claim(item_id, user_id)
+    loadout_cache.invalidate(user_id)
+    return added
+
+async def _add_item_in_transaction(conn, user_id, item_id, item_type, equipped=False):
+    """Inventory insert on the caller's connection. Returns False if the insert was blocked or failed."""
+    if equipped:
+        # Unequip any currently equipped item of this type
+        result = await conn.execute(_unequip_type_stmt(user_id, item_type))
+        if DEBUG:
+            print(f"[DEBUG]👤🔁 Unequipped {result.rowcount} previously equipped {item_type}(s)")
+    if item_type == "titles":
+        result = (await conn.execute(_owned_title_stmt(user_id))).fetchone()
+        if result:
+            if DEBUG:
+                print(f"[DEBUG]👤🛑 User {user_id} already owns a title — blocking insert.")
+            return False
+    try:
+        async with conn.begin_nested():
+            await conn.execute(_inventory_insert_stmt(user_id, item_id, item_type, equipped))
+        if DEBUG:
+            print(f"[DEBUG]👤📦 Added item '{item_id}' ({item_type}) to user {user_id}'s inventory with equipped={equipped}")
+        return True
+    except Exception as e:
+        if DEBUG:
+            print(f"[ERROR]👤🚨 Failed to add item '{item_id}' for user {user_id}: {e}")
+        return False
+
+async def equip_item_async(user_id, item_id, item_type):
+    async with async_engine.begin() as conn:
+        await conn.execute(_unequip_type_stmt(user_id, item_type))
+        await conn.execute(_equip_stmt(user_id, item_id, item_type))
+
         if DEBUG:
-            print(f"[DEBUG] Owner of title '{title_id}': {result['user_id'] if result else 'None'}")
-        return result["user_id"] if result else None
+            print(f"[DEBUG] 👤🧢 Equipped '{item_id}' ({item_type}) for user {user_id}")
+    loadout_cache.invalidate(user_id)
+
+async def check_item_ownership_async(user_id, item_id, item_type):
+    async with async_engine.connect() as conn:
+        result = (await conn.execute(_ownership_stmt(user_id, item_id, item_type))).fetchone()
+    owned = result is not None
+    if DEBUG:
+        print(f"[DEBUG]👤🔍 User {user_id} owns '{item_id}' ({item_type}): {owned}")
+    return owned
+
+async def remove_item_from_inventory_async(user_id, item_id, item_type):
+    async with async_engine.begin() as conn:
+        await conn.execute(_remove_item_stmt(user_id, item_id, item_type))
+    if item_type == "titles":
+        title_owners.release(item_id)
+    loadout_cache.invalidate(user_id)
+    if DEBUG:
+        print(f"[DEBUG]👤❌ Removed item '{item_id}' ({item_type}) from user {user_id}'s inventory")
+
+async def get_equipped_title_async(user_id):
+    async with async_engine.connect() as conn:
+        result = (await conn.execute(_equipped_title_stmt(user_id))).fetchone()
+    return dict(result._mapping) if result else None
+
+async def get_user_by_title_id_async(title_id):
+    if title_owners.ready:
+        return title_owners.owner(title_id)
+    async with async_engine.connect() as conn:
+        result = (await conn.execute(_title_owner_stmt(title_id))).fetchone()
+    if DEBUG:
+        print(f"[DEBUG] Owner of title '{title_id}': {result.user_id if result else 'None'}")
+    return result.user_id if result else None
+
+async def get_title_owners_async(title_ids):
+    """{title_id: owner_id} for the claimed titles among `title_ids` — from the ownership index, or one query."""
+    if title_owners.ready:
+        return {title_id: title_owners.owner(title_id) for title_id in title_ids if title_owners.owner(title_id) is not None}
+    async with async_engine.connect() as conn:
+        rows = (await conn.execute(owned_titles_stmt().where(user_inventory.c.item_id.in_(list(title_ids))))).fetchall()
+    return {row.item_id: row.user_id for row in rows}
+
+async def update_item_stock_async(item_id, new_stock):
+    if catalog.get(item_id) is None:
+        return False
+    await stock_view.set(item_id, stock=new_stock)
+    if DEBUG:
+        print(f"[DEBUG] Updated stock for '{item_id}' to {new_stock}")
+    return True
+
+async def update_item_price_async(item_id, new_price):
+    if catalog.get(item_id) is None:
+        return False
+    await stock_view.set(item_id, price=new_price)
+    if DEBUG:
+        print(f"[DEBUG] Updated price for '{item_id}' to {new_price}")
+    return True
+
+async def get_user_gold_async(user_id):
+    data = await get_user_data_async(user_id)
+    gold = data.get("gold", 0) if data else 0
+    if DEBUG:
+        print(f"[DEBUG] User {user_id} has {gold} gold")
+    return gold
+
+class _PurchaseRejected(Exception):
+    """Raised inside a purchase or sale transaction to roll it back with a user-facing reason."""
+
+
+async def process_purchase_async(user_id, item_id, item_type):
+    """
+    One unit of work per purchase: a single catalog lookup, then the ownership check,
+    stock decrement, guarded gold debit, inventory insert and ledger row in one
+    database transaction.
+    """
+    item = get_item_by_id(item_id)
+    if not item:
+        return False, "Item not found"
+
+    await stock_view.ensure_loaded()
+    if not is_item_available(item):
+        return False, "Item out of stock"
+
+    price = stock_view.price(item)
+    debited = None
+    taken = None
+
+    try:
+        async with async_engine.begin() as conn:
+            if (await conn.execute(_ownership_stmt(user_id, item_id, item_type))).fetchone():
+                raise _PurchaseRejected("You already own this item")
+
+            if tracks_stock(item):
+                # Conditional decrement; two buyers can't both take the last unit
+                taken = (await conn.execute(decrement_stock_stmt(item_id))).fetchone()
+                if taken is None:
+                    raise _PurchaseRejected("Item out of stock")
+
+            if DEBUG:
+                print(f"[DEBUG]💸 Deducting {price} gold from user {user_id}")
 
+            # Debit-if-sufficient; a concurrent spend can't take the balance negative
+            debited = await adjust_player(
+                user_id,
+                gold=-price,
+                require=[players.c.gold >= price],
+                type_="shop_purchase",
+                description=f"Bought {item['name']} ({item_type})",
+                conn=conn
+            )
+            if debited is None:
+                raise _PurchaseRejected("Not enough gold")
+
+            if not await _add_item_in_transaction(conn, user_id, item_id, item_type):
+                raise _PurchaseRejected("Couldn't add this item to your inventory")
+    except Exception as e:
+        if debited is not None:
+            # The debit was rolled back; drop the cached row (without flushing it) so it's reloaded from the database
+            player_cache.discard(user_id)
+        if isinstance(e, _PurchaseRejected):
+            return False, str(e)
+        raise
+
+    if taken is not None:
+        stock_view.apply(item_id, stock=taken.stock)
+    if item_type == "titles":
+        title_owners.claim(item_id, user_id)
+    loadout_cache.invalidate(user_id)
+
+    if DEBUG:
+        print(f"[DEBUG]👤💰 User {user_id} purchased '{item_id}' ({item_type}) for {price} gold")
+
+    return True, f"Purchased **{item['name']}** for {price} gold"
+
+async def process_sale_async(user_id, item_id):
+    """
+    Sell an unequipped item for 60% of its price: the guarded inventory delete and the
+    refund run in one transaction, so a repeated sell only pays out for the row it removed.
+    """
+    item = get_item_by_id(item_id)
+    if not item:
+        return False, "❌ Item data not found."
+
+    refund = int(stock_view.price(item) * 0.6)
+    credited = None
+
+    try:
+        async with async_engine.begin() as conn:
+            sold = (await conn.execute(_sell_item_stmt(user_id, item_id))).fetchone()
+            if sold is None:
+                # Nothing deleted; look up why for the reply
+                owned = (await conn.execute(_inventory_row_stmt(user_id, item_id))).fetchone()
+                if owned is None:
+                    raise _PurchaseRejected("❌ Item not found in your inventory.")
+                if owned.item_type == "titles":
+                    raise _PurchaseRejected("❌ Titles cannot be sold.")
+                raise _PurchaseRejected("❌ You must unequip the item before selling it.")
+
+            credited = await adjust_player(
+                user_id,
+                gold=refund,
+                type_="shop_sell",
+                description=f"Sold {item.get('name', item_id)} ({sold.item_type})",
+                conn=conn
+            )
+            if credited is None:
+                raise _PurchaseRejected("❌ User not found.")
+    except Exception as e:
+        if credited is not None:
+            player_cache.discard(user_id)
+        if isinstance(e, _PurchaseRejected):
+            return False, str(e)
+        raise
+
+    loadout_cache.invalidate(user_id)
+
+    if DEBUG:
+        print(f"[DEBUG]👤💰 User {user_id} sold '{item_id}' ({sold.item_type}) for {refund} gold")
+
+    return True, f"✅ You sold **{item.get('name', item_id)}** for **{refund}** gold!"
+
+async def roll_random_title_for_user_async(user_id, price):
+    """
+    Pick a random unclaimed title from the ownership index, then debit and claim it in
+    one transaction with a guarded insert. If the index was stale and the title is
+    taken, the roll is rolled back and another title is tried.
+    """
+    await title_owners.ensure_ready()
+
+    # Check if user already owns a title
+    owned_title = title_owners.title_of(user_id)
+    if owned_title:
+        return "confirm_overwrite", owned_title  # Prompt user
+
+    user_data = await get_user_data_async(user_id)
+
+    # Safety check to prevent KeyError
+    if not user_data or "gold" not in user_data:
+        return False, "❌ You don't have any gold yet. Earn some first!"
+
+    if user_data["gold"] < price:
+        return False, "❌ Not enough gold for a roll."
+
+    for _ in range(TITLE_ROLL_ATTEMPTS):
+        title_id = title_owners.random_unclaimed()
+        if title_id is None:
+            return False, "❌ No unclaimed titles left."
+        title = get_item_by_id(title_id)
+
+        # Reserved before the first await so a concurrent roll can't draw the same title
+        title_owners.reserve(title_id, user_id)
+        debited = None
+        owner_id = None
+        try:
+            async with async_engine.begin() as conn:
+                if DEBUG:
+                    print(f"[DEBUG]💸 Deducting {price} gold from user {user_id}")
+
+                debited = await adjust_player(
+                    user_id,
+                    gold=-price,
+                    require=[players.c.gold >= price],
+                    type_="title_roll",
+                    description=f"Rolled and received {title['name']}",
+                    conn=conn
+                )
+                if debited is None:
+                    raise _PurchaseRejected("❌ Not enough gold for a roll.")
+
+                if (await conn.execute(_claim_title_stmt(user_id, title_id))).fetchone() is None:
+                    holder = (await conn.execute(_title_owner_stmt(title_id))).fetchone()
+                    owner_id = holder.user_id if holder else None
+                    raise _PurchaseRejected("❌ You already own a title.")
+            owner_id = user_id
+        except Exception as e:
+            if debited is not None:
+                player_cache.discard(user_id)
+            title_owners.settle(title_id, owner_id)
+            if isinstance(e, _PurchaseRejected):
+                if owner_id is not None:
+                    continue  # Someone else already had it; draw again
+                return False, str(e)
+            raise
+
+        title_owners.settle(title_id, user_id)
+        loadout_cache.invalidate(user_id)
+        return True, title  # Send full title dict
+
+    return False, "❌ Couldn't find a free title — please try again."
 
 
 async def setup(bot):
@@ -0,0 +1,142 @@
+import asyncio
+import random
+from discord.ext import commands, tasks
+from sqlalchemy import select
+
+from cogs.exp_config import async_engine
+from cogs.database.user_inventory_table import user_inventory
+from cogs.store.item_catalog import catalog
+
+DEBUG = True
+REBUILD_INTERVAL_MINUTES = 60   # Safety net for inventory writes made outside the store helpers
+
+
+def owned_titles_stmt():
+    # Every claimed title in one query; the unclaimed set is the catalog minus these
+    return select(user_inventory.c.item_id, user_inventory.c.user_id).where(user_inventory.c.item_type == "titles")
+
+
+class TitleOwnershipIndex:
+    """
+    Who owns which title, kept in memory. The unclaimed set is a list plus a
+    position map, so a random free title is an O(1) pick and claims/releases
+    are O(1) swap-removes. Built from one query against user_inventory and
+    kept current by the store helpers that add or remove titles.
+    """
+
+    def __init__(self):
+        self.ready = False          # Set once the index has been built from the database
+        self._owner = {}            # title_id -> user_id
+        self._title_of = {}         # user_id -> title_id
+        self._unclaimed = []        # title_ids nobody owns
+        self._position = {}         # title_id -> index in _unclaimed
+        self._snapshot = None       # catalog snapshot the title list came from
+        self._reserved = {}         # title_id -> user_id for rolls whose insert hasn't committed yet
+        self._warm_lock = asyncio.Lock()
+
+    async def warm(self):
+        async with self._warm_lock:
+            async with async_engine.connect() as conn:
+                rows = (await conn.execute(owned_titles_stmt())).fetchall()
+            self._owner = {row.item_id: int(row.user_id) for row in rows}
+            self._title_of = {user_id: title_id for title_id, user_id in self._owner.items()}
+            self._rebuild_unclaimed()
+            # A rebuild mid-roll must not hand the same title out twice
+            for title_id, user_id in self._reserved.items():
+                self.claim(title_id, user_id)
+            self.ready = True
+        if DEBUG:
+            print(f"[DEBUG]🎲 Title index built: {len(self._owner)} claimed, {len(self._unclaimed)} free.")
+
+    async def ensure_ready(self):
+        if not self.ready:
+            await self.warm()
+
+    def _rebuild_unclaimed(self):
+        self._snapshot = catalog.snapshot
+        self._unclaimed = [title["id"] for title in catalog.category("titles") if title["id"] not in self._owner]
+        self._position = {title_id: i for i, title_id in enumerate(self._unclaimed)}
+
+    def _check_catalog(self):
+        # Titles added or removed by a catalog reload
+        if catalog.snapshot is not self._snapshot:
+            self._rebuild_unclaimed()
+
+    # === Reads ===
+    def owner(self, title_id):
+        return self._owner.get(title_id)
+
+    def title_of(self, user_id):
+        return self._title_of.get(int(user_id))
+
+    def random_unclaimed(self):
+        self._check_catalog()
+        if not self._unclaimed:
+            return None
+        return random.choice(self._unclaimed)
+
+    def unclaimed(self):
+        self._check_catalog()
+        return list(self._unclaimed)
+
+    # === Writes ===
+    def claim(self, title_id, user_id):
+        """Mark a title as owned and take it out of the unclaimed pool."""
+        self._owner[title_id] = int(user_id)
+        self._title_of[int(user_id)] = title_id
+        position = self._position.pop(title_id, None)
+        if position is not None:
+            last = self._unclaimed.pop()
+            if last != title_id:
+                self._unclaimed[position] = last
+                self._position[last] = position
+
+    def reserve(self, title_id, user_id):
+        self._reserved[title_id] = int(user_id)
+        self.claim(title_id, user_id)
+
+    def settle(self, title_id, owner_id=None):
+        """End a reservation: record the real owner, or return the title to the pool if nobody got it."""
+        self._reserved.pop(title_id, None)
+        self.release(title_id)
+        if owner_id is not None:
+            self.claim(title_id, owner_id)
+
+    def release(self, title_id):
+        user_id = self._owner.pop(title_id, None)
+        if user_id is not None and self._title_of.get(user_id) == title_id:
+            del self._title_of[user_id]
+        if title_id not in self._position and catalog.get(title_id) is not None:
+            self._position[title_id] = len(self._unclaimed)
+            self._unclaimed.append(title_id)
+
+    def stats(self):
+        return {"claimed": len(self._owner), "unclaimed": len(self._unclaimed)}
+
+
+title_owners = TitleOwnershipIndex()
+
+
+class TitleOwnershipCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        await title_owners.warm()
+        self.rebuild_loop.start()
+
+    async def cog_unload(self):
+        self.rebuild_loop.cancel()
+
+    @tasks.loop(minutes=REBUILD_INTERVAL_MINUTES)
+    async def rebuild_loop(self):
+        if self.rebuild_loop.current_loop == 0:
+            return  # Already built in cog_load
+        try:
+            await title_owners.warm()
+        except Exception as e:
+            print(f"[ERROR]🎲 Title index rebuild failed: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(TitleOwnershipCog(bot))
@@ -1,8 +1,16 @@
+import asyncio
 from cogs.database.transactions_table import transactions
-from cogs.exp_config import engine
+from cogs.exp_config import engine, async_engine
 import sqlalchemy as db
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, func
 from datetime import datetime, timezone, timedelta
+from discord.ext import commands, tasks
+
+DEBUG = True
+MAX_TRANSACTIONS_PER_USER = 100
+LEDGER_FLUSH_SECONDS = 5        # How often queued entries are written with one multi-row insert
+LEDGER_MAX_PENDING = 500        # Flush early once this many entries are queued
+LEDGER_TRIM_MINUTES = 10        # How often per-user history is trimmed in the background
 
 # Define CST timezone
 CST = timezone(timedelta(hours=-6))
@@ -10,27 +18,204 @@ CST = timezone(timedelta(hours=-6))
 def now_cst():
     return datetime.now(CST)
 
-def log_transaction(user_id: int, amount: int, type_: str, description: str = "", max_per_user: int = 100):
-    with engine.begin() as conn:
-        # Insert new transaction
-        stmt = db.insert(transactions).values(
-            user_id=user_id,
-            amount=amount,
-            type=type_,
-            description=description,
-            timestamp=now_cst()
-        )
-        conn.execute(stmt)
-
-        # Delete oldest if over cap
-        subquery = (
-            select(transactions.c.id)
-            .where(transactions.c.user_id == user_id)
-            .order_by(desc(transactions.c.timestamp))
-            .offset(max_per_user)
-        )
-        ids_to_delete = [row.id for row in conn.execute(subquery).fetchall()]
-        if ids_to_delete:
-            conn.execute(transactions.delete().where(transactions.c.id.in_(ids_to_delete)))
-
-        print(f"[DEBUG]📘 Logged transaction for user {user_id}: {amount} ({type_}) - {description}")
+def _transaction_row(user_id, amount, type_, description):
+    return {
+        "user_id": int(user_id),
+        "amount": amount,
+        "type": type_,
+        "description": description,
+        "timestamp": now_cst(),
+    }
+
+def _trim_stmt(max_per_user, user_ids=None):
+    # Keep each user's newest `max_per_user` rows; one statement for every (touched) user
+    ranked = select(
+        transactions.c.id,
+        func.row_number().over(
+            partition_by=transactions.c.user_id,
+            order_by=(desc(transactions.c.timestamp), desc(transactions.c.id)),
+        ).label("rn"),
+    )
+    if user_ids is not None:
+        ranked = ranked.where(transactions.c.user_id.in_(user_ids))
+    ranked = ranked.subquery()
+    return transactions.delete().where(transactions.c.id.in_(select(ranked.c.id).where(ranked.c.rn > max_per_user)))
+
+
+class LedgerWriter:
+    """
+    Append-only transaction ledger. Entries are queued in memory and written
+    with multi-row inserts; per-user history trimming runs as a background
+    job instead of on every gold change. Without the LedgerWriterCog running,
+    entries are written and trimmed directly, as they were before batching.
+    """
+
+    def __init__(self, max_per_user=MAX_TRANSACTIONS_PER_USER):
+        self.max_per_user = max_per_user
+        self.running = False    # Set while the LedgerWriterCog loops are active
+        self._pending = []
+        self._touched = set()   # user_ids written since the last trim
+        self._flush_lock = asyncio.Lock()
+
+        self.entries = 0
+        self.flushes = 0
+        self.trimmed = 0
+
+    def record(self, user_id, amount, type_, description=""):
+        """Queue an entry. Safe to call from sync code; nothing is written until the next flush."""
+        self._pending.append(_transaction_row(user_id, amount, type_, description))
+        self._touched.add(int(user_id))
+        self.entries += 1
+
+    def touch(self, *user_ids):
+        """Mark users whose history was written outside the queue (in a caller's transaction) for trimming."""
+        self._touched.update(int(user_id) for user_id in user_ids)
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            try:
+                async with async_engine.begin() as conn:
+                    await conn.execute(transactions.insert(), batch)
+            except Exception:
+                # Put the batch back in front so ordering is kept and the next flush retries
+                self._pending = batch + self._pending
+                raise
+            self.flushes += 1
+            if DEBUG:
+                print(f"[DEBUG]📘 Ledger flushed {len(batch)} transaction(s).")
+            return len(batch)
+
+    async def trim(self, all_users=False):
+        """Delete rows beyond each touched user's newest `max_per_user` (every user when all_users=True)."""
+        if not all_users and not self._touched:
+            return 0
+        # Swap the set out so users touched while the DELETE runs are kept for the next trim
+        touched, self._touched = self._touched, set()
+        try:
+            async with async_engine.begin() as conn:
+                result = await conn.execute(_trim_stmt(self.max_per_user, None if all_users else list(touched)))
+        except Exception:
+            self._touched |= touched
+            raise
+        deleted = result.rowcount or 0
+        self.trimmed += deleted
+        if DEBUG and deleted:
+            print(f"[DEBUG]📘 Ledger trimmed {deleted} old transaction(s).")
+        return deleted
+
+    def stats(self):
+        return {
+            "entries": self.entries,
+            "pending": len(self._pending),
+            "flushes": self.flushes,
+            "trimmed": self.trimmed,
+        }
+
+
+ledger = LedgerWriter()
+
+
+def log_transaction(user_id: int, amount: int, type_: str, description: str = "", conn=None):
+    if conn is not None:
+        conn.execute(transactions.insert().values(**_transaction_row(user_id, amount, type_, description)))
+        if ledger.running:
+            ledger.touch(user_id)
+        else:
+            conn.execute(_trim_stmt(ledger.max_per_user, [int(user_id)]))
+    elif ledger.running:
+        ledger.record(user_id, amount, type_, description)
+    else:
+        # No background trim without the writer, so trim on insert like the unbatched ledger did
+        with engine.begin() as conn:
+            conn.execute(transactions.insert().values(**_transaction_row(user_id, amount, type_, description)))
+            conn.execute(_trim_stmt(ledger.max_per_user, [int(user_id)]))
+
+    print(f"[DEBUG]📘 Logged transaction for user {user_id}: {amount} ({type_}) - {description}")
+
+async def log_transaction_async(user_id: int, amount: int, type_: str, description: str = "", conn=None):
+    """
+    Queue a ledger entry for the batched writer. With `conn` the entry is inserted in that
+    transaction instead, so it commits or rolls back with the caller's other writes.
+    """
+    if conn is not None:
+        await conn.execute(transactions.insert().values(**_transaction_row(user_id, amount, type_, description)))
+        if ledger.running:
+            ledger.touch(user_id)
+        else:
+            await conn.execute(_trim_stmt(ledger.max_per_user, [int(user_id)]))
+    elif ledger.running:
+        ledger.record(user_id, amount, type_, description)
+        if ledger.pending >= LEDGER_MAX_PENDING:
+            await ledger.flush()
+    else:
+        async with async_engine.begin() as conn:
+            await conn.execute(transactions.insert().values(**_transaction_row(user_id, amount, type_, description)))
+            await conn.execute(_trim_stmt(ledger.max_per_user, [int(user_id)]))
+
+    print(f"[DEBUG]📘 Logged transaction for user {user_id}: {amount} ({type_}) - {description}")
+
+async def log_transactions_async(entries, conn=None):
+    """Many (user_id, amount, type_, description) entries at once; with `conn` as one multi-row insert in that transaction."""
+    if not entries:
+        return
+    user_ids = {int(entry[0]) for entry in entries}
+    if conn is not None:
+        await conn.execute(transactions.insert(), [_transaction_row(*entry) for entry in entries])
+        if ledger.running:
+            ledger.touch(*user_ids)
+        else:
+            await conn.execute(_trim_stmt(ledger.max_per_user, list(user_ids)))
+    else:
+        for entry in entries:
+            ledger.record(*entry)
+        if not ledger.running or ledger.pending >= LEDGER_MAX_PENDING:
+            await ledger.flush()
+        if not ledger.running:
+            await ledger.trim()
+
+    if DEBUG:
+        print(f"[DEBUG]📘 Logged {len(entries)} transaction(s).")
+
+
+class LedgerWriterCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        ledger.running = True
+        self.flush_loop.start()
+        self.trim_loop.start()
+        print("[DEBUG]📘 LedgerWriter loaded. Transactions are now batched.")
+
+    async def cog_unload(self):
+        self.flush_loop.cancel()
+        self.trim_loop.cancel()
+        ledger.running = False
+        await ledger.flush()
+
+    @tasks.loop(seconds=LEDGER_FLUSH_SECONDS)
+    async def flush_loop(self):
+        try:
+            await ledger.flush()
+        except Exception as e:
+            print(f"[ERROR]📘 Ledger flush failed (will retry): {e}")
+
+    @tasks.loop(minutes=LEDGER_TRIM_MINUTES)
+    async def trim_loop(self):
+        try:
+            await ledger.flush()
+            # First run sweeps every user so history written while the writer was off is trimmed too
+            await ledger.trim(all_users=self.trim_loop.current_loop == 0)
+        except Exception as e:
+            print(f"[ERROR]📘 Ledger trim failed: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(LedgerWriterCog(bot))
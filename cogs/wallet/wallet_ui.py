@@ -1,20 +1,80 @@
 import discord
+from collections import OrderedDict
 from discord import Embed, ButtonStyle, Interaction
 from discord.ui import View, Button
 from datetime import timezone, timedelta
+import sqlalchemy as db
+from sqlalchemy import select, desc
+
+from cogs.exp_config import async_engine
+from cogs.database.transactions_table import transactions
+from cogs.wallet.log_transactions import ledger
 
 
 
 CST = timezone(timedelta(hours=-6))
 WALLET_EMOJI = "💼"
+PAGE_SIZE = 5
+MAX_CACHED_PAGES = 10   # Pages kept per open wallet view; older ones are refetched by cursor
+
+
+async def fetch_transaction_page(user_id, before=None, limit=PAGE_SIZE):
+    """
+    One page of history, newest first, via keyset pagination on (user_id, timestamp, id).
+    `before` is the (timestamp, id) of the last row of the previous page.
+    Returns (rows, has_more).
+    """
+    stmt = (
+        select(transactions)
+        .where(transactions.c.user_id == int(user_id))
+        .order_by(desc(transactions.c.timestamp), desc(transactions.c.id))
+        .limit(limit + 1)
+    )
+    if before is not None:
+        stmt = stmt.where(db.tuple_(transactions.c.timestamp, transactions.c.id) < before)
+
+    async with async_engine.connect() as conn:
+        rows = (await conn.execute(stmt)).fetchall()
+    return rows[:limit], len(rows) > limit
+
+
+def wallet_home(user_id, gold, previous_view=None):
+    """The wallet embed plus its 'View Transactions' button. History is only queried when the button is pressed."""
+    embed = Embed(
+        title=f"{WALLET_EMOJI} Your Wallet",
+        description=f"**Gold:** {gold:,} 💰\n\nClick below to view your recent transactions.",
+        color=discord.Color.from_rgb(0, 0, 0)
+    )
+
+    async def show_transactions_callback(inner_interaction):
+        if previous_view is None:
+            # Queued ledger entries must be written before the history is read
+            await ledger.flush()
+        view = TransactionView(user_id, gold, cache_from=previous_view)
+        embed = await view.render()
+        await inner_interaction.response.edit_message(embed=embed, view=view)
+
+    view = View()
+    show_button = Button(label="View Transactions", style=ButtonStyle.primary)
+    show_button.callback = show_transactions_callback
+    view.add_item(show_button)
+    return embed, view
+
 
 class TransactionView(View):
-    def __init__(self, user_id, transactions, gold, page=0):
+    def __init__(self, user_id, gold, page=0, cache_from=None):
         super().__init__(timeout=60)
         self.user_id = user_id
-        self.transactions = transactions
         self.gold = gold
         self.page = page
+        self._cursors = [None]        # page -> keyset cursor of the row before it
+        self._pages = OrderedDict()   # page -> rows (LRU, bounded by MAX_CACHED_PAGES)
+        self._has_more = {}           # page -> whether a later page exists
+        if cache_from is not None:
+            # Going back to the wallet and reopening history reuses the pages already fetched
+            self._cursors = cache_from._cursors
+            self._pages = cache_from._pages
+            self._has_more = cache_from._has_more
         self.update_buttons()
 
     def update_buttons(self):
@@ -23,11 +83,28 @@ class TransactionView(View):
         self.add_item(NextPageButton(self))
         self.add_item(BackToWalletButton(self))
 
-    def get_embed(self):
+    def has_next(self):
+        return self._has_more.get(self.page, False)
+
+    async def load_page(self, page):
+        rows = self._pages.get(page)
+        if rows is not None:
+            self._pages.move_to_end(page)
+            return rows
+
+        rows, has_more = await fetch_transaction_page(self.user_id, before=self._cursors[page])
+        self._pages[page] = rows
+        self._has_more[page] = has_more
+        if has_more and len(self._cursors) == page + 1:
+            last = rows[-1]
+            self._cursors.append((last.timestamp, last.id))
+        while len(self._pages) > MAX_CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return rows
+
+    async def render(self):
+        page_txns = await self.load_page(self.page)
         embed = Embed(title=f"{WALLET_EMOJI} Recent Transactions", color=discord.Color.from_rgb(0, 0, 0))
-        start = self.page * 5
-        end = start + 5
-        page_txns = self.transactions[start:end]
 
         if page_txns:
             for row in page_txns:
@@ -38,7 +115,7 @@ class TransactionView(View):
         else:
             embed.description = "No transactions to display."
 
-        embed.set_footer(text=f"Page {self.page + 1} / {max(1, (len(self.transactions) + 4) // 5)}")
+        embed.set_footer(text=f"Page {self.page + 1}" + (" • more →" if self.has_next() else ""))
         return embed
 
 class PrevPageButton(Button):
@@ -53,7 +130,7 @@ class PrevPageButton(Button):
         if self.view_ref.page > 0:
             self.view_ref.page -= 1
         self.view_ref.update_buttons()
-        await interaction.response.edit_message(embed=self.view_ref.get_embed(), view=self.view_ref)
+        await interaction.response.edit_message(embed=await self.view_ref.render(), view=self.view_ref)
 
 class NextPageButton(Button):
     def __init__(self, view):
@@ -64,10 +141,10 @@ class NextPageButton(Button):
         if interaction.user.id != self.view_ref.user_id:
             return await interaction.response.send_message("❌ Not your wallet.", ephemeral=True)
 
-        if (self.view_ref.page + 1) * 5 < len(self.view_ref.transactions):
+        if self.view_ref.has_next():
             self.view_ref.page += 1
         self.view_ref.update_buttons()
-        await interaction.response.edit_message(embed=self.view_ref.get_embed(), view=self.view_ref)
+        await interaction.response.edit_message(embed=await self.view_ref.render(), view=self.view_ref)
 
 class BackToWalletButton(Button):
     def __init__(self, view):
@@ -78,23 +155,5 @@ class BackToWalletButton(Button):
         if interaction.user.id != self.view_ref.user_id:
             return await interaction.response.send_message("❌ Not your wallet.", ephemeral=True)
 
-        embed = Embed(
-            title=f"{WALLET_EMOJI} Your Wallet",
-            description=f"**Gold:** {self.view_ref.gold:,} 💰\n\nClick below to view your recent transactions.",
-            color=discord.Color.from_rgb(0, 0, 0)
-        )
-
-        async def show_transactions_callback(inner_interaction):
-            new_view = TransactionView(
-                self.view_ref.user_id,
-                self.view_ref.transactions,
-                self.view_ref.gold
-            )
-            await inner_interaction.response.edit_message(embed=new_view.get_embed(), view=new_view)
-
-        view = View()
-        show_button = Button(label="View Transactions", style=ButtonStyle.primary)
-        show_button.callback = show_transactions_callback
-        view.add_item(show_button)
-
-        await interaction.response.edit_message(embed=embed, view=view)
\ No newline at end of file
+        embed, view = wallet_home(self.view_ref.user_id, self.view_ref.gold, previous_view=self.view_ref)
+        await interaction.response.edit_message(embed=embed, view=view)
@@ -0,0 +1,143 @@
+import asyncio
+import time
+import discord
+from discord.ext import commands
+from sqlalchemy import select
+
+from cogs.admin_config import GUILD_ID
+from cogs.exp_config import players, async_engine
+from cogs.exp_cache import player_cache
+
+DEBUG = True
+NAME_TTL_SECONDS = 3600   # How long a resolved display name is trusted
+REST_CONCURRENCY = 3      # Max concurrent fetch_user calls for the last-resort path
+
+
+class MemberResolver:
+    """
+    Resolves user ids to display names without hitting the Discord API in the
+    common case. Lookup order: guild member cache -> TTL cache -> players.display_name
+    -> concurrency-limited fetch_user.
+    """
+
+    def __init__(self, ttl=NAME_TTL_SECONDS, rest_concurrency=REST_CONCURRENCY):
+        self.ttl = ttl
+        self._names = {}  # user_id -> (display_name, expires_at)
+        self._rest_limit = asyncio.Semaphore(rest_concurrency)
+
+        self.member_hits = 0
+        self.ttl_hits = 0
+        self.db_hits = 0
+        self.rest_calls = 0
+
+    async def display_name(self, bot, user_id):
+        names = await self.display_names(bot, [user_id])
+        return names[str(user_id)]
+
+    async def display_names(self, bot, user_ids):
+        """Resolve many ids at once: one SQL query and one batch of REST calls at most."""
+        user_ids = [str(uid) for uid in user_ids]
+        resolved = {}
+        now = time.monotonic()
+        guild = bot.get_guild(GUILD_ID)
+
+        missing = []
+        for uid in user_ids:
+            member = guild.get_member(int(uid)) if guild else None
+            if member:
+                self.member_hits += 1
+                resolved[uid] = member.display_name
+                self._remember(uid, member.display_name, now)
+                continue
+
+            cached = self._names.get(uid)
+            if cached and cached[1] > now:
+                self.ttl_hits += 1
+                resolved[uid] = cached[0]
+                continue
+            missing.append(uid)
+
+        if missing:
+            stored = await self._stored_names(missing)
+            for uid, name in stored.items():
+                self.db_hits += 1
+                resolved[uid] = name
+                self._remember(uid, name, now)
+            missing = [uid for uid in missing if uid not in stored]
+
+        if missing:
+            fetched = await asyncio.gather(*(self._fetch(bot, uid) for uid in missing))
+            for uid, name in zip(missing, fetched):
+                resolved[uid] = name
+                if name != f"<@{uid}>":
+                    self._remember(uid, name, now)
+
+        return resolved
+
+    def remember(self, user_id, display_name):
+        self._remember(str(user_id), display_name, time.monotonic())
+
+    def _remember(self, user_id, display_name, now):
+        self._names[user_id] = (display_name, now + self.ttl)
+
+    async def _stored_names(self, user_ids):
+        # Cached player rows first, then a single query for the rest
+        stored = {}
+        uncached = []
+        for uid in user_ids:
+            row = player_cache.peek(uid)
+            if row is not None:
+                if row.get("display_name"):
+                    stored[uid] = row["display_name"]
+            else:
+                uncached.append(uid)
+
+        if uncached:
+            async with async_engine.connect() as conn:
+                result = await conn.execute(
+                    select(players.c.user_id, players.c.display_name).where(players.c.user_id.in_(uncached))
+                )
+                for row in result.fetchall():
+                    if row.display_name:
+                        stored[str(row.user_id)] = row.display_name
+        return stored
+
+    async def _fetch(self, bot, user_id):
+        async with self._rest_limit:
+            self.rest_calls += 1
+            try:
+                user = await bot.fetch_user(int(user_id))
+                return user.display_name
+            except discord.HTTPException as e:
+                print(f"[ERROR]🪪 Failed to fetch user {user_id}: {e}")
+                return f"<@{user_id}>"
+
+    def stats(self):
+        return {
+            "member_hits": self.member_hits,
+            "ttl_hits": self.ttl_hits,
+            "db_hits": self.db_hits,
+            "rest_calls": self.rest_calls,
+        }
+
+
+member_resolver = MemberResolver()
+
+
+class MemberResolverCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.display_name == after.display_name:
+            return
+
+        member_resolver.remember(after.id, after.display_name)
+        # Keep the denormalized column fresh for lookups when the member isn't cached
+        if await player_cache.update(after.id, display_name=after.display_name) and DEBUG:
+            print(f"[DEBUG]🪪 Display name updated for {after.id}: {before.display_name} → {after.display_name}")
+
+
+async def setup(bot):
+    await bot.add_cog(MemberResolverCog(bot))